@@ -0,0 +1,176 @@
+# Distinct-value summaries of a column, exact or approximate, built one chunk at a time
+import numpy as np
+import pandas as pd
+
+
+def hash_values(series):
+    """
+    Returns 64-bit hashes of the non-null values of series. pandas' hash is stable across runs,
+    so the same value in two files gets the same hash.
+    """
+    return pd.util.hash_pandas_object(series.dropna(), index=False).to_numpy()
+
+
+def _leading_zeros(values):
+    # Count leading zero bits of each nonzero uint64 by halving the window: 32, 16, ... 1 bits
+    zeros = np.zeros(len(values), dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        small = values < (np.uint64(1) << np.uint64(64 - shift))
+        zeros[small] += shift
+        values = np.where(small, values << np.uint64(shift), values)
+    return zeros
+
+
+class HashSet:
+    """
+    The exact set of value hashes, kept as a sorted array (8 bytes per distinct value).
+    The distinct hashes of each chunk are set aside and merged into the sorted array only when
+    they outnumber it (or when the set is read), so each hash is re-sorted a few times in total
+    rather than once per chunk, and memory stays within a small multiple of the distinct values.
+    """
+
+    # Hashes (8 bytes each) that may wait before a merge, however small the sorted array still is
+    MIN_PENDING = 1 << 20
+
+    def __init__(self):
+        self._sorted = np.empty(0, dtype=np.uint64)
+        self._pending = []
+        self._pending_size = 0
+
+    def _merge(self):
+        if self._pending:
+            self._sorted = np.unique(np.concatenate([self._sorted] + self._pending))
+            self._pending = []
+            self._pending_size = 0
+
+    @property
+    def hashes(self):
+        self._merge()
+        return self._sorted
+
+    def add(self, hashes):
+        hashes = np.unique(hashes)
+        self._pending.append(hashes)
+        self._pending_size += len(hashes)
+        if self._pending_size > max(len(self._sorted), self.MIN_PENDING):
+            self._merge()
+
+    def count(self):
+        return len(self.hashes)
+
+    def overlap(self, other):
+        """Number of distinct values in both sets."""
+        return len(np.intersect1d(self.hashes, other.hashes, assume_unique=True))
+
+    def jaccard(self, other):
+        union = self.count() + other.count() - self.overlap(other)
+        return self.overlap(other) / union if union else 0.0
+
+
+def _sigma(x):
+    # Correction for the empty registers (x is their share) in the improved HyperLogLog estimator
+    if x == 1:
+        return np.inf
+    y, z = 1.0, x
+    while True:
+        x *= x
+        previous, z = z, z + x * y
+        y += y
+        if z == previous:
+            return z
+
+
+def _tau(x):
+    # Correction for the registers that hit the largest possible run (x is the share of the others)
+    if x == 0 or x == 1:
+        return 0.0
+    y, z = 1.0, 1 - x
+    while True:
+        x = np.sqrt(x)
+        y *= 0.5
+        previous, z = z, z - (1 - x) ** 2 * y
+        if z == previous:
+            return z / 3
+
+
+class HyperLogLog:
+    """
+    Estimates the number of distinct values in 2 ** precision bytes, with a standard error of
+    about 1.04 / sqrt(2 ** precision) (0.8% at the default precision) over the whole range of counts.
+    """
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = np.zeros(2 ** precision, dtype=np.uint8)
+
+    def add(self, hashes):
+        # The top bits pick a register, which keeps the longest run of leading zeros seen in the rest
+        # (the low bit set below caps the run, so an all-zero remainder cannot overflow it)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        rest = (hashes << np.uint64(self.precision)) | np.uint64(1 << (self.precision - 1))
+        np.maximum.at(self.registers, index, _leading_zeros(rest) + 1)
+
+    def merge(self, other):
+        merged = HyperLogLog(self.precision)
+        merged.registers = np.maximum(self.registers, other.registers)
+        return merged
+
+    def count(self):
+        # Ertl's improved estimator ("New cardinality estimation algorithms for HyperLogLog sketches", 2017)
+        # works from the histogram of register values. Unlike the raw estimate with a switch to linear
+        # counting at 2.5 * m registers, it has no bias in between (the raw one was 2-3% high around 5 * m / 2)
+        m = len(self.registers)
+        q = 64 - self.precision  # Registers hold 0 (empty) up to q + 1
+        histogram = np.bincount(self.registers, minlength=q + 2)
+        z = m * _tau(1 - histogram[q + 1] / m)
+        for k in range(q, 0, -1):
+            z = 0.5 * (z + histogram[k])
+        z += m * _sigma(histogram[0] / m)
+        return int(round(m * m / (2 * np.log(2) * z)))
+
+
+class MinHash:
+    """
+    A bottom-k MinHash sketch: the k smallest value hashes. The share of the k smallest hashes of
+    the union that are in both sketches estimates the Jaccard similarity (exact below k values).
+    """
+
+    def __init__(self, k=1024):
+        self.k = k
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    def add(self, hashes):
+        if len(self.hashes) == self.k:
+            hashes = hashes[hashes < self.hashes[-1]]  # Cannot enter the k smallest
+        self.hashes = np.union1d(self.hashes, hashes)[:self.k]
+
+    def jaccard(self, other):
+        union = np.union1d(self.hashes, other.hashes)[:min(self.k, other.k)]
+        if not len(union):
+            return 0.0
+        shared = np.isin(union, self.hashes, assume_unique=True) & np.isin(union, other.hashes, assume_unique=True)
+        return np.count_nonzero(shared) / len(union)
+
+
+class ColumnSketch:
+    """
+    Approximate stand-in for HashSet with fixed memory: HyperLogLog for distinct counts and MinHash
+    for the Jaccard similarity. Overlap is estimated as the Jaccard similarity times the union size.
+    """
+
+    def __init__(self, precision=14, k=1024):
+        self.hll = HyperLogLog(precision)
+        self.minhash = MinHash(k)
+
+    def add(self, hashes):
+        self.hll.add(hashes)
+        self.minhash.add(hashes)
+
+    def count(self):
+        return self.hll.count()
+
+    def jaccard(self, other):
+        return self.minhash.jaccard(other.minhash)
+
+    def overlap(self, other):
+        return int(round(self.jaccard(other) * self.hll.merge(other.hll).count()))
@@ -1,9 +1,20 @@
 # Third Step
+import argparse
+import contextlib
+import csv
+import io
+import mmap
 import os
+import zlib
+import numpy as np
 import pandas as pd
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from urllib.parse import urlparse, urlunparse
-from datetime import datetime
+
+from instrumentation import active_recorder, collect_spans, run_instrumentation, span
+from value_cache import ValueCache
 
 # Get the folder where the script is located
 script_directory = os.path.dirname(os.path.abspath(__file__))
@@ -11,40 +22,81 @@ script_directory = os.path.dirname(os.path.abspath(__file__))
 # Path to the 'files' folder
 files_directory = os.path.join(script_directory, "files")
 
-# Path to the CSV file
-csv_file_path = os.path.join(files_directory, "merged_steam_data.csv")
+# Rows per chunk when cleaning in parallel without an explicit --chunk-rows
+DEFAULT_CHUNK_ROWS = 50000
+
+# Version of the cleaning steps' output, recorded in the --incremental row index. Bump it whenever a
+# step changes what it writes, so the next incremental run cleans every row again instead of reusing old rows
+CLEANING_VERSION = 1
+
+# Bytes of distinct values and their normalized forms remembered per column (see value_cache.py)
+NORMALIZE_CACHE_BYTES = 16 * 1024 * 1024
+
+# From pandas 2, to_datetime guesses one format from the first value and turns values written another way
+# into NaT; format='mixed' parses each value on its own, as pandas 1 and the row-wise reference do
+MIXED_DATE_FORMATS = {'format': 'mixed'} if int(pd.__version__.split('.')[0]) >= 2 else {}
 
-print(f"Loading dataset from {csv_file_path}...")
-# Load the dataset into a pandas DataFrame
-data = pd.read_csv(csv_file_path)
-print(f"Initial dataset loaded with shape: {data.shape}")
-print(data.head())
 
 # 0. Replace all_reviews values with NaN where the value is a valid date
-print("\nReplacing valid dates in all_reviews with NaN...")
-data['all_reviews'] = data['all_reviews'].apply(lambda x: None if pd.to_datetime(x, errors='coerce') is not pd.NaT else x)
-print(f"Data shape after replacing valid dates in all_reviews: {data.shape}")
+def replace_review_dates(data):
+    data['all_reviews'] = data['all_reviews'].apply(lambda x: None if pd.to_datetime(x, errors='coerce') is not pd.NaT else x)
+    # Keep the column as strings even when no value survives (apply would infer float for all-NaN input)
+    data['all_reviews'] = data['all_reviews'].astype(object)
+    return data
+
+def replace_review_dates_vectorized(data):
+    reviews = data['all_reviews'].astype(object)
+    # Review summaries contain a '%' (e.g. "- 91% of the 7,030 user reviews"), which no date parser accepts,
+    # so only the remaining values need parsing: in one to_datetime call, each distinct value once
+    candidates = ~reviews.str.contains('%', regex=False, na=False)
+    try:
+        is_date = pd.to_datetime(reviews[candidates], errors='coerce', **MIXED_DATE_FORMATS).notna()
+    except (TypeError, ValueError):
+        return replace_review_dates(data)  # e.g. a mix of timezone-aware and naive dates
+    data['all_reviews'] = reviews.mask(is_date.reindex(reviews.index, fill_value=False), None)
+    return data
+
 
 # 1. Clean URLs (remove tracking parameters)
-print("\nCleaning URLs...")
 def clean_url(url):
+    if pd.isna(url):
+        return url  # Missing urls stay missing (data_merging no longer fills them with "Unknown")
     parsed = urlparse(url)
     return urlunparse(parsed._replace(query=""))
 
-data['url'] = data['url'].apply(clean_url)
-data['img_url'] = data['img_url'].apply(clean_url)
-print("URLs cleaned.")
-print(f"Data shape after cleaning URLs: {data.shape}")
+def clean_urls(data):
+    data['url'] = data['url'].apply(clean_url)
+    data['img_url'] = data['img_url'].apply(clean_url)
+    return data
+
+# Lower-case scheme, a host, no fragment and no whitespace, brackets or control characters: for these
+# URLs urlparse/urlunparse only drop the "?query" part, so it can be cut off with one string operation
+simple_url_pattern = r"[a-z][a-z0-9+.\-]*://[^/?#\[\]\s\x00-\x1f]+[^?#\[\]\s\x00-\x1f]*(?:\?[^#\s\x00-\x1f]*)?\Z"
+
+def clean_url_series(series):
+    simple = series.str.match(simple_url_pattern).fillna(False).astype(bool)
+    cleaned = series.str.replace(r"\?.*", "", n=1, regex=True)
+    # Anything else goes through urlparse so the result is exactly what clean_url returns
+    if not simple.all():
+        cleaned[~simple] = series[~simple].apply(clean_url)
+    return cleaned
+
+def clean_urls_vectorized(data):
+    # Store urls are almost all different, but catalogs repeat many image urls, so each distinct
+    # image url is cleaned once (see value_caches)
+    data['url'] = clean_url_series(data['url'])
+    data['img_url'] = value_caches['img_url'].apply(data['img_url'])[0]
+    return data
+
 
 # 2. Split Categories and Tags into separate rows
-print("\nSplitting categories and popular tags...")
-data['categories'] = data['categories'].str.split(" ")
-data['popu_tags'] = data['popu_tags'].str.split(" ")
-print("Categories and tags split into lists.")
-print(f"Data shape after splitting categories and tags: {data.shape}")
+def split_tags(data):
+    data['categories'] = data['categories'].str.split(" ")
+    data['popu_tags'] = data['popu_tags'].str.split(" ")
+    return data
+
 
 # 3. Parse User Reviews
-print("\nParsing user reviews...")
 def parse_reviews_vectorized(series):
     sentiment_pattern = r"([A-Za-z\s]+)"  # This captures the sentiment part, e.g., 'Mixed', 'Mostly Positive', etc.
     reviews_pattern = r"\(([\d,]+)\)"  # This captures the review count, e.g., '2,234'
@@ -57,19 +109,51 @@ def parse_reviews_vectorized(series):
 
     return sentiments, reviews, percentages
 
-data["last30_sentiment"], data["last30_reviews"], data["last30_percentage"] = parse_reviews_vectorized(data["user_reviews"])
-data["all_sentiment"], data["all_reviews"], data["all_percentage"] = parse_reviews_vectorized(data["all_reviews"])
-print("User reviews parsed.")
-print(f"Data shape after parsing user reviews: {data.shape}")
+def parse_reviews(data):
+    data["last30_sentiment"], data["last30_reviews"], data["last30_percentage"] = parse_reviews_vectorized(data["user_reviews"])
+    data["all_sentiment"], data["all_reviews"], data["all_percentage"] = parse_reviews_vectorized(data["all_reviews"])
+    # The review columns get their final types here, as parse_reviews_single_pass gives them
+    return data.astype({column: column_types[column] for column in columns_to_update_last30})
+
+# The usual summary, "Very Positive,(7,030),- 91% of the ...", is matched directly. Anything else goes
+# through three lookaheads, each finding the first match of one of the patterns in parse_reviews_vectorized.
+# Either way a value is matched once and gets the same parts as the three separate searches.
+review_summary_pattern = re.compile(r"([A-Za-z\s]+),\(([\d,]+)\),- (\d+)%")
+review_parts_pattern = re.compile(r"(?:(?=[^A-Za-z\s]*([A-Za-z\s]+)))?(?:(?=.*?\(([\d,]+)\)))?(?:(?=.*?(\d+)%))?", re.DOTALL)
+
+def parse_review_series(series):
+    """
+    Splits each review summary into its sentiment, review count and percentage with one regex match.
+    Returns them as a categorical, an Int32 and an Int8 Series (see column_types).
+    """
+    summary, parts = review_summary_pattern.match, review_parts_pattern.match
+    sentiments, counts, percentages = [], [], []
+    for value in series.to_numpy():
+        sentiment = count = percentage = None
+        if isinstance(value, str):
+            sentiment, count, percentage = (summary(value) or parts(value)).groups()
+        sentiments.append(sentiment)
+        counts.append(None if count is None else int(count.replace(",", "")))
+        percentages.append(None if percentage is None else int(percentage))
+    return (pd.Series(pd.Categorical(sentiments), index=series.index),
+            pd.Series(pd.array(counts, dtype=column_types['all_reviews']), index=series.index),
+            pd.Series(pd.array(percentages, dtype=column_types['all_percentage']), index=series.index))
+
+def parse_reviews_single_pass(data):
+    data["last30_sentiment"], data["last30_reviews"], data["last30_percentage"] = parse_review_series(data["user_reviews"])
+    data["all_sentiment"], data["all_reviews"], data["all_percentage"] = parse_review_series(data["all_reviews"])
+    return data
+
 
 # 4. Standardize Date Format
-print("\nStandardizing date format...")
-data['date'] = pd.to_datetime(data['date'], errors='coerce').dt.strftime('%Y-%m-%d')
-print("Dates standardized.")
-print(f"Data shape after standardizing date format: {data.shape}")
+def standardize_dates(data):
+    # Dates are kept as datetime64 at midnight, which to_csv writes as YYYY-MM-DD. Each value is parsed
+    # on its own, so a chunk gives the same dates whatever format its first value happens to use
+    data['date'] = pd.to_datetime(data['date'], errors='coerce', **MIXED_DATE_FORMATS).dt.normalize()
+    return data
+
 
 # 5. Extract Price and Mark Free-to-Play Games
-print("\nExtracting price and marking free-to-play games...")
 def extract_price(price):
     if pd.isna(price):
         return None
@@ -83,26 +167,44 @@ def extract_price(price):
         return float(cleaned_price)
     return None
 
-data['price'] = data['price'].apply(extract_price)
-print("Prices extracted.")
-print(f"Data shape after extracting prices: {data.shape}")
+def extract_prices(data):
+    data['price'] = data['price'].apply(extract_price)
+    return data
+
+price_pattern = r"(\$\d{1,3}(?:[.,]\d{3})*(?:[.,]\d+)?|\b\d{1,3}(?:[.,]\d{3})*(?:[.,]\d+)?(?=\s*USD|\s*$))"
+
+def extract_prices_vectorized(data):
+    # A catalog has few distinct price strings, so each one is parsed once and the results broadcast back
+    codes, prices = pd.factorize(data['price'])
+    prices = pd.Series(prices, dtype=object)
+    amounts = prices.str.extract(price_pattern, expand=False).str.replace(r"[$,]", "", regex=True).astype(float)
+    amounts = amounts.mask(prices.str.contains('Free', regex=False), 0.0)
+    # Missing prices have code -1, which picks the NaN appended at the end
+    data['price'] = np.append(amounts.to_numpy(), np.nan)[codes]
+    return data
+
 
 # 6. Consolidate PEGI Ratings
-print("\nConsolidating PEGI ratings...")
-data['pegi_rating'] = data['pegi'].str.split(",").apply(lambda x: [rating.strip() for rating in x] if isinstance(x, list) else None)
-data.drop(columns=['pegi', 'pegi_url'], inplace=True)
-print("PEGI ratings consolidated.")
-print(f"Data shape after consolidating PEGI ratings: {data.shape}")
+def consolidate_pegi(data):
+    data['pegi_rating'] = data['pegi'].str.split(",").apply(lambda x: [rating.strip() for rating in x] if isinstance(x, list) else None)
+    data.drop(columns=['pegi', 'pegi_url'], inplace=True)
+    return data
+
+def consolidate_pegi_vectorized(data):
+    # Stripping the value and splitting on commas with their surrounding whitespace strips every rating
+    data['pegi_rating'] = data['pegi'].str.strip().str.split(r"\s*,\s*", regex=True)
+    data.drop(columns=['pegi', 'pegi_url'], inplace=True)
+    return data
+
 
 # 7. Combine and Clean Descriptions
-print("\nCombining and cleaning descriptions...")
-data['description'] = data['desc'].combine_first(data['full_desc']).str.strip()
-data.drop(columns=['desc', 'full_desc'], inplace=True)
-print("Descriptions cleaned and combined.")
-print(f"Data shape after combining and cleaning descriptions: {data.shape}")
+def combine_descriptions(data):
+    data['description'] = data['desc'].combine_first(data['full_desc']).str.strip()
+    data.drop(columns=['desc', 'full_desc'], inplace=True)
+    return data
+
 
 # 8. Parse System Requirements
-print("\nParsing system requirements...")
 minimum_pattern = re.compile(r"Minimum:(.+?)(Recommended|$)", re.DOTALL)
 recommended_pattern = re.compile(r"Recommended:(.+)", re.DOTALL)
 
@@ -115,51 +217,459 @@ def parse_requirements_optimized(req):
     recommended = recommended_match.group(1).strip() if recommended_match else None
     return minimum, recommended
 
-parsed_requirements = data['requirements'].dropna().map(parse_requirements_optimized)
-data['min_requirements'] = parsed_requirements.apply(lambda x: x[0] if x else None)
-data['rec_requirements'] = parsed_requirements.apply(lambda x: x[1] if x else None)
-data.drop(columns=['requirements'], inplace=True)
-print("System requirements parsed.")
-print(f"Data shape after parsing system requirements: {data.shape}")
+def parse_requirements(data):
+    parsed_requirements = data['requirements'].dropna().map(parse_requirements_optimized)
+    data['min_requirements'] = parsed_requirements.apply(lambda x: x[0] if x else None)
+    data['rec_requirements'] = parsed_requirements.apply(lambda x: x[1] if x else None)
+    data.drop(columns=['requirements'], inplace=True)
+    return data
+
+# Same match as minimum_pattern, with a single group so str.extract can return a Series
+minimum_only_pattern = re.compile(r"Minimum:(.+?)(?:Recommended|$)", re.DOTALL)
+
+def split_requirements(requirements):
+    return pd.DataFrame({
+        'min_requirements': requirements.str.extract(minimum_only_pattern, expand=False).str.strip(),
+        'rec_requirements': requirements.str.extract(recommended_pattern, expand=False).str.strip(),
+    })
+
+def parse_requirements_vectorized(data):
+    # Many games share the same requirement blocks, so each distinct block is parsed once
+    parsed = value_caches['requirements'].apply(data['requirements'])
+    data['min_requirements'] = parsed[0]
+    data['rec_requirements'] = parsed[1]
+    data.drop(columns=['requirements'], inplace=True)
+    return data
+
 
 # 9. Handle Missing Values
-print("\nHandling missing values...")
-data.replace('-', None, inplace=True)
-print("Missing values handled.")
-print(f"Data shape after handling missing values: {data.shape}")
+def handle_missing_values(data):
+    data.replace('-', None, inplace=True)
+    return data
+
 
 # 10. Select and Order Columns
-print("\nSelecting and ordering columns for final output...")
 ordered_columns = ['url', 'img_url', 'name', 'all_sentiment', 'all_reviews', 'all_percentage', 'last30_sentiment', 'last30_reviews',
                    'last30_percentage', 'date', 'price', 'description', 'min_requirements', 'rec_requirements']  # Adjust order as needed
-data = data[ordered_columns]
-print(f"Data shape after selecting and ordering columns: {data.shape}")
 
-# 10.5 Replace specific values in rows
-print("\nReplacing specific values in rows where the reviews are empty...")
+def select_columns(data):
+    # .loc returns a new frame rather than a slice of the old one, so the steps below can modify it in place
+    return data.loc[:, ordered_columns]
+
 
-# Columns to update
+# 10.5 Mark rows where the reviews are empty
 columns_to_update_last30 = ['all_sentiment', 'all_reviews', 'all_percentage', 'last30_sentiment', 'last30_reviews', 'last30_percentage']
 columns_to_update_all = ['all_sentiment', 'all_reviews', 'all_percentage']
 
-# Ensure columns are of object (string) type
-data[columns_to_update_last30] = data[columns_to_update_last30].astype(str)
-data[columns_to_update_all] = data[columns_to_update_all].astype(str)
-
-# Replace values with empty data
-data.loc[data['last30_sentiment'].str.contains('user reviews', na=False, case=False), columns_to_update_last30] = "No user reviews"
-data.loc[data['all_reviews'].str.contains('nan', na=False, case=False), columns_to_update_all] = "No user reviews"
+def mark_missing_reviews(data):
+    # Only the sentiment columns say "No user reviews"; the review counts and percentages stay missing.
+    # The sentiments are categorical, so str.contains only looks at each distinct sentiment once.
+    no_recent_reviews = data['last30_sentiment'].str.contains('user reviews', na=False, case=False)
+    data.loc[no_recent_reviews, columns_to_update_last30] = None
+    no_reviews = data['all_reviews'].isna()
+    data.loc[no_reviews, columns_to_update_all] = None
+    for column, rows in (('last30_sentiment', no_recent_reviews), ('all_sentiment', no_reviews)):
+        if "No user reviews" not in data[column].cat.categories:
+            data[column] = data[column].cat.add_categories("No user reviews")
+        data.loc[rows, column] = "No user reviews"
+    return data
 
-print("Specific values replaced.")
-print(f"Data shape after replacing specific values: {data.shape}")
 
 # 11. Drop rows with NaN values
-print("\nDropping rows with NaN values...")
-data.dropna(subset=['name'], inplace=True)  # Adding inplace=True
-print(data['all_sentiment'].unique())
-
-# Save the cleaned dataset
-print("\nSaving file...")
-cleaned_file_path = os.path.join(files_directory, "cleaned_steam_data.csv")
-data.to_csv(cleaned_file_path, index=False)
-print(f"\nData cleaning complete. Saved to '{cleaned_file_path}'.")
+def drop_unnamed(data):
+    data.dropna(subset=['name'], inplace=True)  # Adding inplace=True
+    return data
+
+
+# 12. Apply the column types
+# Sentiments have a handful of distinct values, percentages fit in 8 bits and review counts in 32.
+# The nullable integer types keep missing counts as <NA> instead of turning the column into floats.
+column_types = {
+    'all_sentiment': 'category',
+    'all_reviews': 'Int32',
+    'all_percentage': 'Int8',
+    'last30_sentiment': 'category',
+    'last30_reviews': 'Int32',
+    'last30_percentage': 'Int8',
+    'date': 'datetime64[ns]',
+    'price': 'float32',
+}
+
+def apply_column_types(data):
+    return data.astype(column_types)
+
+
+def read_cleaned_dataset(path):
+    """
+    Reads a file written by this script back with the column types of step 12.
+    The other columns are read as strings.
+    """
+    dtypes = dict.fromkeys(ordered_columns, str)
+    dtypes.update({column: dtype for column, dtype in column_types.items() if column != 'date'})
+    return pd.read_csv(path, dtype=dtypes, parse_dates=['date'])
+
+
+# The cleaning steps in the order they are applied
+STEPS = [
+    ("0", "Replacing valid dates in all_reviews with NaN", replace_review_dates),
+    ("1", "Cleaning URLs", clean_urls),
+    ("2", "Splitting categories and popular tags", split_tags),
+    ("3", "Parsing user reviews", parse_reviews),
+    ("4", "Standardizing date format", standardize_dates),
+    ("5", "Extracting price and marking free-to-play games", extract_prices),
+    ("6", "Consolidating PEGI ratings", consolidate_pegi),
+    ("7", "Combining and cleaning descriptions", combine_descriptions),
+    ("8", "Parsing system requirements", parse_requirements),
+    ("9", "Handling missing values", handle_missing_values),
+    ("10", "Selecting and ordering columns for final output", select_columns),
+    ("10.5", "Replacing specific values in rows where the reviews are empty", mark_missing_reviews),
+    ("11", "Dropping rows with NaN values", drop_unnamed),
+    ("12", "Applying the column types", apply_column_types),
+]
+
+
+# Column-at-a-time versions of the steps that call a Python function per row. The row-wise
+# functions above stay as the reference implementation they are tested against.
+VECTORIZED_STEPS = {
+    replace_review_dates: replace_review_dates_vectorized,
+    clean_urls: clean_urls_vectorized,
+    parse_reviews: parse_reviews_single_pass,
+    extract_prices: extract_prices_vectorized,
+    consolidate_pegi: consolidate_pegi_vectorized,
+    parse_requirements: parse_requirements_vectorized,
+}
+
+
+# The vectorized image url and requirements steps normalize each distinct value once per chunk, and keep
+# the results for the most recently used values of each column, up to NORMALIZE_CACHE_BYTES, for later
+# chunks. clean_file and clean_incremental start each run with empty caches.
+value_caches = {
+    'img_url': ValueCache(clean_url_series, NORMALIZE_CACHE_BYTES),
+    'requirements': ValueCache(split_requirements, NORMALIZE_CACHE_BYTES, outputs=2),
+}
+
+
+def clear_value_caches():
+    for cache in value_caches.values():
+        cache.clear()
+
+
+def print_value_cache_stats():
+    """
+    Prints, per cached column, how many values were cleaned, how many distinct values that came to
+    and how many of those were found in the cache, i.e. how much normalization work was saved.
+    """
+    print(f"\n{'Column':15s} {'Values':>10s} {'Distinct':>10s} {'Cache hits':>11s} {'Normalized':>11s} {'Saved':>7s}")
+    for column, cache in value_caches.items():
+        stats = cache.stats()
+        if stats["values"]:
+            print(f"{column:15s} {stats['values']:10d} {stats['distinct']:10d} {stats['hits']:11d} "
+                  f"{stats['normalized']:11d} {stats['saved']:7.1%}")
+
+
+def clean_data(data, verbose=True, reference=False):
+    """
+    Applies every cleaning step to the DataFrame and returns the cleaned DataFrame.
+    Each step is timed as its own span (see instrumentation.py).
+    With reference=True the original row-wise implementations are used instead of the vectorized ones.
+    """
+    for number, description, step in STEPS:
+        if verbose:
+            print(f"\n{number}. {description}...")
+        with span(f"{number}. {step.__name__}", rows_in=len(data)) as current:
+            data = step(data) if reference else VECTORIZED_STEPS.get(step, step)(data)
+            current["rows_out"] = len(data)
+        if verbose:
+            print(f"Data shape after step {number}: {data.shape}")
+    return data
+
+
+def read_dataset(input_path, chunk_rows=None):
+    """
+    Reads the merged dataset with every column as a string, so each chunk is typed the same way
+    as the whole file would be. Returns a DataFrame, or an iterator of DataFrames with chunk_rows.
+    """
+    return pd.read_csv(input_path, dtype=str, chunksize=chunk_rows)
+
+
+def clean_file(input_path, output_path, chunk_rows=None, workers=1, reference=False):
+    """
+    Cleans input_path and writes the result to output_path. Returns the number of rows written.
+
+    With chunk_rows, the file is read, cleaned and appended to the output chunk_rows rows at a time,
+    so peak memory depends on the chunk size rather than on the file size. Every step works row by
+    row, so the output is identical to cleaning the whole file at once.
+    With workers > 1 the chunks (DEFAULT_CHUNK_ROWS rows unless chunk_rows is given) are cleaned
+    in parallel worker processes and written in their original order.
+    reference=True uses the original row-wise step implementations (see clean_data).
+    """
+    clear_value_caches()
+    if workers > 1 and not chunk_rows:
+        chunk_rows = DEFAULT_CHUNK_ROWS
+    if not chunk_rows:
+        with span("load") as current:
+            data = read_dataset(input_path)
+            current["rows_out"] = len(data)
+        print(f"Initial dataset loaded with shape: {data.shape}")
+        print(data.head())
+
+        data = clean_data(data, reference=reference)
+        print(data['all_sentiment'].unique())
+
+        # Save the cleaned dataset
+        print("\nSaving file...")
+        with span("save", rows_in=len(data)):
+            data.to_csv(output_path, index=False)
+        return len(data)
+
+    # Write to a temporary file first so an interrupted run never leaves a half-written output behind
+    partial_path = output_path + ".partial"
+    rows = 0
+    sentiments = {}
+    with open(partial_path, "w", newline="") as output:
+        # The header comes first, on its own, so it is written even when the input has no rows
+        pd.DataFrame(columns=ordered_columns).to_csv(output, index=False)
+        with read_dataset(input_path, chunk_rows) as chunks:
+            for number, (text, chunk_rows_out, chunk_sentiments) in enumerate(clean_chunks(chunks, workers, reference), start=1):
+                with span("save", rows_in=chunk_rows_out):
+                    output.write(text)
+                rows += chunk_rows_out
+                sentiments.update(dict.fromkeys(chunk_sentiments))
+                print(f"Chunk {number}: {rows} rows cleaned so far")
+    os.replace(partial_path, output_path)
+    print(list(sentiments))
+    return rows
+
+
+def clean_chunk(chunk, reference=False):
+    """
+    Cleans one chunk and returns it rendered as CSV rows (without header), its row count and its
+    all_sentiment values. Runs in a worker process in parallel mode, so formatting the CSV
+    is spread over the workers too and only text is sent back.
+    """
+    chunk = clean_data(chunk, verbose=False, reference=reference)
+    return chunk.to_csv(index=False, header=False), len(chunk), list(chunk['all_sentiment'].unique())
+
+
+def _clean_chunk_in_worker(chunk, reference=False, trace_memory=None):
+    # The parent's Recorder cannot see spans recorded in a worker process, so when the run is being
+    # measured (trace_memory is not None) the worker records its own and returns them with the result
+    if trace_memory is None:
+        return clean_chunk(chunk, reference), []
+    with collect_spans(trace_memory) as recorder:
+        result = clean_chunk(chunk, reference)
+    return result, recorder.steps
+
+
+def _timed_chunks(chunks):
+    # Time reading each chunk separately from cleaning it
+    while True:
+        with span("load") as current:
+            chunk = next(chunks, None)
+            current["rows_out"] = 0 if chunk is None else len(chunk)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def clean_chunks(chunks, workers=1, reference=False):
+    """
+    Yields clean_chunk results in input order. With more than one worker the chunks are cleaned
+    in a process pool; at most two chunks per worker are in flight, so memory stays bounded while
+    every core is kept busy, and results are written in the order the chunks were read.
+    The cleaning steps timed in the workers are added to the active Recorder.
+    """
+    if workers <= 1:
+        for chunk in _timed_chunks(chunks):
+            yield clean_chunk(chunk, reference)
+        return
+
+    recorder = active_recorder()
+    trace_memory = None if recorder is None else recorder.trace_memory
+
+    def next_result():
+        with span("wait for workers"):
+            result, steps = pending.popleft().result()
+        if recorder is not None:
+            recorder.add_worker_steps(steps)
+        return result
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in _timed_chunks(chunks):
+            pending.append(executor.submit(_clean_chunk_in_worker, chunk, reference, trace_memory))
+            if len(pending) >= 2 * workers:
+                yield next_result()
+        while pending:
+            yield next_result()
+
+
+def row_fingerprints(data):
+    """
+    Returns each row's key, its url as clean_urls writes it, and a 64-bit hash of all of its raw values.
+    """
+    keys = clean_url_series(data['url'])
+    hashes = pd.util.hash_pandas_object(data, index=False).to_numpy()
+    return keys, hashes
+
+
+def default_index_path(output_path):
+    return os.path.splitext(output_path)[0] + "_index.csv"
+
+
+index_columns = {'url': str, 'row_hash': 'uint64', 'offset': 'int64', 'length': 'int64', 'crc': 'int64',
+                 'pipeline': str}
+
+def pipeline_version(reference=False):
+    """Identifies the cleaning steps that wrote an output: CLEANING_VERSION and the mode."""
+    return f"{CLEANING_VERSION}-{'reference' if reference else 'vectorized'}"
+
+def read_row_index(index_path, pipeline=None):
+    """
+    Reads an index written by clean_incremental, or returns None if there is none in this format or
+    its rows were written by other cleaning steps than pipeline (default: the vectorized steps).
+    """
+    if not os.path.exists(index_path):
+        return None
+    if list(pd.read_csv(index_path, nrows=0).columns) != list(index_columns):
+        print(f"'{index_path}' is not a row index in the current format; cleaning every row.")
+        return None
+    index = pd.read_csv(index_path, dtype=index_columns)
+    if (index['pipeline'] != (pipeline or pipeline_version())).any():
+        print(f"'{index_path}' was written by other cleaning steps; cleaning every row.")
+        return None
+    return index
+
+
+def csv_rows(data):
+    """
+    Yields each row of data as the bytes DataFrame.to_csv writes for it. pandas writes through the
+    csv module, so reading its output back and writing it row by row gives the same text.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator=os.linesep)
+    for row in csv.reader(io.StringIO(data.to_csv(index=False, header=False))):
+        writer.writerow(row)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def clean_incremental(input_path, output_path, index_path=None, reference=False):
+    """
+    Cleans only the rows of input_path that are new or changed since the last incremental run and
+    copies every other row from the previous output_path. Returns the number of rows written.
+
+    The index file (default: <output>_index.csv) records, by cleaned url, the hash of each input row
+    and where its cleaned row is in the output, with a checksum of that row. A row is reused when its
+    url appears once in the input and its hash is unchanged; a reused row that was dropped last time
+    (e.g. it has no name) stays dropped. The reused rows are copied as bytes, so only the changed rows
+    are parsed, cleaned and formatted. The rows are written in input order, so the output is identical
+    to cleaning the whole file. Without an index that matches the previous output and the current
+    cleaning steps (pipeline_version), every row is cleaned.
+    """
+    clear_value_caches()
+    index_path = index_path or default_index_path(output_path)
+    with span("load") as current:
+        data = read_dataset(input_path).reset_index(drop=True)
+        current["rows_out"] = len(data)
+    print(f"Dataset loaded with shape: {data.shape}")
+
+    with open(output_path, "rb") if os.path.exists(output_path) else contextlib.nullcontext() as previous:
+        # The old output is mapped rather than read, so its rows are only loaded as they are copied
+        old_output = mmap.mmap(previous.fileno(), 0, access=mmap.ACCESS_READ) if previous and os.path.getsize(output_path) else b""
+        try:
+            with span("fingerprint", rows_in=len(data)) as current:
+                keys, hashes = row_fingerprints(data)
+                unique = ~keys.duplicated(keep=False).to_numpy()
+                unchanged = np.zeros(len(data), dtype=bool)
+                offsets, lengths, checksums = (np.zeros(len(data), dtype=np.int64) for _ in range(3))
+                index = read_row_index(index_path, pipeline_version(reference)) if old_output else None
+                if index is not None:
+                    # Only look up urls found in the index (-1 otherwise, which fails on an empty index)
+                    found = pd.Index(index['url']).get_indexer(keys)
+                    known = found >= 0
+                    unchanged[known] = unique[known] & (index['row_hash'].to_numpy()[found[known]] == hashes[known])
+                    offsets[known] = index['offset'].to_numpy()[found[known]]
+                    lengths[known] = index['length'].to_numpy()[found[known]]
+                    checksums[known] = index['crc'].to_numpy()[found[known]]
+                    # Check each reused row is still where the index says, in case the output was rewritten since
+                    for position in np.flatnonzero(unchanged & (lengths > 0)):
+                        row = old_output[offsets[position]:offsets[position] + lengths[position]]
+                        if zlib.crc32(row) != checksums[position]:
+                            print(f"The index does not match '{output_path}'; cleaning every row.")
+                            unchanged[:] = False
+                            break
+                current["rows_out"] = int(unchanged.sum())
+
+            print(f"{int(unchanged.sum())} unchanged rows reused, {int((~unchanged).sum())} new or changed rows to clean")
+            cleaned = clean_data(data[~unchanged].copy(), verbose=False, reference=reference)
+
+            # Write the rows in input order, recording where each one ends up for the next run's index
+            partial_path = output_path + ".partial"
+            with span("save", rows_in=len(data)) as current, open(partial_path, "wb") as output:
+                output.write(pd.DataFrame(columns=ordered_columns).to_csv(index=False).encode())
+                cleaned_rows = dict(zip(cleaned.index, csv_rows(cleaned)))
+                new_offsets = np.zeros(len(data), dtype=np.int64)
+                new_lengths = np.zeros(len(data), dtype=np.int64)
+                new_checksums = np.zeros(len(data), dtype=np.int64)
+                rows = 0
+                for position in range(len(data)):
+                    if unchanged[position]:
+                        row = old_output[offsets[position]:offsets[position] + lengths[position]]
+                    else:
+                        row = cleaned_rows.get(position, b"")  # Missing if the cleaning steps dropped it
+                    if row:
+                        new_offsets[position] = output.tell()
+                        new_lengths[position] = len(row)
+                        new_checksums[position] = zlib.crc32(row)
+                        output.write(row)
+                        rows += 1
+                current["rows_out"] = rows
+        finally:
+            if old_output:
+                old_output.close()
+
+    # Replace the output before writing the index: if the run stops in between, the checksums
+    # of the old index no longer match the output and the next run cleans every row
+    os.replace(partial_path, output_path)
+    pd.DataFrame({'url': keys[unique], 'row_hash': hashes[unique], 'offset': new_offsets[unique],
+                  'length': new_lengths[unique], 'crc': new_checksums[unique],
+                  'pipeline': pipeline_version(reference)}).to_csv(index_path, index=False)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean the merged Steam dataset.")
+    parser.add_argument("--input", default=os.path.join(files_directory, "merged_steam_data.csv"))
+    parser.add_argument("--output", default=os.path.join(files_directory, "cleaned_steam_data.csv"))
+    parser.add_argument("--chunk-rows", type=int,
+                        help="Clean the file this many rows at a time to bound memory (default: whole file at once)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Clean chunks in this many processes (0 = one per CPU core)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Clean only rows that are new or changed since the last incremental run")
+    parser.add_argument("--index", help="Row hash index for --incremental (default: <output>_index.csv)")
+    parser.add_argument("--reference", action="store_true",
+                        help="Use the original row-by-row implementations of the cleaning steps")
+    parser.add_argument("--summary", help="Write per-step timings, row counts and peak memory to this JSON file")
+    parser.add_argument("--profile", help="Write a cProfile dump of the whole run to this file")
+    parser.add_argument("--trace-memory", action="store_true", help="Also record peak Python allocations per step (slower)")
+    args = parser.parse_args()
+    if args.incremental and (args.chunk_rows or args.workers != 1):
+        parser.error("--incremental cleans the changed rows at once; it cannot be combined with --chunk-rows or --workers")
+
+    with run_instrumentation(args.summary, args.profile, args.trace_memory):
+        print(f"Loading dataset from {args.input}...")
+        if args.incremental:
+            rows = clean_incremental(args.input, args.output, args.index, args.reference)
+        else:
+            rows = clean_file(args.input, args.output, args.chunk_rows, args.workers or os.cpu_count(), args.reference)
+        print(f"\nData cleaning complete. {rows} rows saved to '{args.output}'.")
+        # Worker processes keep their own caches, so the statistics only cover a run in this process
+        if not args.reference and (args.incremental or (args.workers or os.cpu_count()) == 1):
+            print_value_cache_stats()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,27 @@
 # Second Step
+import argparse
+import csv
+import heapq
 import os
+import shutil
+import tempfile
 import pandas as pd
 
-def clean_and_merge(file1, file2, output_path):
+# Rows read at a time when spilling the inputs into partitions
+SPILL_CHUNK_ROWS = 100000
+
+
+def clean_and_merge(file1, file2, output_path, partitions=None, chunk_rows=SPILL_CHUNK_ROWS):
     """
     Cleans and merges two CSV files based on the 'url' column.
     Outputs the merged dataset to a specified file.
+    With partitions, the join runs out of core (see merge_partitioned); the output is the same.
     """
     try:
+        if partitions:
+            merge_partitioned(file1, file2, output_path, partitions, chunk_rows)
+            return
+
         # Read the first CSV
         print(f"Reading {file1}...")
         df1 = pd.read_csv(file1, dtype=str)
@@ -20,23 +34,16 @@ def clean_and_merge(file1, file2, output_path):
 
         # Inspecting the datasets
         print("\nCleaning and inspecting the datasets...")
-
-        # Drop rows with missing 'url' (essential for the join)
-        df1 = df1.dropna(subset=['url'])
-        df2 = df2.dropna(subset=['url'])
-
-        # Drop duplicate 'url' entries if any
-        df1 = df1.drop_duplicates(subset=['url'])
-        df2 = df2.drop_duplicates(subset=['url'])
+        df1 = drop_missing_and_duplicate_urls(df1)
+        df2 = drop_missing_and_duplicate_urls(df2)
 
         # Merge the datasets on 'url'
         print("\nMerging datasets on 'url'...")
         merged_df = pd.merge(df1, df2, on="url", how="inner")
         print(f"Merged dataset shape: {merged_df.shape}")
 
-        # Additional Cleaning: Handle missing values in merged data
-        print("\nHandling missing values...")
-        merged_df = merged_df.fillna("Unknown")  # Replace missing values with "Unknown" or any strategy
+        # Missing values are left empty rather than filled with a placeholder, so they are read back
+        # as real nulls; data_cleaning.py then gives every column its type (see column_types there)
 
         # Save the merged dataset to a CSV file
         merged_df.to_csv(output_path, index=False)
@@ -45,6 +52,102 @@ def clean_and_merge(file1, file2, output_path):
     except Exception as e:
         print(f"Error occurred: {e}")
 
+
+def drop_missing_and_duplicate_urls(df):
+    # Drop rows with missing 'url' (essential for the join)
+    df = df.dropna(subset=['url'])
+    # Drop duplicate 'url' entries if any, keeping the first
+    return df.drop_duplicates(subset=['url'])
+
+
+def spill_partitions(file_path, spill_directory, prefix, partitions, chunk_rows):
+    """
+    Reads file_path in chunks and appends each row to spill_directory/<prefix>_<n>.csv, where n is
+    a hash of its url. Every copy of a url lands in the same partition, in file order, so dropping
+    duplicates per partition keeps the same rows as dropping them over the whole file.
+    A leading _row column records each row's position in the file. Returns the column names.
+    """
+    columns = None
+    rows = 0
+    with pd.read_csv(file_path, dtype=str, chunksize=chunk_rows) as chunks:
+        for chunk in chunks:
+            columns = list(chunk.columns)
+            chunk.insert(0, "_row", range(rows, rows + len(chunk)))
+            rows += len(chunk)
+            chunk = chunk.dropna(subset=['url'])
+            # hash_pandas_object is stable across runs and processes, unlike hash()
+            numbers = pd.util.hash_pandas_object(chunk['url'], index=False) % partitions
+            for number, part in chunk.groupby(numbers.to_numpy()):
+                path = os.path.join(spill_directory, f"{prefix}_{number}.csv")
+                part.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+    if columns is None:
+        columns = list(pd.read_csv(file_path, dtype=str, nrows=0).columns)
+    print(f"{file_path}: {rows} rows spilled into {partitions} partitions")
+    return columns
+
+
+def merge_partitioned(file1, file2, output_path, partitions=16, chunk_rows=SPILL_CHUNK_ROWS):
+    """
+    Joins file1 and file2 on 'url' with memory bounded by one partition rather than by the files.
+
+    Both inputs are hash-partitioned by url into spill files next to the output. Matching urls end up in
+    the same partition, so each pair of partitions is deduplicated and joined on its own, and the
+    result sorted by the row's position in file1. The sorted partition results are then merged into
+    the output in file1 order, which is the order the in-memory pd.merge produces.
+    """
+    spill_directory = tempfile.mkdtemp(prefix="merge-spill-", dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        columns1 = spill_partitions(file1, spill_directory, "left", partitions, chunk_rows)
+        columns2 = spill_partitions(file2, spill_directory, "right", partitions, chunk_rows)
+        # The same column names (and _x/_y suffixes) as merging the whole files; merging empty frames
+        # would reorder the columns, so one placeholder row is merged instead
+        header = list(pd.merge(pd.DataFrame([[""] * len(columns1)], columns=columns1),
+                               pd.DataFrame([[""] * len(columns2)], columns=columns2), on="url").columns)
+
+        joined_paths = []
+        for number in range(partitions):
+            left_path = os.path.join(spill_directory, f"left_{number}.csv")
+            right_path = os.path.join(spill_directory, f"right_{number}.csv")
+            if not (os.path.exists(left_path) and os.path.exists(right_path)):
+                continue  # No url of this partition is in both files
+            left = drop_missing_and_duplicate_urls(pd.read_csv(left_path, dtype=str).astype({"_row": int}))
+            right = drop_missing_and_duplicate_urls(pd.read_csv(right_path, dtype=str).drop(columns="_row"))
+            joined = pd.merge(left, right, on="url", how="inner").sort_values("_row")
+            joined_path = os.path.join(spill_directory, f"joined_{number}.csv")
+            joined.to_csv(joined_path, index=False, header=False)
+            joined_paths.append(joined_path)
+            print(f"Partition {number}: {len(joined)} rows joined")
+
+        rows = write_in_row_order(joined_paths, header, output_path)
+        print(f"\nMerged dataset with {rows} rows saved to {output_path}")
+    finally:
+        shutil.rmtree(spill_directory, ignore_errors=True)
+
+
+def write_in_row_order(paths, header, output_path):
+    """
+    Merges CSV files whose first column is an ascending row number into output_path, without that column.
+    Only one row per file is held in memory. Returns the number of rows written.
+    """
+    # Full game descriptions can exceed the csv module's default field size limit
+    csv.field_size_limit(2 ** 31 - 1)
+    files = [open(path, newline="") for path in paths]
+    try:
+        readers = [csv.reader(file) for file in files]
+        rows = 0
+        with open(output_path, "w", newline="") as output:
+            # pandas writes through the csv module too, so the quoting matches DataFrame.to_csv
+            writer = csv.writer(output, lineterminator=os.linesep)
+            writer.writerow(header)
+            for row in heapq.merge(*readers, key=lambda row: int(row[0])):
+                writer.writerow(row[1:])
+                rows += 1
+        return rows
+    finally:
+        for file in files:
+            file.close()
+
+
 if __name__ == "__main__":
     # Get the folder where the script is located
     script_directory = os.path.dirname(os.path.abspath(__file__))
@@ -52,10 +155,17 @@ if __name__ == "__main__":
     # Path to the 'files' folder
     files_directory = os.path.join(script_directory, "files")
 
+    parser = argparse.ArgumentParser(description="Merge the Steam catalog and text content files on 'url'.")
+    parser.add_argument("--partitions", type=int,
+                        help="Join out of core through this many on-disk partitions (default: in memory)")
+    parser.add_argument("--chunk-rows", type=int, default=SPILL_CHUNK_ROWS,
+                        help="Rows read at a time when partitioning the inputs")
+    args = parser.parse_args()
+
     # Specify the paths to the two CSV files
     file1 = os.path.join(files_directory, "steam_data.csv")
     file2 = os.path.join(files_directory, "text_content.csv")
     output_file = os.path.join(files_directory, "merged_steam_data.csv")
 
     # Clean and merge the files
-    clean_and_merge(file1, file2, output_file)
+    clean_and_merge(file1, file2, output_file, args.partitions, args.chunk_rows)
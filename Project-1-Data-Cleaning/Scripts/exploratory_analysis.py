@@ -1,15 +1,22 @@
 # First Step
+import argparse
 import os
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 
-def read_and_clean_data(file_path):
+from column_sketches import ColumnSketch, HashSet, hash_values
+
+def read_and_clean_data(file_path, columns=None):
     """
     Reads a .dat file and performs initial cleaning.
     Adjust this function as needed to match the structure of your .dat files.
+    With columns, only those columns (after stripping the names) are parsed.
     """
     try:
+        # Only parse the wanted columns; the names in the file may still have whitespace around them
+        usecols = None if columns is None else (lambda name: name.strip() in columns)
         # Read the file into a DataFrame
-        df = pd.read_csv(file_path, delimiter="\t", dtype=str)  # Adjust delimiter if needed
+        df = pd.read_csv(file_path, delimiter="\t", dtype=str, usecols=usecols)  # Adjust delimiter if needed
         # Clean column names (example: stripping whitespace)
         df.columns = df.columns.str.strip()
         return df
@@ -17,24 +24,41 @@ def read_and_clean_data(file_path):
         print(f"Error reading {file_path}: {e}")
         return None
 
-def process_directory_common_columns(directory_path):
+def read_columns(file_path):
+    """
+    Returns the cleaned column names of a .dat file, reading only its header and first row.
+    Returns None when the file has no rows or cannot be read, like read_and_clean_data.
+    """
+    try:
+        df = pd.read_csv(file_path, delimiter="\t", dtype=str, nrows=1)
+    except Exception as e:
+        print(f"Error reading {file_path}: {e}")
+        return None
+    if df.empty:
+        return None
+    return list(df.columns.str.strip())
+
+def process_directory_common_columns(directory_path, workers=None):
     """
     Process all .dat files in a directory, joining only on common columns.
+    The columns are found from the file headers alone, then every file is parsed once,
+    in parallel (workers threads, default one per CPU core), for the common columns only.
     """
     common_columns = None
-    all_data = []
+    file_paths = []
 
-    # First pass: Identify common columns
+    # First pass: Identify common columns from the headers
     for filename in os.listdir(directory_path):
         if filename.endswith('.dat'):
             file_path = os.path.join(directory_path, filename)
             print(f"Inspecting columns in {file_path}...")
-            df = read_and_clean_data(file_path)
-            if df is not None and not df.empty:
+            columns = read_columns(file_path)
+            if columns is not None:
+                file_paths.append(file_path)
                 if common_columns is None:
-                    common_columns = set(df.columns)  # Initialize with columns from the first file
+                    common_columns = set(columns)  # Initialize with columns from the first file
                 else:
-                    common_columns.intersection_update(df.columns)  # Keep only common columns
+                    common_columns.intersection_update(columns)  # Keep only common columns
             else:
                 print(f"{filename} was skipped due to empty or invalid data.")
 
@@ -47,75 +71,118 @@ def process_directory_common_columns(directory_path):
     # Convert to a sorted list for consistent ordering
     common_columns = sorted(common_columns)
 
-    # Second pass: Load data with only common columns
-    for filename in os.listdir(directory_path):
-        if filename.endswith('.dat'):
-            file_path = os.path.join(directory_path, filename)
-            print(f"Processing {file_path}...")
-
-            df = read_and_clean_data(file_path)
-            if df is not None and not df.empty:
-                # Keep only the common columns
-                df = df[common_columns]
-                all_data.append(df)
-                print(f"{filename} loaded with shape: {df.shape}")
-            else:
-                print(f"{filename} was skipped due to empty or invalid data.")
+    # Second pass: Load only the common columns, several files at a time. The C parser releases the GIL
+    # while it tokenizes, so threads overlap both the I/O and the parsing without copying frames between processes
+    def load(file_path):
+        df = read_and_clean_data(file_path, set(common_columns))
+        if df is not None and not df.empty:
+            # Put the columns in the common order
+            df = df[common_columns]
+            print(f"{os.path.basename(file_path)} loaded with shape: {df.shape}")
+            return df
+        print(f"{os.path.basename(file_path)} was skipped due to empty or invalid data.")
+        return None
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        # map keeps the directory order, and each frame already holds only the common columns
+        frames = [df for df in executor.map(load, file_paths) if df is not None]
 
     # Combine all DataFrames into one
-    if all_data:
-        combined_data = pd.concat(all_data, ignore_index=True)
+    if frames:
+        combined_data = pd.concat(frames, ignore_index=True)
         print(f"\nAll files combined successfully. Combined DataFrame shape: {combined_data.shape}")
         return combined_data
     else:
         print("\nNo valid data to combine.")
         return None
 
-import pandas as pd
+# Rows read at a time when profiling a CSV file
+PROFILE_CHUNK_ROWS = 100000
 
-def analyze_csv(file_path):
+def profile_csv(file_path, exact=True, chunk_rows=PROFILE_CHUNK_ROWS):
+    """
+    Profiles a CSV file in one pass, chunk_rows rows at a time, so memory does not grow with the file.
+    Returns the row count, the first rows and, per column, the non-null and null counts, its distinct
+    values and, for columns whose values are all numbers, their min, max and mean.
+    The distinct values are an exact HashSet, or with exact=False a fixed-size ColumnSketch.
+    """
+    profile = {"rows": 0, "head": None, "columns": {}}
+    with pd.read_csv(file_path, dtype=str, chunksize=chunk_rows) as chunks:
+        for chunk in chunks:
+            if profile["head"] is None:
+                profile["head"] = chunk.head()
+            profile["rows"] += len(chunk)
+            for name, values in chunk.items():
+                column = profile["columns"].setdefault(name, {
+                    "count": 0, "nulls": 0, "values": HashSet() if exact else ColumnSketch(),
+                    "numeric": True, "min": None, "max": None, "sum": 0.0})
+                present = values.count()
+                column["count"] += present
+                column["nulls"] += len(values) - present
+                column["values"].add(hash_values(values))
+                if column["numeric"]:
+                    numbers = pd.to_numeric(values, errors="coerce").dropna()
+                    # One value that is not a number makes it a text column; it is not parsed again
+                    column["numeric"] = len(numbers) == present
+                    if len(numbers):
+                        column["min"] = numbers.min() if column["min"] is None else min(column["min"], numbers.min())
+                        column["max"] = numbers.max() if column["max"] is None else max(column["max"], numbers.max())
+                        column["sum"] += numbers.sum()
+    if profile["head"] is None:
+        # No rows: only the header is known
+        profile["head"] = pd.read_csv(file_path, dtype=str, nrows=0)
+    return profile
+
+def analyze_csv(file_path, exact=True, chunk_rows=PROFILE_CHUNK_ROWS):
     """
     Analyzes the structure and content of a CSV file.
+    Returns its profile (see profile_csv), or None if the file cannot be read.
     """
     try:
         print(f"\nAnalyzing {file_path}...")
-        df = pd.read_csv(file_path, dtype=str)
+        profile = profile_csv(file_path, exact, chunk_rows)
 
         # Overview of the dataset
-        print(f"Shape of the dataset: {df.shape}")
-        print(f"First few rows:\n{df.head()}\n")
+        print(f"Shape of the dataset: {(profile['rows'], len(profile['head'].columns))}")
+        print(f"First few rows:\n{profile['head']}\n")
 
         # Column-level information
-        print(f"Columns and their types:")
-        print(df.dtypes)
-        print("\nColumn-wise null values:")
-        print(df.isnull().sum())
+        approximate = "" if exact else "~"
+        print(f"{'Column':30s} {'Non-null':>10s} {'Null':>10s} {'Distinct':>10s}")
+        for name, column in profile["columns"].items():
+            print(f"{name:30s} {column['count']:10d} {column['nulls']:10d} {approximate + str(column['values'].count()):>10s}")
 
-        # Basic stats for numerical and categorical columns
+        # Basic stats for numerical columns
         print("\nSample stats for numerical columns:")
-        print(df.describe(include=[float, int]).transpose())
-        print("\nSample stats for categorical columns:")
-        print(df.describe(include=[object]).transpose())
+        for name, column in profile["columns"].items():
+            if column["numeric"] and column["count"]:
+                print(f"{name}: min {column['min']}, max {column['max']}, mean {column['sum'] / column['count']:.4g}")
 
-        return df
+        return profile
     except Exception as e:
         print(f"Error analyzing {file_path}: {e}")
         return None
 
-def compare_csvs(file1, file2):
+def compare_csvs(file1, file2, exact=True, chunk_rows=PROFILE_CHUNK_ROWS):
     """
     Compares the structure and content of two CSV files.
+    Each file is read once; the overlap of a common column is the number of distinct values found
+    in both files, computed from the value hashes (or estimated from sketches with exact=False).
+    Returns the two profiles.
     """
-    df1 = analyze_csv(file1)
-    df2 = analyze_csv(file2)
+    profile1 = analyze_csv(file1, exact, chunk_rows)
+    profile2 = analyze_csv(file2, exact, chunk_rows)
+
+    if profile1 is not None and profile2 is not None:
+        columns1 = list(profile1["head"].columns)
+        columns2 = list(profile2["head"].columns)
 
-    if df1 is not None and df2 is not None:
         # Comparing column names
-        common_columns = set(df1.columns).intersection(set(df2.columns))
+        common_columns = set(columns1).intersection(set(columns2))
         print(f"\nCommon columns ({len(common_columns)}): {common_columns}")
 
-        unique_to_file1 = set(df1.columns) - set(df2.columns)
-        unique_to_file2 = set(df2.columns) - set(df1.columns)
+        unique_to_file1 = set(columns1) - set(columns2)
+        unique_to_file2 = set(columns2) - set(columns1)
         print(f"\nColumns unique to {file1}: {unique_to_file1}")
         print(f"Columns unique to {file2}: {unique_to_file2}")
 
@@ -127,13 +194,18 @@ def compare_csvs(file1, file2):
         if not common_columns:
             print("\nNo common columns to join on.")
         else:
-            # Sampling data for overlaps
             print("\nChecking overlap in data for common columns:")
-            for col in common_columns:
-                overlap = len(pd.merge(df1[[col]], df2[[col]], how='inner'))
-                print(f"{col}: {overlap} overlapping values.")
-
-        return df1, df2
+            approximate = "" if exact else "~"
+            for col in sorted(common_columns):
+                values1 = profile1["columns"].get(col, {}).get("values")
+                values2 = profile2["columns"].get(col, {}).get("values")
+                if values1 is None or values2 is None:
+                    print(f"{col}: 0 overlapping values.")  # One of the files has no rows
+                    continue
+                print(f"{col}: {approximate}{values1.overlap(values2)} overlapping values "
+                      f"(Jaccard similarity {approximate}{values1.jaccard(values2):.3f}).")
+
+        return profile1, profile2
     else:
         print("\nOne or both files could not be analyzed.")
         return None, None
@@ -150,10 +222,17 @@ if __name__ == "__main__":
     file1 = os.path.join(files_directory, "steam_data.csv")  # Replace with the actual file name
     file2 = os.path.join(files_directory, "text_content.csv") # Replace with the actual file name
 
+    parser = argparse.ArgumentParser(description="Profile and compare the two scraped Steam CSV files.")
+    parser.add_argument("--approximate", action="store_true",
+                        help="Estimate distinct counts (within about 1%%) and overlaps with fixed-size sketches "
+                             "instead of exact hash sets")
+    parser.add_argument("--chunk-rows", type=int, default=PROFILE_CHUNK_ROWS, help="Rows read at a time")
+    args = parser.parse_args()
+
     # Analyze and compare the files
-    df1, df2 = compare_csvs(file1, file2)
+    profile1, profile2 = compare_csvs(file1, file2, not args.approximate, args.chunk_rows)
 
-    if df1 is not None and df2 is not None:
+    if profile1 is not None and profile2 is not None:
         # Perform further data cleaning and joining based on analysis
         print("\nYou can now clean and join the data based on the analysis above.")
 
@@ -0,0 +1,162 @@
+# Lightweight per-step timing for the cleaning scripts
+import cProfile
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Windows has no resource module, so the Peak RSS column shows "-" there
+
+
+def peak_rss_mb():
+    """
+    Returns the most memory this process has held in RAM so far, in MB, or None on Windows.
+    """
+    if resource is None:
+        return None
+    # ru_maxrss is a number of bytes on macOS but of kilobytes on Linux
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+class Recorder:
+    """
+    Records one entry per step: wall time, rows in/out, peak RSS and,
+    with trace_memory=True, the peak Python allocation measured by tracemalloc.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.steps = []
+        self._started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+
+    def close(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def span(self, name, rows_in=None):
+        step = {"step": name, "wall_s": None, "rows_in": rows_in, "rows_out": None,
+                "peak_rss_mb": None, "traced_peak_mb": None}
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield step
+        finally:
+            step["wall_s"] = time.perf_counter() - start
+            step["peak_rss_mb"] = peak_rss_mb()
+            if self.trace_memory:
+                step["traced_peak_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            self.steps.append(step)
+
+    def add_worker_steps(self, steps):
+        """
+        Adds steps recorded in a worker process (see collect_spans). They ran alongside the
+        parent's steps, so they are left out of the run's total time.
+        """
+        self.steps.extend(dict(step, worker=True) for step in steps)
+
+    def summary(self):
+        """
+        Totals per step name, in the order the steps first ran. A step that ran once per
+        chunk is counted once with its summed time and rows and its highest memory peak.
+        """
+        totals = {}
+        for step in self.steps:
+            total = totals.setdefault(step["step"], {"calls": 0, "wall_s": 0.0, "rows_in": None, "rows_out": None,
+                                                     "peak_rss_mb": None, "traced_peak_mb": None})
+            total["calls"] += 1
+            total["wall_s"] += step["wall_s"]
+            for key in ("rows_in", "rows_out"):
+                if step[key] is not None:
+                    total[key] = (total[key] or 0) + step[key]
+            for key in ("peak_rss_mb", "traced_peak_mb"):
+                if step[key] is not None:
+                    total[key] = max(total[key] or 0, step[key])
+        return totals
+
+    def print_summary(self):
+        print(f"\n{'Step':45s} {'Calls':>6s} {'Seconds':>9s} {'Rows in':>10s} {'Rows out':>10s} {'Peak RSS MB':>12s}")
+        for name, total in self.summary().items():
+            rss = f"{total['peak_rss_mb']:.1f}" if total["peak_rss_mb"] is not None else "-"
+            rows_in = "-" if total["rows_in"] is None else str(total["rows_in"])
+            rows_out = "-" if total["rows_out"] is None else str(total["rows_out"])
+            print(f"{name:45s} {total['calls']:6d} {total['wall_s']:9.3f} {rows_in:>10s} {rows_out:>10s} {rss:>12s}")
+
+    def write_json(self, path):
+        with open(path, "w") as file:
+            json.dump({"summary": self.summary(), "steps": self.steps,
+                       "total_s": sum(step["wall_s"] for step in self.steps if not step.get("worker"))},
+                      file, indent=2)
+
+
+_recorder = None
+
+
+@contextmanager
+def span(name, rows_in=None):
+    """
+    Times a step with the active Recorder. Set step["rows_out"] inside the block.
+    Outside run_instrumentation nothing is recorded.
+    """
+    if _recorder is None:
+        yield {"step": name, "rows_in": rows_in, "rows_out": None}
+    else:
+        with _recorder.span(name, rows_in) as step:
+            yield step
+
+
+def active_recorder():
+    """
+    Returns the Recorder of the enclosing run_instrumentation block, or None.
+    """
+    return _recorder
+
+
+@contextmanager
+def collect_spans(trace_memory=False):
+    """
+    Records the spans inside the block in a Recorder of their own without printing anything.
+    Used in worker processes, whose steps are sent back and added to the parent's Recorder.
+    """
+    global _recorder
+    previous, _recorder = _recorder, Recorder(trace_memory)
+    try:
+        yield _recorder
+    finally:
+        recorder, _recorder = _recorder, previous
+        recorder.close()
+
+
+@contextmanager
+def run_instrumentation(summary_file=None, profile_file=None, trace_memory=False):
+    """
+    Records every span inside the block, prints a summary table at the end and
+    optionally writes it as JSON (summary_file) and a cProfile dump of the run (profile_file).
+    """
+    global _recorder
+    _recorder = Recorder(trace_memory)
+    profiler = cProfile.Profile() if profile_file else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield _recorder
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile_file)
+            print(f"Profile saved to '{profile_file}' (view it with: python -m pstats {profile_file})")
+        recorder, _recorder = _recorder, None
+        recorder.close()
+        recorder.print_summary()
+        if summary_file:
+            recorder.write_json(summary_file)
+            print(f"Run summary saved to '{summary_file}'.")
@@ -0,0 +1,80 @@
+# Normalize each distinct value of a column once, remembering recent results across chunks
+import sys
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+class ValueCache:
+    """
+    Runs a column-wise normalizer on the distinct values of a Series only and broadcasts the results back.
+
+    normalize takes a Series of distinct values and returns one result per value, in order: a Series,
+    or a DataFrame with one column per output. Results for the most recently used values are kept,
+    up to maxbytes of values and results, so a value repeated in a later call (e.g. the next chunk)
+    is not normalized again. Missing values are not passed to normalize; every output is `missing` for them.
+    """
+
+    def __init__(self, normalize, maxbytes=16 * 1024 * 1024, outputs=1, missing=np.nan):
+        self.normalize = normalize
+        self.maxbytes = maxbytes
+        self.outputs = outputs
+        self.missing = missing
+        self.entries = OrderedDict()  # value -> (results, size in bytes)
+        self.bytes = 0
+        self.values = 0  # Non-missing values passed in
+        self.distinct = 0  # Distinct values per call, summed over the calls
+        self.hits = 0  # Distinct values found in the cache
+
+    def apply(self, series):
+        """Returns a DataFrame with one column per output, aligned with series."""
+        codes, uniques = pd.factorize(series.to_numpy(dtype=object))
+        # One row per distinct value, plus a last row for the missing values (code -1)
+        results = np.empty((len(uniques) + 1, self.outputs), dtype=object)
+        results[-1] = self.missing
+        misses = []
+        if self.entries:
+            lookup, touch = self.entries.get, self.entries.move_to_end
+            for position, cached in enumerate(map(lookup, uniques)):
+                if cached is None:
+                    misses.append(position)
+                else:
+                    results[position] = cached[0]
+                    touch(uniques[position])
+        else:
+            misses = list(range(len(uniques)))  # Nothing cached yet (e.g. the first chunk)
+
+        if misses:
+            missed = uniques[misses]
+            computed = self.normalize(pd.Series(missed, dtype=object))
+            computed = np.asarray(computed, dtype=object).reshape(len(misses), self.outputs)
+            results[misses] = computed
+            for value, row in zip(missed, computed.tolist()):
+                size = sys.getsizeof(value) + sum(map(sys.getsizeof, row))
+                self.entries[value] = (tuple(row), size)
+                self.bytes += size
+            while self.bytes > self.maxbytes:
+                self.bytes -= self.entries.popitem(last=False)[1][1]
+
+        self.values += int(np.count_nonzero(codes >= 0))
+        self.distinct += len(uniques)
+        self.hits += len(uniques) - len(misses)
+        return pd.DataFrame(results[codes], index=series.index)
+
+    def clear(self):
+        """Forget the cached results and the statistics."""
+        self.entries.clear()
+        self.bytes = self.values = self.distinct = self.hits = 0
+
+    def stats(self):
+        """How many values were seen and how many of them actually had to be normalized."""
+        normalized = self.distinct - self.hits
+        return {
+            "values": self.values,
+            "distinct": self.distinct,
+            "hits": self.hits,
+            "normalized": normalized,
+            "hit_rate": self.hits / self.distinct if self.distinct else None,
+            "saved": 1 - normalized / self.values if self.values else None,
+        }
@@ -0,0 +1,82 @@
+"""
+Compare the vectorized cleaning steps in data_cleaning.py with the row-wise reference implementations.
+
+Run from the project root:
+
+    python benchmarks/bench_cleaning.py --rows 200000
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Scripts"))
+
+import data_cleaning  # noqa: E402
+from synthetic import make_merged_steam_data  # noqa: E402
+
+
+def best_time(step, data, repeat):
+    """Best wall time of step over `repeat` runs, each on a fresh copy of data, and the last result."""
+    best = None
+    for _ in range(repeat):
+        copy = data.copy()
+        start = time.perf_counter()
+        result = step(copy)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def cold(step):
+    """Runs step with empty value caches, so a repeat does not reuse the results of the previous run."""
+    def run(data):
+        data_cleaning.clear_value_caches()
+        return step(data)
+    return run
+
+
+def memory_mb(data):
+    return data.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    data = make_merged_steam_data(rows=args.rows)
+    print(f"{args.rows} synthetic rows, best of {args.repeat}")
+    print(f"  {'step':28s} {'reference':>12s} {'vectorized':>12s} {'speedup':>9s} {'rows/s':>12s}")
+    for reference, vectorized in data_cleaning.VECTORIZED_STEPS.items():
+        reference_s, expected = best_time(reference, data, args.repeat)
+        vectorized_s, result = best_time(cold(vectorized), data, args.repeat)
+        pd.testing.assert_frame_equal(result, expected)
+        print(f"  {reference.__name__:28s} {reference_s * 1000:9.1f} ms {vectorized_s * 1000:9.1f} ms "
+              f"{reference_s / vectorized_s:8.1f}x {args.rows / vectorized_s:12,.0f}")
+
+    reference_s, expected = best_time(lambda df: data_cleaning.clean_data(df, verbose=False, reference=True), data, 1)
+    vectorized_s, result = best_time(cold(lambda df: data_cleaning.clean_data(df, verbose=False)), data, 1)
+    pd.testing.assert_frame_equal(result, expected)
+    print(f"  {'all steps':28s} {reference_s * 1000:9.1f} ms {vectorized_s * 1000:9.1f} ms "
+          f"{reference_s / vectorized_s:8.1f}x {args.rows / vectorized_s:12,.0f}")
+
+    # The typed columns against the same values held as strings, the way they were written before
+    typed = result[list(data_cleaning.column_types)]
+    as_strings = pd.read_csv(io.StringIO(typed.to_csv(index=False)), dtype=str)
+    print(f"  typed columns: {memory_mb(as_strings):.1f} MB as strings -> {memory_mb(typed):.1f} MB typed")
+    strings_s, _ = best_time(lambda df: pd.to_numeric(df['all_reviews']).groupby(df['all_sentiment']).sum(),
+                             as_strings, args.repeat)
+    typed_s, _ = best_time(lambda df: df.groupby('all_sentiment')['all_reviews'].sum(), typed, args.repeat)
+    print(f"  reviews per sentiment: {strings_s * 1000:.1f} ms from strings -> {typed_s * 1000:.1f} ms typed")
+
+    # Value caches of the "all steps" run
+    data_cleaning.print_value_cache_stats()
+
+
+if __name__ == "__main__":
+    main()
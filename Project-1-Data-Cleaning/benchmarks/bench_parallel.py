@@ -0,0 +1,57 @@
+"""
+Measure cleaning throughput of data_cleaning.clean_file with 1..N worker processes.
+
+Run from the project root:
+
+    python benchmarks/bench_parallel.py --rows 200000 --chunk-rows 20000 --workers 1 2 4 8
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Scripts"))
+
+from data_cleaning import clean_file  # noqa: E402
+from synthetic import make_merged_steam_data  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--chunk-rows", type=int, default=20000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        input_path = os.path.join(tmp_dir, "merged_steam_data.csv")
+        make_merged_steam_data(rows=args.rows).to_csv(input_path, index=False)
+        print(f"{args.rows} rows in chunks of {args.chunk_rows}, {os.cpu_count()} CPU cores")
+
+        outputs = {}
+        baseline = None
+        for workers in args.workers:
+            output_path = os.path.join(tmp_dir, f"cleaned_{workers}.csv")
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                clean_file(input_path, output_path, args.chunk_rows, workers)
+            seconds = time.perf_counter() - start
+            baseline = baseline or seconds
+            with open(output_path, "rb") as file:
+                outputs[workers] = file.read()
+            print(f"  {workers:2d} workers: {seconds:8.2f} s {args.rows / seconds:12,.0f} rows/s "
+                  f"speedup {baseline / seconds:5.2f}x")
+
+        # Every run must produce the same file
+        assert len(set(outputs.values())) == 1, "parallel output differs from the serial output"
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
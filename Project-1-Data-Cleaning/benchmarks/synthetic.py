@@ -0,0 +1,59 @@
+# Synthetic Steam catalog data for tests and benchmarks
+import numpy as np
+import pandas as pd
+
+SENTIMENTS = ["Overwhelmingly Positive", "Very Positive", "Mostly Positive", "Mixed", "Mostly Negative", "Positive", "Negative"]
+PRICES = ["$19.99", "Free to Play", "Free", "$1,299.00", "9.99 USD", "Unknown", "$0.99", "4,99", "-"]
+DATES = ["Jan 1, 2019", "12 Mar, 2020", "Unknown", "2018-05-06", "Coming soon", "-"]
+PEGI = ["PEGI 12, Violence", "Unknown", "PEGI 18,  Bad Language, Violence", "-"]
+REQUIREMENTS = ["Minimum: OS: Windows 7 Processor: 2GHz Recommended: OS: Windows 10 Processor: 3GHz",
+                "Minimum: OS: Windows XP", "Unknown", "-"]
+
+
+def make_review(rng, window):
+    """
+    Returns one review summary in the scraped format, e.g.
+    'Very Positive,(7,030),- 91% of the 7,030 user reviews in the last 30 days are positive.'
+    Some values are placeholders or release dates, as in the real scrape.
+    """
+    r = rng.random()
+    if r < 0.1:
+        return "Unknown"
+    if r < 0.15:
+        return f"{rng.integers(1, 10)} user reviews"
+    if r < 0.18:
+        return "No user reviews"
+    if r < 0.21 and window == "all":
+        return "12 Jan, 2019"  # Release date scraped into the reviews column
+    count = int(rng.integers(10, 200000))
+    percent = int(rng.integers(0, 101))
+    period = "in the last 30 days" if window == "recent" else "for this game"
+    return f"{SENTIMENTS[rng.integers(len(SENTIMENTS))]},({count:,}),- {percent}% of the {count:,} user reviews {period} are positive."
+
+
+def make_merged_steam_data(rows=10000, seed=0, missing=0.03, duplicate_assets=50):
+    """
+    Builds a DataFrame shaped like merged_steam_data.csv (the output of data_merging.py).
+    About `missing` of the cells outside url/img_url are left empty, and images repeat
+    over `duplicate_assets` distinct paths like the shared CDN assets of a real scrape.
+    """
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame({
+        "url": [f"https://store.steampowered.com/app/{i}/Game_{i}/?snr=1_7_7_230_150_{i % 7}" for i in range(rows)],
+        "img_url": [f"https://steamcdn-a.akamaihd.net/steam/apps/{i % duplicate_assets}/header.jpg?t=15{i % 7}" for i in range(rows)],
+        "name": [f"Game {i}" for i in range(rows)],
+        "desc": [f"  Short description of game {i}  " if rng.random() > 0.3 else "Unknown" for i in range(rows)],
+        "full_desc": [f"About This Game {i}: a longer description of the game." for i in range(rows)],
+        "date": [DATES[i % len(DATES)] for i in range(rows)],
+        "user_reviews": [make_review(rng, "recent") for _ in range(rows)],
+        "all_reviews": [make_review(rng, "all") for _ in range(rows)],
+        "price": rng.choice(PRICES, rows),
+        "categories": "Single-player Multi-player Steam Achievements",
+        "popu_tags": "Action Adventure Indie",
+        "pegi": [PEGI[i % len(PEGI)] for i in range(rows)],
+        "pegi_url": "https://pegi.info/pegi12.png",
+        "requirements": [REQUIREMENTS[i % len(REQUIREMENTS)] for i in range(rows)],
+    })
+    mask = rng.random(data.shape) < missing
+    mask[:, :2] = False  # clean_url needs a string, and data_merging drops rows without a url
+    return data.mask(mask)
@@ -0,0 +1 @@
+# This is the tests package
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The scripts import each other by bare name (e.g. ``from instrumentation import span``),
+# so both the project root (for ``benchmarks.<module>``) and Scripts need to be importable.
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'Scripts'))
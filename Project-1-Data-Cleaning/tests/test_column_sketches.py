@@ -0,0 +1,67 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from column_sketches import ColumnSketch, HashSet, HyperLogLog, _leading_zeros, hash_values
+
+
+class TestColumnSketches(unittest.TestCase):
+
+    def setUp(self):
+        """Set up before each test"""
+        # 60000 distinct values in the first column and 80000 in the second, 20000 of them shared
+        self.values1 = pd.Series([f"https://store.steampowered.com/app/{i}/" for i in range(60000)])
+        self.values2 = pd.Series([f"https://store.steampowered.com/app/{i}/" for i in range(40000, 120000)])
+
+    def build(self, sketch, values, chunk_rows=7000):
+        # Add the values in chunks, with every value repeated, as profile_csv would
+        for start in range(0, len(values), chunk_rows):
+            chunk = values[start:start + chunk_rows]
+            sketch.add(hash_values(pd.concat([chunk, chunk, pd.Series([None])])))
+        return sketch
+
+    def test_leading_zeros(self):
+        """Leading zero bits of nonzero values are counted exactly for every bit length"""
+        values = np.array([2 ** 63, 2 ** 63 - 1, 12345, 1] + [2 ** i for i in range(64)], dtype=np.uint64)
+        expected = [0, 1, 64 - (12345).bit_length(), 63] + [63 - i for i in range(64)]
+        self.assertEqual(_leading_zeros(values).tolist(), expected)
+
+    def test_exact_overlap(self):
+        """HashSet counts distinct values, not join rows"""
+        set1 = self.build(HashSet(), self.values1)
+        set2 = self.build(HashSet(), self.values2)
+        self.assertEqual((set1.count(), set2.count(), set1.overlap(set2)), (60000, 80000, 20000))
+        self.assertAlmostEqual(set1.jaccard(set2), 20000 / 120000)
+        self.assertEqual(HashSet().jaccard(HashSet()), 0.0)
+
+        # The same with the chunks merged into the sorted set as they arrive
+        with mock.patch.object(HashSet, "MIN_PENDING", 1000):
+            set1 = self.build(HashSet(), self.values1)
+            self.assertLessEqual(set1._pending_size, len(set1._sorted))
+            self.assertEqual((set1.count(), set1.overlap(set2)), (60000, 20000))
+
+    def test_sketch_estimates(self):
+        """The sketches stay close to the exact figures with a fixed amount of memory"""
+        sketch1 = self.build(ColumnSketch(), self.values1)
+        sketch2 = self.build(ColumnSketch(), self.values2)
+        self.assertAlmostEqual(sketch1.count() / 60000, 1, delta=0.03)
+        self.assertAlmostEqual(sketch2.count() / 80000, 1, delta=0.03)
+        self.assertAlmostEqual(sketch1.jaccard(sketch2), 1 / 6, delta=0.05)
+        self.assertAlmostEqual(sketch1.overlap(sketch2) / 20000, 1, delta=0.3)
+        self.assertEqual(len(sketch1.minhash.hashes), 1024)
+        # Small sets are counted exactly, and an empty sketch counts nothing
+        small = self.build(HyperLogLog(), self.values1[:100])
+        self.assertEqual(small.count(), 100)
+        self.assertEqual(HyperLogLog().count(), 0)
+
+    def test_distinct_count_between_small_and_large_sets(self):
+        """Around 2.5 registers per value, where the raw estimate hands over to linear counting, there is no bias"""
+        for distinct in (30000, 40000, 50000):
+            sketch = self.build(HyperLogLog(), self.values1[:distinct])
+            self.assertAlmostEqual(sketch.count() / distinct, 1, delta=0.01, msg=distinct)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,268 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import data_cleaning
+import instrumentation
+from value_cache import ValueCache
+from benchmarks.synthetic import make_merged_steam_data
+
+
+class TestChunkedCleaning(unittest.TestCase):
+
+    def setUp(self):
+        """Set up before each test"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.input_path = os.path.join(self.tmp_dir, "merged_steam_data.csv")
+        make_merged_steam_data(rows=400, seed=1).to_csv(self.input_path, index=False)
+
+    def tearDown(self):
+        """Clean up after each test"""
+        shutil.rmtree(self.tmp_dir)
+
+    def clean(self, chunk_rows, input_path=None, workers=1):
+        output_path = os.path.join(self.tmp_dir, f"cleaned_{chunk_rows}_{workers}.csv")
+        rows = data_cleaning.clean_file(input_path or self.input_path, output_path, chunk_rows, workers)
+        with open(output_path, "rb") as file:
+            return rows, file.read()
+
+    def test_chunked_output_matches_whole_file(self):
+        """Cleaning in chunks of any size writes exactly the same file as cleaning it at once"""
+        rows, expected = self.clean(None)
+        self.assertGreater(rows, 350)
+        for chunk_rows in (3, 133, 400, 1000):
+            self.assertEqual(self.clean(chunk_rows), (rows, expected), chunk_rows)
+        self.assertEqual(os.listdir(self.tmp_dir).count("cleaned_133_1.csv.partial"), 0)
+
+    def test_parallel_output_matches_serial(self):
+        """Chunks cleaned in worker processes are written back in input order"""
+        expected = self.clean(None)
+        self.assertEqual(self.clean(50, workers=3), expected)
+        self.assertEqual(self.clean(None, workers=2), expected)  # One default-sized chunk
+
+    def test_parallel_run_records_worker_steps(self):
+        """The cleaning steps run in worker processes appear in the run summary"""
+        with instrumentation.run_instrumentation() as recorder:
+            rows, _ = self.clean(50, workers=2)
+        summary = recorder.summary()
+        self.assertEqual(summary["0. replace_review_dates"]["calls"], 8)
+        self.assertEqual(summary["0. replace_review_dates"]["rows_in"], 400)
+        self.assertEqual(summary["save"]["rows_in"], rows)
+        self.assertTrue(all(step.get("worker") for step in recorder.steps if step["step"][0].isdigit()))
+
+    def test_dates_do_not_depend_on_chunk_start(self):
+        """Release dates parse the same whichever format the first value of a chunk uses"""
+        dates = pd.Series(["2018-05-06", "Jan 1, 2019", "12 Mar, 2020", "Unknown", "2019/02/03"])
+        expected = [pd.to_datetime(value, errors='coerce') for value in dates]
+        for start in range(len(dates)):
+            rotated = pd.concat([dates[start:], dates[:start]])
+            parsed = data_cleaning.standardize_dates(pd.DataFrame({"date": rotated}))['date']
+            self.assertEqual(parsed.sort_index().tolist(), expected, rotated.iloc[0])
+
+    def test_header_only_input(self):
+        """An input without rows still produces the output header"""
+        empty_path = os.path.join(self.tmp_dir, "empty.csv")
+        make_merged_steam_data(rows=0).to_csv(empty_path, index=False)
+        rows, output = self.clean(50, empty_path)
+        self.assertEqual(rows, 0)
+        self.assertEqual(output.decode().strip(), ",".join(data_cleaning.ordered_columns))
+
+    def test_peak_memory_does_not_grow_with_input(self):
+        """With a fixed chunk size the traced memory peak stays flat as the input grows fourfold"""
+        self.clean(100)  # Warm up pandas' parser and datetime caches so they do not count as growth
+        peaks = []
+        for rows in (600, 2400):
+            make_merged_steam_data(rows=rows).to_csv(self.input_path, index=False)
+            with instrumentation.run_instrumentation(trace_memory=True) as recorder:
+                self.clean(200)
+            peaks.append(max(step["traced_peak_mb"] for step in recorder.steps))
+        self.assertLess(peaks[1], peaks[0] * 1.5)
+
+
+class TestVectorizedSteps(unittest.TestCase):
+
+    def setUp(self):
+        """Set up before each test"""
+        data = make_merged_steam_data(rows=300, seed=2)
+        edge_cases = pd.DataFrame({
+            "url": ["HTTP://Store.com/app/1/?snr=1", "https://a.com/b#frag?x", "https://a.com/b?q=1#f",
+                    " https://a.com/b?x ", "Unknown", "http:/a?b", "https://a.com/?", "https://a.com"],
+            "img_url": ["https://a.com/x.jpg?t=1\n", "https://[::1]/x?y", "mailto:x@y?s=1", "//cdn/x?y",
+                        "https://a.com/b;p?q", "", "https://a.com/b?x?y", "https://a.com/%20?x"],
+            "all_reviews": ["12 Jan, 2019", "2019-01-01", "Mixed,(12),- 50% of the 12 user reviews", "Unknown",
+                            "2019", None, "1 user reviews", "Coming soon"],
+            "user_reviews": ["(1)abc 5%", "%5 (x) (1,2) 7% 8%", " ", "\n(3)", "ab12%(4,)", None,
+                             "Mostly Positive,(1,234),- 80% of", "Mixed,(12),- 1000 5%"],
+            "price": ["Free", "Free to Play", "$1,299.00", "9.99 USD", "12", "abc", None, "€4,99"],
+            "pegi": [" PEGI 12 , Violence ,", ",", "", "PEGI 18,Bad Language", None, "-", "PEGI 3", "a ,b"],
+            "requirements": ["Minimum:\nOS: 7\nRecommended:\nOS: 10", "Recommended: only", "Minimum: x\n",
+                             "Minimum: a Recommended: b Recommended: c", None, "-", "Minimum:", "Minimum: Recommended:"],
+        })
+        # Missing urls are kept as nulls since data_merging stopped filling them with "Unknown"
+        missing_urls = pd.DataFrame({"url": [np.nan, "https://a.com/?x"], "img_url": ["https://a.com/i?x", None]})
+        # Dates written in several formats, first so that no single format can be guessed for the column
+        mixed_dates = pd.DataFrame({"all_reviews": ["2019-01-05", "Jan 5, 2019", "2019/01/05", "05 Feb 2020",
+                                                    "5.2.2020", "Feb 2020", "not a date"]})
+        self.data = pd.concat([mixed_dates, data, edge_cases, missing_urls], ignore_index=True)
+
+    def test_vectorized_steps_match_reference(self):
+        """Each vectorized step returns the same frame as the row-wise function it replaces"""
+        for reference, vectorized in data_cleaning.VECTORIZED_STEPS.items():
+            expected = reference(self.data.copy())
+            pd.testing.assert_frame_equal(vectorized(self.data.copy()), expected, obj=reference.__name__)
+
+    def test_clean_data_modes_match(self):
+        """Cleaning with the vectorized steps gives the same output as the reference mode"""
+        expected = data_cleaning.clean_data(self.data.copy(), verbose=False, reference=True)
+        pd.testing.assert_frame_equal(data_cleaning.clean_data(self.data.copy(), verbose=False), expected)
+
+    def test_value_cache(self):
+        """Each distinct value is normalized once, and only the most recently used values are kept"""
+        calls = []
+
+        def normalize(values):
+            calls.append(list(values))
+            return values.str.upper()
+
+        # Room for two of these one-letter values and their results
+        cache = ValueCache(normalize, maxbytes=4 * sys.getsizeof("a"))
+        result = cache.apply(pd.Series(["a", "b", None, "a", "b"], index=[5, 6, 7, 8, 9]))
+        self.assertEqual(list(result.index), [5, 6, 7, 8, 9])
+        self.assertEqual(result[0].drop(7).tolist(), ["A", "B", "A", "B"])
+        self.assertTrue(pd.isna(result.loc[7, 0]))
+        # 'b' is found, 'c' is normalized and evicts 'a', the least recently used value
+        cache.apply(pd.Series(["b", "c"]))
+        cache.apply(pd.Series(["a"]))
+        self.assertEqual(calls, [["a", "b"], ["c"], ["a"]])
+        self.assertLessEqual(cache.bytes, cache.maxbytes)
+        self.assertEqual(cache.stats(), {"values": 7, "distinct": 5, "hits": 1, "normalized": 4,
+                                         "hit_rate": 0.2, "saved": 1 - 4 / 7})
+
+
+class TestColumnTypes(unittest.TestCase):
+
+    def setUp(self):
+        """Set up before each test"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.data = make_merged_steam_data(rows=300, seed=3)
+
+    def tearDown(self):
+        """Clean up after each test"""
+        shutil.rmtree(self.tmp_dir)
+
+    def test_cleaned_columns_are_typed(self):
+        """clean_data returns the planned dtypes, with missing review counts as real nulls"""
+        cleaned = data_cleaning.clean_data(self.data, verbose=False)
+        for column, dtype in data_cleaning.column_types.items():
+            self.assertEqual(str(cleaned[column].dtype), dtype, column)
+        no_reviews = cleaned['all_sentiment'] == "No user reviews"
+        self.assertTrue(no_reviews.any())
+        self.assertTrue(cleaned.loc[no_reviews, ['all_reviews', 'all_percentage']].isna().all().all())
+        self.assertTrue(cleaned['all_percentage'].dropna().between(0, 100).all())
+
+    def test_read_cleaned_dataset_round_trip(self):
+        """A cleaned file is read back with the same values and types"""
+        input_path = os.path.join(self.tmp_dir, "merged_steam_data.csv")
+        output_path = os.path.join(self.tmp_dir, "cleaned_steam_data.csv")
+        self.data.to_csv(input_path, index=False)
+        data_cleaning.clean_file(input_path, output_path)
+        expected = data_cleaning.clean_data(data_cleaning.read_dataset(input_path), verbose=False)
+        pd.testing.assert_frame_equal(data_cleaning.read_cleaned_dataset(output_path),
+                                      expected.reset_index(drop=True), check_categorical=False)
+
+
+class TestIncrementalCleaning(unittest.TestCase):
+
+    def setUp(self):
+        """Set up before each test"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.input_path = os.path.join(self.tmp_dir, "merged_steam_data.csv")
+        self.output_path = os.path.join(self.tmp_dir, "cleaned_steam_data.csv")
+        self.data = make_merged_steam_data(rows=300, seed=5)
+
+    def tearDown(self):
+        """Clean up after each test"""
+        shutil.rmtree(self.tmp_dir)
+
+    def run_incremental(self, data, reference=False):
+        """Clean data incrementally; returns the output and how many rows went through the cleaning steps"""
+        data.to_csv(self.input_path, index=False)
+        with instrumentation.run_instrumentation() as recorder:
+            data_cleaning.clean_incremental(self.input_path, self.output_path, reference=reference)
+        with open(self.output_path, "rb") as file:
+            return file.read(), recorder.summary()["0. replace_review_dates"]["rows_in"]
+
+    def clean_whole(self, data):
+        path = os.path.join(self.tmp_dir, "full.csv")
+        data.to_csv(self.input_path, index=False)
+        data_cleaning.clean_file(self.input_path, path)
+        with open(path, "rb") as file:
+            return file.read()
+
+    def test_only_changed_rows_are_cleaned(self):
+        """After the first run only new and changed rows are cleaned, and the output matches a full clean"""
+        output, cleaned_rows = self.run_incremental(self.data)
+        self.assertEqual((output, cleaned_rows), (self.clean_whole(self.data), 300))
+        self.assertTrue(os.path.exists(data_cleaning.default_index_path(self.output_path)))
+
+        # Nothing changed
+        self.assertEqual(self.run_incremental(self.data), (output, 0))
+
+        # Two changed prices, a removed name (the row is dropped), two deleted rows and two new games,
+        # one of which has the same cleaned url as an existing game
+        changed = self.data.copy()
+        changed.loc[[3, 40], "price"] = "$4.99"
+        changed.loc[changed["name"].dropna().index[5], "name"] = None
+        changed = changed.drop(index=[10, 11])
+        new_rows = self.data.loc[[20, 21]].copy()
+        new_rows["url"] = ["https://store.steampowered.com/app/9999/New/", self.data.loc[30, "url"].replace("?", "?x=1&")]
+        changed = pd.concat([changed, new_rows], ignore_index=True)
+        output, cleaned_rows = self.run_incremental(changed)
+        self.assertEqual(output, self.clean_whole(changed))
+        self.assertEqual(cleaned_rows, 6)  # 3 changed rows, 2 new rows and the existing game sharing a url
+
+        # Rows that were dropped stay dropped without being cleaned again; only the two rows
+        # sharing a url are cleaned on every run
+        self.assertEqual(self.run_incremental(changed), (output, 2))
+
+    def test_index_that_does_not_match_output(self):
+        """When the output was rewritten by another run, every row is cleaned again"""
+        self.run_incremental(self.data)
+        shorter = self.data.copy()
+        shorter["price"] = "$1.00"
+        shorter.to_csv(self.input_path, index=False)
+        data_cleaning.clean_file(self.input_path, self.output_path)
+        output, cleaned_rows = self.run_incremental(self.data)
+        self.assertEqual((output, cleaned_rows), (self.clean_whole(self.data), 300))
+
+    def test_empty_index(self):
+        """An index without rows, left by an empty input or by urls that were all duplicated, reuses nothing"""
+        self.assertEqual(self.run_incremental(self.data.iloc[:0]), (self.clean_whole(self.data.iloc[:0]), 0))
+        output, cleaned_rows = self.run_incremental(self.data.iloc[:20])
+        self.assertEqual((output, cleaned_rows), (self.clean_whole(self.data.iloc[:20]), 20))
+
+        duplicated = pd.concat([self.data.iloc[:5]] * 2, ignore_index=True)
+        self.run_incremental(duplicated)
+        self.assertEqual(len(pd.read_csv(data_cleaning.default_index_path(self.output_path))), 0)
+        output, cleaned_rows = self.run_incremental(self.data.iloc[:20])
+        self.assertEqual((output, cleaned_rows), (self.clean_whole(self.data.iloc[:20]), 20))
+
+    def test_changed_cleaning_steps_clean_every_row(self):
+        """Rows written by another version or mode of the cleaning steps are not reused"""
+        output, _ = self.run_incremental(self.data)
+        with mock.patch.object(data_cleaning, "CLEANING_VERSION", data_cleaning.CLEANING_VERSION + 1):
+            self.assertEqual(self.run_incremental(self.data), (output, 300))
+            self.assertEqual(self.run_incremental(self.data), (output, 0))
+        self.assertEqual(self.run_incremental(self.data, reference=True), (output, 300))
+        self.assertEqual(self.run_incremental(self.data, reference=True), (output, 0))
+        self.assertEqual(self.run_incremental(self.data), (output, 300))
+
+
+if __name__ == "__main__":
+    unittest.main()
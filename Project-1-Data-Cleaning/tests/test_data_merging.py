@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import data_merging
+
+
+class TestPartitionedMerge(unittest.TestCase):
+
+    def setUp(self):
+        """Set up before each test"""
+        self.tmp_dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(4)
+        # Duplicate and missing urls, urls in only one file, a column in both files and awkward text
+        urls = [f"https://store.steampowered.com/app/{i}/" for i in rng.integers(0, 250, 300)]
+        steam_data = pd.DataFrame({
+            "url": urls,
+            "name": [f"Game {i}" for i in range(300)],
+            "price": rng.choice(["$9.99", "Free", None, "1,299"], 300),
+        })
+        steam_data.loc[::37, "url"] = None
+        text_content = pd.DataFrame({
+            "url": [f"https://store.steampowered.com/app/{i}/" for i in rng.integers(100, 400, 300)],
+            "name": [f"Title {i}" for i in range(300)],
+            "full_desc": rng.choice(['About "this" game,\nwith lines', "", None, "  spaced  "], 300),
+        })
+        self.file1 = os.path.join(self.tmp_dir, "steam_data.csv")
+        self.file2 = os.path.join(self.tmp_dir, "text_content.csv")
+        steam_data.to_csv(self.file1, index=False)
+        text_content.to_csv(self.file2, index=False)
+
+    def tearDown(self):
+        """Clean up after each test"""
+        shutil.rmtree(self.tmp_dir)
+
+    def merge(self, partitions=None, chunk_rows=data_merging.SPILL_CHUNK_ROWS):
+        output_path = os.path.join(self.tmp_dir, f"merged_{partitions}_{chunk_rows}.csv")
+        data_merging.clean_and_merge(self.file1, self.file2, output_path, partitions, chunk_rows)
+        with open(output_path, "rb") as file:
+            return file.read()
+
+    def test_partitioned_merge_matches_in_memory(self):
+        """Joining through on-disk partitions writes exactly the same file as the in-memory merge"""
+        expected = self.merge()
+        self.assertGreater(expected.count(b"\n"), 50)
+        for partitions, chunk_rows in ((1, 1000), (3, 41), (16, 7)):
+            self.assertEqual(self.merge(partitions, chunk_rows), expected, (partitions, chunk_rows))
+        # The spill files are removed afterwards
+        self.assertEqual(sorted(os.listdir(self.tmp_dir))[:2], ["merged_16_7.csv", "merged_1_1000.csv"])
+        self.assertEqual(len(os.listdir(self.tmp_dir)), 6)
+
+    def test_no_matching_urls(self):
+        """Without shared urls only the header is written"""
+        pd.DataFrame({"url": ["https://a.com/"], "name": ["A"]}).to_csv(self.file2, index=False)
+        self.assertEqual(self.merge(4), self.merge())
+        self.assertEqual(self.merge(4).decode().strip(), "url,name_x,price,name_y")
+
+
+if __name__ == "__main__":
+    unittest.main()
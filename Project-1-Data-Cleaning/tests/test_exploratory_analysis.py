@@ -0,0 +1,89 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+import exploratory_analysis
+
+
+class TestCommonColumns(unittest.TestCase):
+
+    def setUp(self):
+        """Set up before each test"""
+        self.tmp_dir = tempfile.mkdtemp()
+        files = {
+            "a.dat": "url\tname \tprice\textra\nu1\tA\t1\tx\nu2\tB\t2\ty\n",
+            "b.dat": " price\turl\tname\tother\nu3-price\tu3\tC\tz\n",
+            "empty.dat": "url\tname\tprice\n",  # Header only: skipped, and its columns do not count
+            "notes.txt": "not\tread\n",
+            "c.dat": "name\turl\tprice\textra\nD\tu4\t\tq\n",
+        }
+        for filename, text in files.items():
+            with open(os.path.join(self.tmp_dir, filename), "w") as file:
+                file.write(text)
+
+    def tearDown(self):
+        """Clean up after each test"""
+        shutil.rmtree(self.tmp_dir)
+
+    def test_loads_common_columns_once(self):
+        """Only the columns every non-empty file has are loaded, with names stripped, in directory order"""
+        combined = exploratory_analysis.process_directory_common_columns(self.tmp_dir, workers=2)
+        self.assertEqual(list(combined.columns), ["name", "price", "url"])
+        order = [filename for filename in os.listdir(self.tmp_dir) if filename in ("a.dat", "b.dat", "c.dat")]
+        rows = {"a.dat": [["A", "1", "u1"], ["B", "2", "u2"]], "b.dat": [["C", "u3-price", "u3"]],
+                "c.dat": [["D", None, "u4"]]}
+        expected = pd.DataFrame([row for filename in order for row in rows[filename]], columns=combined.columns)
+        pd.testing.assert_frame_equal(combined, expected)
+
+    def test_read_columns_reads_header(self):
+        """read_columns strips the names and returns None for a file without rows"""
+        self.assertEqual(exploratory_analysis.read_columns(os.path.join(self.tmp_dir, "b.dat")),
+                         ["price", "url", "name", "other"])
+        self.assertIsNone(exploratory_analysis.read_columns(os.path.join(self.tmp_dir, "empty.dat")))
+
+
+class TestCompareCsvs(unittest.TestCase):
+
+    def setUp(self):
+        """Set up before each test"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.file1 = os.path.join(self.tmp_dir, "steam_data.csv")
+        self.file2 = os.path.join(self.tmp_dir, "text_content.csv")
+        # 'kind' repeats the same two values on every row, which made the old row join quadratic
+        pd.DataFrame({"url": [f"u{i % 150}" for i in range(300)], "kind": ["game", "dlc"] * 150,
+                      "price": [str(i / 4) for i in range(300)]}).to_csv(self.file1, index=False)
+        pd.DataFrame({"url": [f"u{i}" for i in range(100, 400)], "kind": ["game", None, "demo"] * 100,
+                      "desc": "text"}).to_csv(self.file2, index=False)
+
+    def tearDown(self):
+        """Clean up after each test"""
+        shutil.rmtree(self.tmp_dir)
+
+    def test_profile_and_overlap(self):
+        """The profile and the overlap of distinct values do not depend on the chunk size"""
+        for chunk_rows in (7, 1000):
+            profile1, profile2 = exploratory_analysis.compare_csvs(self.file1, self.file2, chunk_rows=chunk_rows)
+            self.assertEqual(profile1["rows"], 300)
+            url, kind = profile1["columns"]["url"], profile2["columns"]["kind"]
+            self.assertEqual((url["count"], url["values"].count()), (300, 150))
+            self.assertEqual((kind["count"], kind["nulls"], kind["values"].count()), (200, 100, 2))
+            self.assertEqual(url["values"].overlap(profile2["columns"]["url"]["values"]), 50)
+            self.assertEqual(profile1["columns"]["kind"]["values"].overlap(kind["values"]), 1)
+            price = profile1["columns"]["price"]
+            self.assertTrue(price["numeric"])
+            self.assertEqual((price["min"], price["max"]), (0.0, 74.75))
+            self.assertFalse(url["numeric"])
+
+    def test_approximate_profile(self):
+        """On small columns the sketches are within a few values of the exact figures"""
+        profile1, profile2 = exploratory_analysis.compare_csvs(self.file1, self.file2, exact=False)
+        url1, url2 = profile1["columns"]["url"]["values"], profile2["columns"]["url"]["values"]
+        for estimate, exact in ((url1.count(), 150), (url2.count(), 300), (url1.overlap(url2), 50)):
+            self.assertAlmostEqual(estimate, exact, delta=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
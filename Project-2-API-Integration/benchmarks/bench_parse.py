@@ -0,0 +1,48 @@
+"""
+Compare the vectorized time series parser with the original dict-of-dicts path.
+
+Run from the project root:
+
+    python benchmarks/bench_parse.py --days 5040 --repeat 20
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from series_parser import parse_time_series  # noqa: E402
+from synthetic import make_daily_payload  # noqa: E402
+
+
+def legacy_parse(data):
+    """The parse path StockData.process_data used before series_parser."""
+    df = pd.DataFrame.from_dict(data["Time Series (Daily)"], orient="index")
+    df.columns = ["Open", "High", "Low", "Close", "Volume"]
+    df.index = pd.to_datetime(df.index)
+    return df.astype(float).sort_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=5040, help="trading days in the payload (5040 ~ 20 years)")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    payload = make_daily_payload(days=args.days)
+    pd.testing.assert_frame_equal(parse_time_series(payload), legacy_parse(payload),
+                                  check_dtype=False, check_freq=False)
+
+    legacy = min(timeit.repeat(lambda: legacy_parse(payload), number=1, repeat=args.repeat))
+    fast = min(timeit.repeat(lambda: parse_time_series(payload), number=1, repeat=args.repeat))
+    print(f"{args.days} daily bars, best of {args.repeat}")
+    print(f"  legacy from_dict path: {legacy * 1000:8.2f} ms")
+    print(f"  vectorized parser:     {fast * 1000:8.2f} ms")
+    print(f"  speedup:               {legacy / fast:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
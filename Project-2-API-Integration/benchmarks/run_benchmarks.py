@@ -0,0 +1,190 @@
+"""
+Time the ingestion and analysis pipeline end to end on synthetic data and write the results as JSON.
+
+Each stage runs against a throwaway data directory: fetching goes to a local stub Alpha Vantage
+server, so no API key or network access is needed. Run from the project root:
+
+    python benchmarks/run_benchmarks.py --days 5040 --symbols 8 --output results.json
+    python benchmarks/run_benchmarks.py --compare results.json   # exit 1 on a regression
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "benchmarks"))
+
+import pandas as pd  # noqa: E402
+
+import analysis  # noqa: E402
+from array_store import ArrayStore  # noqa: E402
+import cross_section  # noqa: E402
+from batch_fetch import BatchFetcher  # noqa: E402
+from price_store import PriceStore  # noqa: E402
+from series_parser import parse_time_series  # noqa: E402
+from stock_data import StockData  # noqa: E402
+from synthetic import make_daily_payload  # noqa: E402
+from tests.stub_server import StubAlphaVantageServer  # noqa: E402
+
+SCHEMA_VERSION = 1
+
+
+def measure(stage, repeat, setup=None):
+    """Run `stage` `repeat` times (after `setup`, which is not timed) and return timing statistics."""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        stage()
+        timings.append(time.perf_counter() - start)
+    return {"best_s": min(timings), "median_s": statistics.median(timings), "runs": timings}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_suite(days=5040, symbols=8, repeat=5, workers=4):
+    """
+    Run every benchmark stage and return the results as a JSON-serializable dict.
+
+    The stages run inside a temporary `work/` directory so the relative `../data` paths used
+    by StockData resolve into a scratch `data/` folder rather than the project's own.
+    """
+    names = [f"SYM{i:03d}" for i in range(symbols)]
+    payloads = {name: make_daily_payload(name, days=days, seed=i) for i, name in enumerate(names)}
+    rows = days * symbols
+    results = {}
+
+    tmp_dir = tempfile.mkdtemp(prefix="stock-bench-")
+    work_dir = os.path.join(tmp_dir, "work")
+    os.makedirs(work_dir)
+    previous_dir = os.getcwd()
+    os.chdir(work_dir)
+    store = PriceStore(os.path.join(tmp_dir, "data", "store"))
+    array_store = ArrayStore(os.path.join(tmp_dir, "data", "arrays"))
+    processed_dir = os.path.join(tmp_dir, "data", "processed")
+    indicator_dir = os.path.join(tmp_dir, "data", "indicators")
+    try:
+        # The pipeline prints a line per file; keep the benchmark output to the summary
+        with contextlib.redirect_stdout(io.StringIO()):
+            with StubAlphaVantageServer(payload_factory=payloads.__getitem__) as server:
+                fetcher = BatchFetcher("bench", requests_per_minute=10 ** 6, max_workers=workers,
+                                       base_url=server.url)
+                results["fetch"] = measure(lambda: fetcher.fetch_many(names), repeat)
+
+            results["parse"] = measure(lambda: [parse_time_series(payloads[name]) for name in names], repeat)
+            results["process_csv"] = measure(
+                lambda: [StockData(name, "bench").process_data() for name in names], repeat)
+            results["process_store"] = measure(
+                lambda: [StockData(name, "bench", store=store).process_data() for name in names], repeat)
+            results["process_arrays"] = measure(
+                lambda: [StockData(name, "bench", store=array_store).process_data() for name in names], repeat)
+
+            empty_store = PriceStore(os.path.join(tmp_dir, "empty"))
+            results["load_csv"] = measure(
+                lambda: [analysis.load_prices(name, empty_store, processed_dir) for name in names], repeat)
+            results["load_store"] = measure(lambda: [store.read(name) for name in names], repeat)
+            results["load_arrays"] = measure(lambda: [array_store.read(name) for name in names], repeat)
+
+            frames = {name: store.read(name) for name in names}
+            results["indicators_full"] = measure(
+                lambda: [analysis.add_indicators(frames[name], name, indicator_dir) for name in names], repeat,
+                setup=lambda: shutil.rmtree(indicator_dir, ignore_errors=True))
+
+            # One new bar per symbol on top of stored indicator state, as in a daily scheduled run
+            history = {name: frame.iloc[:-1] for name, frame in frames.items()}
+            results["indicators_incremental"] = measure(
+                lambda: [analysis.add_indicators(frames[name], name, indicator_dir) for name in names], repeat,
+                setup=lambda: [analysis.add_indicators(history[name], name, indicator_dir) for name in names])
+
+            matrix = cross_section.load_matrix(names, store=store)
+            results["cross_section"] = measure(lambda: cross_section.summarize(matrix), repeat)
+    finally:
+        os.chdir(previous_dir)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    for name, result in results.items():
+        if name != "cross_section":
+            result["rows_per_s"] = rows / result["best_s"] if result["best_s"] else None
+
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "days": days,
+            "symbols": symbols,
+            "repeat": repeat,
+            "workers": workers,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=0.2):
+    """
+    Return the stages whose best time is more than `threshold` (a fraction) slower than in `baseline`,
+    as a list of (stage, baseline seconds, current seconds). Stages missing from either run are skipped.
+    """
+    regressions = []
+    for stage, result in current["results"].items():
+        previous = baseline.get("results", {}).get(stage)
+        if previous and result["best_s"] > previous["best_s"] * (1 + threshold):
+            regressions.append((stage, previous["best_s"], result["best_s"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=5040, help="trading days per symbol (5040 ~ 20 years)")
+    parser.add_argument("--symbols", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=4, help="fetch worker threads")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before failing (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    report = run_suite(args.days, args.symbols, args.repeat, args.workers)
+    print(f"{args.symbols} symbols x {args.days} days, best of {args.repeat}")
+    for stage, result in report["results"].items():
+        throughput = f"{result['rows_per_s']:12,.0f} rows/s" if result.get("rows_per_s") else ""
+        print(f"  {stage:24s} {result['best_s'] * 1000:10.2f} ms {throughput}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r") as file:
+            regressions = compare(report, json.load(file), args.threshold)
+        for stage, before, after in regressions:
+            print(f"REGRESSION {stage}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms")
+        if regressions:
+            sys.exit(1)
+        print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
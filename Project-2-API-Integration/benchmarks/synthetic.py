@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+
+def make_daily_payload(symbol="SYN", days=5040, seed=0, end="2025-01-31"):
+    """
+    Build a synthetic TIME_SERIES_DAILY payload with `days` business days ending at `end`,
+    newest first like the real API. 5040 days is roughly 20 years of trading.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=end, periods=days)[::-1]
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, days)))
+    open_ = close * (1 + rng.normal(0, 0.005, days))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, days))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, days))
+    volume = rng.integers(1_000_000, 100_000_000, days)
+
+    series = {
+        date: {
+            "1. open": f"{o:.4f}", "2. high": f"{h:.4f}", "3. low": f"{l:.4f}",
+            "4. close": f"{c:.4f}", "5. volume": str(v),
+        }
+        for date, o, h, l, c, v in zip(dates.strftime("%Y-%m-%d"), open_, high, low, close, volume)
+    }
+    return {
+        "Meta Data": {"1. Information": "Daily Prices (open, high, low, close) and Volumes",
+                      "2. Symbol": symbol, "4. Output Size": "Full size"},
+        "Time Series (Daily)": series,
+    }
+
+
+def make_intraday_payload(symbol="SYN", bars=20000, interval="1min", seed=0, end="2025-01-31 16:00:00"):
+    """Build a synthetic TIME_SERIES_INTRADAY payload with `bars` bars ending at `end`, newest first."""
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range(end=end, periods=bars, freq=interval)[::-1]
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, bars)))
+    volume = rng.integers(1_000, 100_000, bars)
+
+    series = {
+        timestamp: {
+            "1. open": f"{c:.4f}", "2. high": f"{c * 1.001:.4f}", "3. low": f"{c * 0.999:.4f}",
+            "4. close": f"{c:.4f}", "5. volume": str(v),
+        }
+        for timestamp, c, v in zip(timestamps.strftime("%Y-%m-%d %H:%M:%S"), close, volume)
+    }
+    return {
+        "Meta Data": {"1. Information": f"Intraday ({interval}) open, high, low, close prices and volume",
+                      "2. Symbol": symbol, "4. Interval": interval},
+        f"Time Series ({interval})": series,
+    }
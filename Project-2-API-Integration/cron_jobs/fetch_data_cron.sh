@@ -6,8 +6,9 @@ cd /path/to/your/project/api-integration-stock-data
 # Activate your virtual environment (if using one)
 source venv/bin/activate
 
-# Run the Python script to fetch the stock data
-python src/fetch_data.py
+# Run the fetch command of the src package (it resolves the data and log paths itself;
+# --incremental only downloads the latest compact window and appends new trading days)
+python -m src fetch --incremental
 
 # Deactivate the virtual environment after running the script
 deactivate
@@ -0,0 +1,14 @@
+#!/bin/bash
+
+# Start the long-running fetch scheduler (replaces running fetch_data_cron.sh on every tick).
+# Launch it once, e.g. from a crontab "@reboot" entry or a process supervisor:
+#   @reboot /path/to/your/project/api-integration-stock-data/cron_jobs/fetch_scheduler.sh
+
+# Change to the src directory so the relative ../data and ../logs paths resolve
+cd /path/to/your/project/api-integration-stock-data/src
+
+# Activate your virtual environment (if using one)
+source ../venv/bin/activate
+
+# exec so SIGTERM from the supervisor reaches the scheduler, which saves its queue before exiting
+exec python scheduler.py
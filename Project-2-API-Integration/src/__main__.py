@@ -0,0 +1,52 @@
+import importlib
+import os
+import sys
+
+# Entry point for `python -m src <command> [options]`, run from the project root.
+# Each command's module is imported only when it is chosen, so `fetch` never loads pandas or matplotlib.
+COMMANDS = {
+    "fetch": "fetch_data",
+    "process": "process_data",
+    "analyze": "analysis",
+    "report": "reports",
+    "schedule": "scheduler",
+}
+# Options whose value is a path given by the user, relative to the directory they ran the command from
+PATH_OPTIONS = ("--output",)
+
+
+def _absolute_paths(args):
+    """Return args with the values of PATH_OPTIONS made absolute, before the working directory changes."""
+    args = list(args)
+    for position, arg in enumerate(args):
+        option, equals, value = arg.partition("=")
+        if option not in PATH_OPTIONS:
+            continue
+        if equals:
+            args[position] = f"{option}={os.path.abspath(value)}"
+        elif position + 1 < len(args):
+            args[position + 1] = os.path.abspath(args[position + 1])
+    return args
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS:
+        print(f"usage: python -m src {{{','.join(COMMANDS)}}} [options]")
+        return 2
+
+    # The modules import each other by bare name and use paths relative to src/ (../data, ../reports),
+    # so they run from src/; paths on the command line keep meaning what they meant to the user
+    args = _absolute_paths(argv[1:])
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, src_dir)
+    os.chdir(src_dir)
+
+    module = importlib.import_module(COMMANDS[argv[0]])
+    sys.argv = [f"python -m src {argv[0]}"] + args
+    module.main()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,62 +1,107 @@
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.graph_objects as go
+from indicators import update_indicators, INDICATOR_DIR
+from stock_data import PROCESSED_DIR
+
+# Plotting libraries and pyarrow are imported inside the functions that use them, so importing
+# this module stays cheap and callers such as reports.py can pick the matplotlib backend first.
 
-# Load Processed Stock Data
 STOCK_SYMBOL = "AAPL"
-df = pd.read_csv(f"../data/processed/{STOCK_SYMBOL}.csv", index_col=0, parse_dates=True)
-
-# print first few rows
-print(df.head())
-
-# Summary Statistics
-print("Stock Data Summary:")
-print(df.describe())
-
-# Moving Averages
-df['50_MA'] = df['Close'].rolling(window=50).mean()
-df['200_MA'] = df['Close'].rolling(window=200).mean()
-
-# Volatility (Standard Deviation over 30-day window)
-df['Volatility'] = df['Close'].rolling(window=30).std()
-
-# Plot Closing Prices with Moving Averages
-plt.figure(figsize=(12,6))
-plt.plot(df.index, df['Close'], label='Closing Price', color='blue')
-plt.plot(df.index, df['50_MA'], label='50-Day MA', color='red', linestyle='dashed')
-plt.plot(df.index, df['200_MA'], label='200-Day MA', color='green', linestyle='dashed')
-plt.title(f"{STOCK_SYMBOL} Stock Closing Prices & Moving Averages")
-plt.xlabel("Date")
-plt.ylabel("Price (USD)")
-plt.legend()
-plt.grid(True)
-plt.show()
-
-# Interactive Price Chart using Plotly
-fig = go.Figure()
-fig.add_trace(go.Scatter(x=df.index, y=df['Close'], mode='lines', name='Closing Price'))
-fig.add_trace(go.Scatter(x=df.index, y=df['50_MA'], mode='lines', name='50-Day MA', line=dict(dash='dash')))
-fig.add_trace(go.Scatter(x=df.index, y=df['200_MA'], mode='lines', name='200-Day MA', line=dict(dash='dot')))
-fig.update_layout(title=f"{STOCK_SYMBOL} Stock Prices", xaxis_title="Date", yaxis_title="Price (USD)")
-fig.show()
-
-# Volatility Plot
-plt.figure(figsize=(12,6))
-plt.plot(df.index, df['Volatility'], label='30-Day Volatility', color='purple')
-plt.title(f"{STOCK_SYMBOL} Stock Volatility Over Time")
-plt.xlabel("Date")
-plt.ylabel("Volatility")
-plt.legend()
-plt.grid(True)
-plt.show()
-
-# Correlation Matrix
-corr_matrix = df[['Open', 'High', 'Low', 'Close', 'Volume']].corr()
-plt.figure(figsize=(8,6))
-sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', fmt='.2f')
-plt.title("Correlation Matrix")
-plt.show()
-
-print("Analysis Complete ✅")
\ No newline at end of file
+
+
+def load_prices(symbol, store=None, processed_dir=PROCESSED_DIR, start=None, end=None):
+    # Load Processed Stock Data (from a PriceStore or ArrayStore when available, otherwise the processed CSV)
+    # Without a store, the one selected under `storage` in config.yaml is used
+    # start/end are inclusive dates; an ArrayStore reads just those rows, the CSV is parsed in full
+    if store is None:
+        from config_loader import load_config, store_from_config
+        store = store_from_config(load_config())
+    if store is not None and store.has_symbol(symbol):
+        return store.read(symbol, start, end)
+    df = pd.read_csv(f"{processed_dir}/{symbol}.csv", index_col=0, parse_dates=True)
+    return df.loc[start:end] if start is not None or end is not None else df
+
+
+def add_indicators(df, symbol, indicator_dir=INDICATOR_DIR):
+    # Moving Averages (50/200-day) and Volatility (Standard Deviation over 30-day window)
+    # The indicator engine keeps its running state between runs, so only new days are computed
+    df = df.sort_index()  # Rolling windows must run in ascending time order
+    return df.join(update_indicators(symbol, df, indicator_dir)[['50_MA', '200_MA', 'Volatility']])
+
+
+def plot_moving_averages(df, symbol):
+    # Plot Closing Prices with Moving Averages
+    import matplotlib.pyplot as plt
+    fig = plt.figure(figsize=(12,6))
+    plt.plot(df.index, df['Close'], label='Closing Price', color='blue')
+    plt.plot(df.index, df['50_MA'], label='50-Day MA', color='red', linestyle='dashed')
+    plt.plot(df.index, df['200_MA'], label='200-Day MA', color='green', linestyle='dashed')
+    plt.title(f"{symbol} Stock Closing Prices & Moving Averages")
+    plt.xlabel("Date")
+    plt.ylabel("Price (USD)")
+    plt.legend()
+    plt.grid(True)
+    return fig
+
+
+def plot_interactive_prices(df, symbol):
+    # Interactive Price Chart using Plotly
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=df.index, y=df['Close'], mode='lines', name='Closing Price'))
+    fig.add_trace(go.Scatter(x=df.index, y=df['50_MA'], mode='lines', name='50-Day MA', line=dict(dash='dash')))
+    fig.add_trace(go.Scatter(x=df.index, y=df['200_MA'], mode='lines', name='200-Day MA', line=dict(dash='dot')))
+    fig.update_layout(title=f"{symbol} Stock Prices", xaxis_title="Date", yaxis_title="Price (USD)")
+    return fig
+
+
+def plot_volatility(df, symbol):
+    # Volatility Plot
+    import matplotlib.pyplot as plt
+    fig = plt.figure(figsize=(12,6))
+    plt.plot(df.index, df['Volatility'], label='30-Day Volatility', color='purple')
+    plt.title(f"{symbol} Stock Volatility Over Time")
+    plt.xlabel("Date")
+    plt.ylabel("Volatility")
+    plt.legend()
+    plt.grid(True)
+    return fig
+
+
+def plot_correlation(df):
+    # Correlation Matrix
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    corr_matrix = df[['Open', 'High', 'Low', 'Close', 'Volume']].corr()
+    fig = plt.figure(figsize=(8,6))
+    sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', fmt='.2f')
+    plt.title("Correlation Matrix")
+    return fig
+
+
+def main():
+    import matplotlib.pyplot as plt
+
+    df = load_prices(STOCK_SYMBOL)
+
+    # print first few rows
+    print(df.head())
+
+    # Summary Statistics
+    print("Stock Data Summary:")
+    print(df.describe())
+
+    df = add_indicators(df, STOCK_SYMBOL)
+
+    plot_moving_averages(df, STOCK_SYMBOL)
+    plt.show()
+    plot_interactive_prices(df, STOCK_SYMBOL).show()
+    plot_volatility(df, STOCK_SYMBOL)
+    plt.show()
+    plot_correlation(df)
+    plt.show()
+
+    print("Analysis Complete ✅")
+
+
+if __name__ == "__main__":
+    main()
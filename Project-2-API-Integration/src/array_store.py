@@ -0,0 +1,244 @@
+import logging
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+ARRAY_STORE_DIR = "../data/arrays"
+# One fixed-width binary file per symbol and field: the int64 timestamp index (ns since the epoch),
+# the four prices as float32 rows of Open, High, Low, Close, and int64 volume
+DATE_FILE = "date.i8"
+PRICES_FILE = "prices.f4"
+VOLUME_FILE = "volume.i8"
+OHLC_COLUMNS = ["Open", "High", "Low", "Close"]
+PRICE_COLUMNS = OHLC_COLUMNS + ["Volume"]  # As in price_store, which is not imported so pyarrow is not needed
+
+
+def _map(path, dtype, rows, width=None):
+    """Map the first `rows` records of a column file copy-on-write (an empty array when there are none)."""
+    shape = (rows,) if width is None else (rows, width)
+    if rows == 0:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="c", shape=shape)
+
+
+def _date_slice(dates, start, end):
+    # Binary search of the sorted timestamps for the rows between the inclusive bounds
+    first = 0 if start is None else int(np.searchsorted(dates, pd.Timestamp(start).value, side="left"))
+    last = len(dates) if end is None else int(np.searchsorted(dates, pd.Timestamp(end).value, side="right"))
+    return slice(first, max(first, last))
+
+
+class ArrayStore:
+    """
+    Append-only store of processed series as memory-mapped NumPy arrays.
+
+    Each symbol is a folder of fixed-width column files (`<root>/AAPL/date.i8`, `prices.f4`,
+    `volume.i8`) whose timestamps are kept sorted, so a date range is found with two binary
+    searches and read as a slice of the mapped files instead of parsing them. The frames returned by
+    `read` are views of the mapped buffers; they are copy-on-write, so changing one never touches the
+    files. Rows newer than the last stored one are appended in place; anything else rewrites the symbol.
+    """
+
+    def __init__(self, root=ARRAY_STORE_DIR):
+        self.root = root
+
+    def _symbol_dir(self, symbol):
+        return os.path.join(self.root, symbol)
+
+    def _rows(self, symbol):
+        path = os.path.join(self._symbol_dir(symbol), DATE_FILE)
+        return os.path.getsize(path) // 8 if os.path.exists(path) else 0
+
+    def _arrays(self, symbol):
+        """Map the dates, prices and volume of `symbol`."""
+        symbol_dir = self._symbol_dir(symbol)
+        rows = self._rows(symbol)
+        # The date file is written last, so it holds the number of complete rows
+        for name, row_size in ((PRICES_FILE, 16), (VOLUME_FILE, 8)):
+            if rows and os.path.getsize(os.path.join(symbol_dir, name)) < rows * row_size:
+                raise ValueError(f"{symbol_dir} is incomplete: {name} has fewer than {rows} rows")
+        return (_map(os.path.join(symbol_dir, DATE_FILE), np.int64, rows),
+                _map(os.path.join(symbol_dir, PRICES_FILE), np.float32, rows, len(OHLC_COLUMNS)),
+                _map(os.path.join(symbol_dir, VOLUME_FILE), np.int64, rows))
+
+    @staticmethod
+    def _to_arrays(df):
+        dates = pd.DatetimeIndex(df.index).astype("datetime64[ns]").asi8
+        prices = df[OHLC_COLUMNS].to_numpy(dtype=np.float32)
+        volume = df["Volume"].to_numpy(dtype=np.int64)
+        return dates, prices, volume
+
+    @staticmethod
+    def _write_arrays(symbol_dir, dates, prices, volume, mode="wb"):
+        # Dates go last: a row only counts once its timestamp is written
+        for name, values in ((PRICES_FILE, prices), (VOLUME_FILE, volume), (DATE_FILE, dates)):
+            with open(os.path.join(symbol_dir, name), mode) as file:
+                file.write(np.ascontiguousarray(values).tobytes())
+
+    def _replace(self, symbol, dates, prices, volume):
+        # Build the new files next to the old ones and swap the folders; mapped readers keep the old files
+        os.makedirs(self.root, exist_ok=True)
+        staging_dir = tempfile.mkdtemp(prefix=f".{symbol}-", dir=self.root)
+        self._write_arrays(staging_dir, dates, prices, volume)
+        self.delete(symbol)
+        os.replace(staging_dir, self._symbol_dir(symbol))
+
+    def delete(self, symbol):
+        shutil.rmtree(self._symbol_dir(symbol), ignore_errors=True)
+
+    def write(self, symbol, df):
+        """Replace everything stored for `symbol` with `df` (a date-indexed OHLCV frame)."""
+        df = df.sort_index()
+        df = df[~df.index.duplicated(keep="last")]
+        self._replace(symbol, *self._to_arrays(df))
+        logging.info(f"{symbol}: wrote {len(df)} rows to {self._symbol_dir(symbol)}")
+
+    def write_chunks(self, symbol, chunks):
+        """
+        Replace everything stored for `symbol` with the rows of an iterable of frames, e.g. the chunks
+        of a streamed raw file, holding one chunk in memory at a time. The chunks may come in any order
+        (API dumps are newest first) but must not overlap in time. Each chunk is written to its own files,
+        which are then concatenated in time order. Returns the number of rows written.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        staging_dir = tempfile.mkdtemp(prefix=f".{symbol}-", dir=self.root)
+        try:
+            parts = []
+            for number, chunk in enumerate(chunks):
+                if chunk.empty:
+                    continue
+                dates, prices, volume = self._to_arrays(chunk.sort_index())
+                part_dir = os.path.join(staging_dir, str(number))
+                os.makedirs(part_dir)
+                self._write_arrays(part_dir, dates, prices, volume)
+                parts.append((dates[0], dates[-1], len(dates), part_dir))
+
+            parts.sort()
+            for previous, following in zip(parts, parts[1:]):
+                if previous[1] >= following[0]:
+                    raise ValueError(f"Chunks for {symbol} overlap in time; write them with write() instead")
+
+            merged_dir = os.path.join(staging_dir, "merged")
+            os.makedirs(merged_dir)
+            for name in (PRICES_FILE, VOLUME_FILE, DATE_FILE):
+                with open(os.path.join(merged_dir, name), "wb") as output:
+                    for part in parts:
+                        with open(os.path.join(part[3], name), "rb") as file:
+                            shutil.copyfileobj(file, output)
+            self.delete(symbol)
+            if parts:
+                os.replace(merged_dir, self._symbol_dir(symbol))
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        rows = sum(part[2] for part in parts)
+        logging.info(f"{symbol}: wrote {rows} rows to {self._symbol_dir(symbol)}")
+        return rows
+
+    def append(self, symbol, df):
+        """
+        Add new rows. Rows that all come after the last stored timestamp are appended to the files;
+        otherwise the stored and new rows are merged (new values win for dates already stored)
+        and the symbol is rewritten.
+        """
+        if df.empty:
+            return
+        df = df.sort_index()
+        df = df[~df.index.duplicated(keep="last")]
+        dates, prices, volume = self._to_arrays(df)
+        rows = self._rows(symbol)
+        if rows == 0:
+            self._replace(symbol, dates, prices, volume)
+            return
+
+        stored_dates, stored_prices, stored_volume = self._arrays(symbol)
+        if dates[0] > stored_dates[-1]:
+            symbol_dir = self._symbol_dir(symbol)
+            # Drop whatever an interrupted append left after the last complete row
+            for name, row_size in ((PRICES_FILE, 16), (VOLUME_FILE, 8)):
+                os.truncate(os.path.join(symbol_dir, name), rows * row_size)
+            self._write_arrays(symbol_dir, dates, prices, volume, mode="ab")
+            return
+
+        keep = ~np.isin(stored_dates, dates)
+        merged_dates = np.concatenate([stored_dates[keep], dates])
+        order = np.argsort(merged_dates, kind="stable")
+        self._replace(symbol, merged_dates[order],
+                      np.concatenate([stored_prices[keep], prices])[order],
+                      np.concatenate([stored_volume[keep], volume])[order])
+
+    def symbols(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if not name.startswith(".") and os.path.isdir(os.path.join(self.root, name)))
+
+    def has_symbol(self, symbol):
+        return os.path.exists(os.path.join(self._symbol_dir(symbol), DATE_FILE))
+
+    def files(self, symbol):
+        """Return the paths of the column files holding `symbol` (none when it is not stored)."""
+        if not self.has_symbol(symbol):
+            return []
+        return [os.path.join(self._symbol_dir(symbol), name) for name in (DATE_FILE, PRICES_FILE, VOLUME_FILE)]
+
+    def last_date(self, symbol):
+        """Return the newest stored timestamp for `symbol`, read from the end of its index."""
+        rows = self._rows(symbol)
+        if rows == 0:
+            return None
+        return pd.Timestamp(self._arrays(symbol)[0][-1])
+
+    def locate(self, symbol, start=None, end=None):
+        """Return the slice of rows between the inclusive `start`/`end` bounds, by binary search."""
+        return _date_slice(self._arrays(symbol)[0], start, end)
+
+    def read(self, symbol, start=None, end=None, columns=None):
+        """
+        Read one symbol as a date-indexed frame, the same shape as the processed CSV.
+        `start`/`end` are inclusive bounds. Prices stay views of the mapped file when `columns` is
+        all of them or a run of neighbouring ones (e.g. ["Close"]); other selections copy only those rows.
+        """
+        columns = list(columns or PRICE_COLUMNS)
+        dates, prices, volume = self._arrays(symbol)
+        rows = _date_slice(dates, start, end)
+        index = pd.DatetimeIndex(dates[rows].view("datetime64[ns]"))
+
+        frames = []
+        positions = [OHLC_COLUMNS.index(column) for column in columns if column in OHLC_COLUMNS]
+        if positions:
+            if positions == list(range(positions[0], positions[-1] + 1)):
+                values = prices[rows, positions[0]:positions[-1] + 1]
+            else:
+                values = prices[rows][:, positions]
+            frames.append(pd.DataFrame(values, index=index, columns=[OHLC_COLUMNS[p] for p in positions],
+                                       copy=False))
+        if "Volume" in columns:
+            frames.append(pd.DataFrame(volume[rows, None], index=index, columns=["Volume"], copy=False))
+        if not frames:
+            return pd.DataFrame(index=index)
+        # concat without copying keeps each block backed by its mapped file
+        df = frames[0] if len(frames) == 1 else pd.concat(frames, axis=1, copy=False)
+        return df if list(df.columns) == columns else df[columns]
+
+    def read_many(self, symbols=None, start=None, end=None, columns=None):
+        """Read a long frame with `date`, `symbol` and the requested price columns (a copy)."""
+        columns = list(columns or PRICE_COLUMNS)
+        symbols = self.symbols() if symbols is None else [symbol for symbol in symbols if self.has_symbol(symbol)]
+        frames = []
+        for symbol in sorted(symbols):
+            df = self.read(symbol, start, end, columns).rename_axis("date").reset_index()
+            df.insert(1, "symbol", symbol)
+            frames.append(df)
+        if not frames:
+            return pd.DataFrame(columns=["date", "symbol"] + columns)
+        return pd.concat(frames, ignore_index=True)
+
+    def export_csv(self, symbol, path):
+        """Write one symbol in the processed CSV layout for tools that still expect text files."""
+        df = self.read(symbol)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        df.to_csv(path)
+        return path
@@ -0,0 +1,112 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from http_session import log_connection_stats
+from rate_limiter import TokenBucket
+from response_cache import get_cache
+from stock_data import StockData, BASE_URL, FetchError, has_time_series
+
+# Alpha Vantage answers an over-quota request with HTTP 200 and one of these keys instead of a time series
+THROTTLE_KEYS = ("Note", "Information")
+
+
+def is_throttled(response):
+    """Return True if the response is a rate-limit rejection rather than data."""
+    if response.status_code == 429:
+        return True
+    if response.status_code != 200:
+        return False
+    try:
+        data = response.json()
+    except ValueError:
+        return False
+    if not isinstance(data, dict) or has_time_series(data):
+        return False
+    return any(key in data for key in THROTTLE_KEYS)
+
+
+class BatchFetcher:
+    """
+    Fetches many symbols concurrently from a thread pool.
+
+    Every network request, including retries, first takes a token from one shared TokenBucket,
+    so the combined request rate of all workers stays within the per-minute quota. Responses
+    served from the response cache do not use up quota; `cache_max_age` limits how old they may be.
+    Throttled responses, 5xx errors, connection failures and a FetchError raised while handling
+    a response are retried with exponential backoff.
+    With `incremental=True` each symbol is updated through StockData.update_data semantics,
+    so only new trading days are appended to the processed store.
+    """
+
+    def __init__(self, api_key, requests_per_minute=5, max_workers=4, max_retries=3,
+                 backoff_seconds=15.0, base_url=BASE_URL, rate_limiter=None, incremental=False,
+                 store=None, interval="daily", cache_max_age=None, sleep=time.sleep):
+        self.api_key = api_key
+        self.cache_max_age = cache_max_age
+        self.interval = interval
+        self.incremental = incremental
+        self.store = store
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.base_url = base_url
+        self.rate_limiter = rate_limiter or TokenBucket.per_minute(requests_per_minute)
+        self._sleep = sleep
+
+    def fetch_many(self, symbols):
+        """
+        Fetch all symbols and return a dict of symbol -> result (None on failure), in input order.
+        The result is the raw payload, or the DataFrame of appended rows in incremental mode.
+        """
+        symbols = list(dict.fromkeys(symbols))  # Drop duplicates but keep the caller's order
+        logging.info(f"Fetching {len(symbols)} symbols ({self.interval}) with {self.max_workers} workers")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(self.fetch_one, symbols))
+        failed = [symbol for symbol, result in zip(symbols, results) if result is None]
+        if failed:
+            logging.error(f"Failed to fetch {len(failed)} of {len(symbols)} symbols: {', '.join(failed)}")
+        log_connection_stats()
+        if get_cache() is not None:
+            get_cache().log_stats()
+        return dict(zip(symbols, results))
+
+    def fetch_one(self, symbol):
+        stock_data = StockData(symbol, self.api_key, base_url=self.base_url, rate_limiter=self.rate_limiter,
+                               store=self.store, interval=self.interval, cache_max_age=self.cache_max_age)
+        if self.incremental:
+            request, handle = stock_data.request_update, stock_data.handle_update_response
+        else:
+            request, handle = stock_data.request_data, stock_data.handle_response
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = request()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                reason = f"request error ({e})"
+            else:
+                if is_throttled(response):
+                    reason = "throttled"
+                elif response.status_code >= 500:
+                    reason = f"server error {response.status_code}"
+                else:
+                    try:
+                        return handle(response)
+                    except FetchError as e:  # e.g. a follow-up request made while handling was throttled
+                        reason = str(e)
+
+            if attempt < self.max_retries:
+                delay = self.backoff_seconds * 2 ** attempt
+                logging.warning(f"{symbol}: {reason}, retrying in {delay:.1f}s "
+                                f"(attempt {attempt + 1}/{self.max_retries})")
+                self._sleep(delay)
+
+        logging.error(f"{symbol}: giving up after {self.max_retries + 1} attempts ({reason})")
+        return None
+
+
+def fetch_many(symbols, api_key, **kwargs):
+    """Convenience wrapper around BatchFetcher.fetch_many."""
+    return BatchFetcher(api_key, **kwargs).fetch_many(symbols)
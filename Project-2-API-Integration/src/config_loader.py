@@ -11,4 +11,21 @@ def load_config():
     with open(config_file_path, 'r') as file:
         config = yaml.safe_load(file)  # Parse YAML content into a Python dictionary
 
-    return config
\ No newline at end of file
+    return config
+
+
+# Function to build the price store selected under `storage` in config.yaml
+def store_from_config(config):
+    """
+    Return a PriceStore for the parquet backend, an ArrayStore for the arrays backend,
+    otherwise None (processed CSVs).
+    """
+    storage = config.get('storage', {})
+    backend = storage.get('backend', 'csv')
+    if backend == 'arrays':
+        from array_store import ArrayStore, ARRAY_STORE_DIR
+        return ArrayStore(storage.get('array_dir', ARRAY_STORE_DIR))
+    if backend != 'parquet':
+        return None
+    from price_store import PriceStore, STORE_DIR  # Only load pyarrow when the store is used
+    return PriceStore(storage.get('store_dir', STORE_DIR))
\ No newline at end of file
@@ -0,0 +1,137 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from stock_data import PROCESSED_DIR
+
+TRADING_DAYS_PER_YEAR = 252
+# Column order of the processed CSVs. Defined here rather than imported from price_store,
+# which would load pyarrow for readers of CSVs and the array store as well
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def load_matrix(symbols, column="Close", start=None, end=None, store=None, processed_dir=PROCESSED_DIR):
+    """
+    Load one price column for many symbols as an aligned date x symbol frame.
+
+    Reads from a PriceStore in a single dataset scan when one is given, otherwise from the
+    processed CSVs. Dates missing for a symbol are NaN.
+    """
+    symbols = list(symbols)
+    if store is not None:
+        long = store.read_many(symbols, start=start, end=end, columns=[column])
+        matrix = long.pivot(index="date", columns="symbol", values=column)
+    else:
+        columns = {}
+        for symbol in symbols:
+            path = os.path.join(processed_dir, f"{symbol}.csv")
+            # Processed CSVs have the date index followed by PRICE_COLUMNS; parse only the one needed
+            series = pd.read_csv(path, index_col=0, usecols=[0, PRICE_COLUMNS.index(column) + 1],
+                                 parse_dates=True)[column]
+            columns[symbol] = series.loc[start:end] if start is not None or end is not None else series
+        matrix = pd.concat(columns, axis=1)
+    matrix = matrix.reindex(columns=symbols).sort_index().astype(np.float64)
+    matrix.index.name = None
+    matrix.columns.name = None
+    return matrix
+
+
+def _window_sums(values, window):
+    """Rolling sums and counts of non-NaN values over axis 0, via one cumulative sum per array."""
+    valid = ~np.isnan(values)
+    padded = np.zeros((values.shape[0] + 1, values.shape[1]))
+    counts = np.zeros_like(padded)
+    np.cumsum(np.where(valid, values, 0.0), axis=0, out=padded[1:])
+    np.cumsum(valid, axis=0, out=counts[1:])
+    return padded[window:] - padded[:-window], counts[window:] - counts[:-window]
+
+
+def moving_average(matrix, window):
+    """Rolling mean of every column; NaN until a full window of values is available (rolling(window).mean())."""
+    values = matrix.to_numpy(dtype=np.float64)
+    result = np.full(values.shape, np.nan)
+    if values.shape[0] >= window:
+        sums, counts = _window_sums(values, window)
+        result[window - 1:] = np.where(counts == window, sums / window, np.nan)
+    return pd.DataFrame(result, index=matrix.index, columns=matrix.columns)
+
+
+def rolling_std(matrix, window):
+    """Rolling sample standard deviation of every column (rolling(window).std())."""
+    values = matrix.to_numpy(dtype=np.float64)
+    result = np.full(values.shape, np.nan)
+    if values.shape[0] >= window:
+        # Centre each column first so the sum-of-squares formula does not lose precision on price levels
+        centred = values - np.nanmean(values, axis=0)
+        sums, counts = _window_sums(centred, window)
+        squares, _ = _window_sums(centred ** 2, window)
+        variance = np.maximum(squares - sums ** 2 / window, 0.0) / (window - 1)
+        result[window - 1:] = np.where(counts == window, np.sqrt(variance), np.nan)
+    return pd.DataFrame(result, index=matrix.index, columns=matrix.columns)
+
+
+def returns(matrix, log=False):
+    """Period-over-period simple (or log) returns of every column; the first row is NaN."""
+    values = matrix.to_numpy(dtype=np.float64)
+    result = np.full(values.shape, np.nan)
+    if log:
+        result[1:] = np.log(values[1:] / values[:-1])
+    else:
+        result[1:] = values[1:] / values[:-1] - 1.0
+    return pd.DataFrame(result, index=matrix.index, columns=matrix.columns)
+
+
+def correlation_matrix(matrix, min_periods=2):
+    """
+    Pearson correlation between all column pairs using pairwise-complete observations,
+    computed with a handful of matrix products instead of a loop over pairs (DataFrame.corr()).
+    """
+    values = matrix.to_numpy(dtype=np.float64)
+    if values.shape[0] >= min_periods and not np.isnan(values).any():
+        # Fully populated: standardise once and take a single matrix product
+        centred = values - values.mean(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scaled = centred / np.sqrt((centred ** 2).sum(axis=0))
+        corr = np.clip(scaled.T @ scaled, -1.0, 1.0)
+        np.fill_diagonal(corr, np.where(np.isnan(np.diag(corr)), np.nan, 1.0))
+        return pd.DataFrame(corr, index=matrix.columns, columns=matrix.columns)
+
+    valid = (~np.isnan(values)).astype(np.float64)
+    filled = np.where(valid > 0, values, 0.0)
+
+    count = valid.T @ valid                 # Observations shared by each pair
+    sum_x = filled.T @ valid                # Sum of column i over rows where j is also present
+    sum_xx = (filled ** 2).T @ valid
+    sum_xy = filled.T @ filled
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        covariance = sum_xy - sum_x * sum_x.T / count
+        variance_x = sum_xx - sum_x ** 2 / count
+        corr = covariance / np.sqrt(variance_x * variance_x.T)
+    corr[count < min_periods] = np.nan
+    corr = np.clip(corr, -1.0, 1.0)
+    np.fill_diagonal(corr, np.where(np.diag(count) >= min_periods, 1.0, np.nan))
+    return pd.DataFrame(corr, index=matrix.columns, columns=matrix.columns)
+
+
+def summarize(prices, ma_windows=(50, 200), volatility_window=30):
+    """
+    Run the analysis.py indicators for every symbol at once.
+
+    Returns a dict with the moving averages (keyed "<window>_MA"), "Volatility", "Returns",
+    the return "Correlation" matrix and a per-symbol "Summary" of the latest values.
+    """
+    daily_returns = returns(prices)
+    results = {f"{window}_MA": moving_average(prices, window) for window in ma_windows}
+    results["Volatility"] = rolling_std(prices, volatility_window)
+    results["Returns"] = daily_returns
+    # The first row of returns is always NaN; dropping it keeps the single-product path for complete data
+    results["Correlation"] = correlation_matrix(daily_returns.iloc[1:])
+    results["Summary"] = pd.DataFrame({
+        "Last Close": prices.ffill().iloc[-1],
+        "Mean Daily Return": daily_returns.mean(),
+        "Annualized Volatility": daily_returns.std() * np.sqrt(TRADING_DAYS_PER_YEAR),
+        **{f"{window}_MA": results[f"{window}_MA"].iloc[-1] for window in ma_windows},
+    })
+    return results
@@ -1,28 +1,61 @@
-from config_loader import load_config  # Import the load_config function
-from stock_data import StockData
+import argparse
+from config_loader import load_config, store_from_config  # Import the load_config function
+from batch_fetch import BatchFetcher
+from http_session import configure_session
+from instrumentation import run_instrumentation
+from rate_limiter import TokenBucket
+from response_cache import configure_cache
 import logging
 from logging_config import setup_logging
 
-# Setup logging configuration (only needs to be done once)
-setup_logging()
 
-# Now you can log messages in this script
-logging.info('Fetching stock data...')
-logging.error('Error occurred while fetching data.')
+def main():
+    parser = argparse.ArgumentParser(description="Fetch stock data for the configured symbols.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Fetch only the compact series and append new trading days to the processed data")
+    args = parser.parse_args()
 
+    # Setup logging configuration (only needs to be done once)
+    setup_logging()
+    logging.info('Fetching stock data...')
 
-def main():
-    # Load the configuration values (API key and stock symbol) from config.yaml
+    # Load the configuration values (API key and stock symbols) from config.yaml
     config = load_config()
+    # Fetch the whole watchlist if one is configured, otherwise just the single stock symbol
+    symbols = config['stock'].get('symbols') or [config['stock']['symbol']]
+
+    # One keep-alive connection pool is shared by every worker and symbol
+    configure_session(**config.get('http', {}))
+    # Serve repeat requests within the TTL from disk instead of spending API quota
+    configure_cache(**config.get('cache', {}))
+
+    # All intervals share one rate limiter so the combined request rate stays within the quota
+    rate_limiter = TokenBucket.per_minute(config['api'].get('requests_per_minute', 5))
+    store = store_from_config(config)
+
+    # Per-stage timings, row counts and peak memory of this run (see `instrumentation` in config.yaml)
+    with run_instrumentation(**config.get('instrumentation', {})):
+        fetch_intervals(config, symbols, rate_limiter, store, args.incremental)
+
+
+def fetch_intervals(config, symbols, rate_limiter, store, incremental):
     api_key = config['api']['key']  # Access the API key from the config
-    stock_symbol = config['stock']['symbol']  # Access the stock symbol from the config
-
-    stock_data = StockData(stock_symbol, api_key)
-    data = stock_data.fetch_data()
-    if data:
-        print("Data fetched successfully.")
-    else:
-        print("Data fetch failed.")
+    for interval in config['stock'].get('intervals', ['daily']):
+        fetcher = BatchFetcher(
+            api_key,
+            max_workers=config['api'].get('max_workers', 4),
+            max_retries=config['api'].get('max_retries', 3),
+            rate_limiter=rate_limiter,
+            incremental=incremental,
+            store=store,
+            interval=interval,
+        )
+        results = fetcher.fetch_many(symbols)
+        for symbol, result in results.items():
+            if result is not None:
+                print(f"{symbol} ({interval}): data fetched successfully.")
+            else:
+                print(f"{symbol} ({interval}): data fetch failed.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,79 @@
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 5   # seconds
+DEFAULT_READ_TIMEOUT = 30     # seconds
+
+
+class PooledSession(requests.Session):
+    """
+    requests.Session with a sized keep-alive connection pool, gzip negotiation
+    and a default (connect, read) timeout applied to every request.
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT):
+        super().__init__()
+        self.timeout = (connect_timeout, read_timeout)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        self.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+    def connection_stats(self):
+        """Return counts of requests sent, connections opened and connections reused."""
+        requests_sent = 0
+        connections_opened = 0
+        for adapter in set(self.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools[key]
+                requests_sent += pool.num_requests
+                connections_opened += pool.num_connections
+        return {
+            "requests": requests_sent,
+            "connections": connections_opened,
+            "reused": requests_sent - connections_opened,
+        }
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def configure_session(pool_size=DEFAULT_POOL_SIZE, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                      read_timeout=DEFAULT_READ_TIMEOUT):
+    """Replace the shared session with one using the given pool size and timeouts."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = PooledSession(pool_size, connect_timeout, read_timeout)
+        return _session
+
+
+def get_session():
+    """Return the session shared by all StockData instances, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = PooledSession()
+        return _session
+
+
+def log_connection_stats():
+    """Log how many requests were served over reused keep-alive connections."""
+    if _session is None:
+        return None
+    stats = _session.connection_stats()
+    logging.info(f"HTTP connections: {stats['requests']} requests over {stats['connections']} "
+                 f"connections ({stats['reused']} reused)")
+    return stats
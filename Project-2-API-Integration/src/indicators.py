@@ -0,0 +1,275 @@
+import hashlib
+import json
+import logging
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+INDICATOR_DIR = "../data/indicators"
+
+
+class RingBuffer:
+    """Fixed-size window of the most recent values."""
+
+    def __init__(self, size, values=None, index=0, count=0):
+        self.size = size
+        self.values = list(values) if values is not None else [0.0] * size
+        self.index = index
+        self.count = count
+
+    @property
+    def full(self):
+        return self.count == self.size
+
+    def push(self, value):
+        """Store `value` and return the value it replaced (None while the buffer is filling)."""
+        old = self.values[self.index] if self.full else None
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        return old
+
+    def to_dict(self):
+        return {"size": self.size, "values": self.values, "index": self.index, "count": self.count}
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(state["size"], state["values"], state["index"], state["count"])
+
+
+class SMA:
+    """Simple moving average; matches Series.rolling(window).mean()."""
+
+    def __init__(self, window):
+        self.window = window
+        self.buffer = RingBuffer(window)
+        self.total = 0.0
+        self.updates = 0
+
+    def update(self, value):
+        old = self.buffer.push(value)
+        self.total += value - (old or 0.0)
+        self.updates += 1
+        if self.updates % self.window == 0:
+            # Recompute once per window so rounding error from the running sum cannot build up
+            self.total = math.fsum(self.buffer.values[:self.buffer.count])
+        return self.total / self.window if self.buffer.full else math.nan
+
+    def to_dict(self):
+        return {"window": self.window, "buffer": self.buffer.to_dict(), "total": self.total, "updates": self.updates}
+
+    @classmethod
+    def from_dict(cls, state):
+        indicator = cls(state["window"])
+        indicator.buffer = RingBuffer.from_dict(state["buffer"])
+        indicator.total = state["total"]
+        indicator.updates = state["updates"]
+        return indicator
+
+
+class EMA:
+    """Exponential moving average; matches Series.ewm(span=span, adjust=False).mean()."""
+
+    def __init__(self, span):
+        self.span = span
+        self.alpha = 2.0 / (span + 1)
+        self.value = None
+
+    def update(self, value):
+        self.value = value if self.value is None else self.value + self.alpha * (value - self.value)
+        return self.value
+
+    def to_dict(self):
+        return {"span": self.span, "value": self.value}
+
+    @classmethod
+    def from_dict(cls, state):
+        indicator = cls(state["span"])
+        indicator.value = state["value"]
+        return indicator
+
+
+class RollingStd:
+    """
+    Rolling sample standard deviation (ddof=1) kept with a windowed Welford accumulator;
+    matches Series.rolling(window).std().
+    """
+
+    def __init__(self, window):
+        if window < 2:
+            raise ValueError("RollingStd needs a window of at least 2")
+        self.window = window
+        self.buffer = RingBuffer(window)
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, value):
+        old = self.buffer.push(value)
+        if old is None:
+            count = self.buffer.count
+            delta = value - self.mean
+            self.mean += delta / count
+            self.m2 += delta * (value - self.mean)
+        else:
+            previous_mean = self.mean
+            self.mean += (value - old) / self.window
+            self.m2 += (value - old) * (value - self.mean + old - previous_mean)
+        if not self.buffer.full:
+            return math.nan
+        return math.sqrt(max(self.m2, 0.0) / (self.window - 1))
+
+    def to_dict(self):
+        return {"window": self.window, "buffer": self.buffer.to_dict(), "mean": self.mean, "m2": self.m2}
+
+    @classmethod
+    def from_dict(cls, state):
+        indicator = cls(state["window"])
+        indicator.buffer = RingBuffer.from_dict(state["buffer"])
+        indicator.mean = state["mean"]
+        indicator.m2 = state["m2"]
+        return indicator
+
+
+class Returns:
+    """Simple period-over-period return; matches Series.pct_change()."""
+
+    def __init__(self):
+        self.previous = None
+
+    def update(self, value):
+        result = math.nan if self.previous is None else value / self.previous - 1.0
+        self.previous = value
+        return result
+
+    def to_dict(self):
+        return {"previous": self.previous}
+
+    @classmethod
+    def from_dict(cls, state):
+        indicator = cls()
+        indicator.previous = state["previous"]
+        return indicator
+
+
+INDICATOR_TYPES = {cls.__name__: cls for cls in (SMA, EMA, RollingStd, Returns)}
+
+
+class IndicatorEngine:
+    """
+    Keeps running state for a set of named indicators over one price column.
+
+    Each new bar updates every indicator in constant time, so appending a day of data costs the
+    same regardless of how much history has been processed. Bars must arrive in strictly
+    ascending time order; anything else raises ValueError.
+    """
+
+    def __init__(self, indicators, column="Close"):
+        self.indicators = dict(indicators)
+        self.column = column
+        self.last_timestamp = None
+        self.fingerprint = None  # Of the bars fed so far, set by update_indicators
+
+    @classmethod
+    def default(cls):
+        """The indicators analysis.py plots: 50/200-day moving averages and 30-day volatility."""
+        return cls({
+            "50_MA": SMA(50),
+            "200_MA": SMA(200),
+            "EMA_20": EMA(20),
+            "Volatility": RollingStd(30),
+            "Return": Returns(),
+        })
+
+    def update(self, timestamp, value):
+        timestamp = pd.Timestamp(timestamp)
+        if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            raise ValueError(f"Bars must be in ascending time order: {timestamp} is not after {self.last_timestamp}")
+        self.last_timestamp = timestamp
+        return {name: indicator.update(value) for name, indicator in self.indicators.items()}
+
+    def run(self, df):
+        """Feed every row of `df` (date-indexed, ascending) and return the indicator values as a frame."""
+        if not df.index.is_monotonic_increasing or not df.index.is_unique:
+            raise ValueError("Price data must be sorted in ascending time order without duplicates")
+        rows = [self.update(timestamp, float(value)) for timestamp, value in df[self.column].items()]
+        return pd.DataFrame(rows, index=df.index, columns=list(self.indicators))
+
+    def to_dict(self):
+        return {
+            "column": self.column,
+            "last_timestamp": None if self.last_timestamp is None else self.last_timestamp.isoformat(),
+            "fingerprint": self.fingerprint,
+            "indicators": {name: {"type": type(indicator).__name__, "state": indicator.to_dict()}
+                           for name, indicator in self.indicators.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        indicators = {name: INDICATOR_TYPES[spec["type"]].from_dict(spec["state"])
+                      for name, spec in state["indicators"].items()}
+        engine = cls(indicators, state["column"])
+        if state["last_timestamp"] is not None:
+            engine.last_timestamp = pd.Timestamp(state["last_timestamp"])
+        engine.fingerprint = state.get("fingerprint")
+        return engine
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self.to_dict(), file)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r") as file:
+            return cls.from_dict(json.load(file))
+
+
+def price_fingerprint(prices, column="Close"):
+    """Hash of the timestamps and values of `column`, to tell whether stored history has changed."""
+    digest = hashlib.sha256(pd.DatetimeIndex(prices.index).asi8.tobytes())
+    digest.update(prices[column].to_numpy(dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def update_indicators(series_name, prices, indicator_dir=INDICATOR_DIR):
+    """
+    Bring the stored indicators for `series_name` up to date with `prices` and return all of them.
+
+    Engine state is kept in `<indicator_dir>/<series_name>.json` and values in
+    `<indicator_dir>/<series_name>.csv`, so only bars newer than the last run are processed
+    and appended. The state records a fingerprint of the bars it has consumed; when those bars
+    differ in `prices` (a corrected or re-fetched history) everything is recomputed.
+    """
+    state_path = os.path.join(indicator_dir, f"{series_name}.json")
+    values_path = os.path.join(indicator_dir, f"{series_name}.csv")
+    prices = prices.sort_index()
+
+    engine = None
+    if os.path.exists(state_path) and os.path.exists(values_path):
+        engine = IndicatorEngine.load(state_path)
+        if engine.last_timestamp is None:
+            engine = None  # Saved from an empty run
+        else:
+            consumed = prices[prices.index <= engine.last_timestamp]
+            if engine.fingerprint != price_fingerprint(consumed, engine.column):
+                logging.info(f"{series_name}: price history changed, recomputing indicators")
+                engine = None
+
+    if engine is not None:
+        new_prices = prices[prices.index > engine.last_timestamp]
+        append = True
+    else:
+        engine = IndicatorEngine.default()
+        new_prices = prices
+        append = False
+
+    new_values = engine.run(new_prices)
+    engine.fingerprint = price_fingerprint(prices, engine.column)
+    os.makedirs(indicator_dir, exist_ok=True)
+    new_values.to_csv(values_path, mode="a" if append else "w", header=not append)
+    engine.save(state_path)
+    return pd.read_csv(values_path, index_col=0, parse_dates=True)
@@ -0,0 +1,201 @@
+import cProfile
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+
+try:
+    import resource  # Not available on Windows; peak RSS is then left out
+except ImportError:
+    resource = None
+
+
+def peak_rss_mb():
+    """Return the process's peak resident set size so far in MB, or None if it cannot be read."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class Span:
+    """One timed pipeline stage. Set `rows_out` (and `rows_in`, if not passed in) inside the `with` block."""
+
+    def __init__(self, name, parent=None, rows_in=None):
+        self.name = name
+        self.parent = parent
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.wall_s = None
+        self.peak_rss_mb = None
+        self.traced_peak_mb = None
+        self._traced_peak = 0
+
+    @property
+    def path(self):
+        return f"{self.parent.path}/{self.name}" if self.parent else self.name
+
+    def to_dict(self):
+        return {"span": self.path, "wall_s": self.wall_s, "rows_in": self.rows_in, "rows_out": self.rows_out,
+                "peak_rss_mb": self.peak_rss_mb, "traced_peak_mb": self.traced_peak_mb}
+
+
+class Recorder:
+    """
+    Collects spans from every thread.
+
+    Wall time and the process's peak RSS are always recorded. With `trace_memory=True`, tracemalloc
+    also measures the peak Python allocation inside each span (including its child spans). This
+    slows allocation-heavy code down noticeably, so it is meant for investigating a regression rather
+    than for every run. tracemalloc is process-wide, so with concurrent spans each peak covers all threads.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.spans = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+
+    def close(self):
+        """Stop tracemalloc if this recorder started it; the recorded spans stay available."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name, rows_in=None):
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        current = Span(name, parent, rows_in)
+        if self.trace_memory:
+            if parent is not None:
+                parent._traced_peak = max(parent._traced_peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        stack.append(current)
+        start = time.perf_counter()
+        try:
+            yield current
+        finally:
+            current.wall_s = time.perf_counter() - start
+            stack.pop()
+            current.peak_rss_mb = peak_rss_mb()
+            if self.trace_memory:
+                current._traced_peak = max(current._traced_peak, tracemalloc.get_traced_memory()[1])
+                current.traced_peak_mb = current._traced_peak / (1024 * 1024)
+                if parent is not None:
+                    parent._traced_peak = max(parent._traced_peak, current._traced_peak)
+            with self._lock:
+                self.spans.append(current)
+
+    def summary(self):
+        """Aggregate the recorded spans by path: call count, total and max wall time, rows and peak memory."""
+        stages = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            stage = stages.setdefault(span.path, {"calls": 0, "total_s": 0.0, "max_s": 0.0, "rows_in": None,
+                                                  "rows_out": None, "peak_rss_mb": None, "traced_peak_mb": None})
+            stage["calls"] += 1
+            stage["total_s"] += span.wall_s
+            stage["max_s"] = max(stage["max_s"], span.wall_s)
+            for key in ("rows_in", "rows_out"):
+                if getattr(span, key) is not None:
+                    stage[key] = (stage[key] or 0) + getattr(span, key)
+            for key in ("peak_rss_mb", "traced_peak_mb"):
+                if getattr(span, key) is not None:
+                    stage[key] = max(stage[key] or 0, getattr(span, key))
+        return stages
+
+    def write_json(self, path):
+        """Write the per-stage summary and every individual span to `path`."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._lock:
+            spans = [span.to_dict() for span in self.spans]
+        with open(path, "w") as file:
+            json.dump({"stages": self.summary(), "spans": spans}, file, indent=2)
+
+    def log_summary(self):
+        for path, stage in self.summary().items():
+            logging.info(f"Span {path}: {stage['calls']} calls, {stage['total_s']:.3f}s total, "
+                         f"rows in {stage['rows_in']} out {stage['rows_out']}, peak RSS {stage['peak_rss_mb']} MB")
+
+
+_recorder = None
+
+
+def configure_instrumentation(enabled=True, trace_memory=False):
+    """Start recording spans into a new Recorder (or stop, with enabled=False) and return it."""
+    global _recorder
+    if _recorder is not None:
+        _recorder.close()
+    _recorder = Recorder(trace_memory) if enabled else None
+    return _recorder
+
+
+def get_recorder():
+    return _recorder
+
+
+@contextmanager
+def span(name, rows_in=None):
+    """Time a stage with the configured Recorder; without one the span is not timed or recorded."""
+    if _recorder is None:
+        yield Span(name, rows_in=rows_in)
+    else:
+        with _recorder.span(name, rows_in) as current:
+            yield current
+
+
+def timed(name=None):
+    """Decorator that records each call as a span; rows_out is the length of the result when it has one."""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name or function.__name__) as current:
+                result = function(*args, **kwargs)
+                if hasattr(result, "__len__"):
+                    current.rows_out = len(result)
+                return result
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def run_instrumentation(enabled=False, trace_memory=False, summary_file=None, profile_file=None):
+    """
+    Instrument one script run. The span summary is logged and, with `summary_file`, written as JSON;
+    with `profile_file` the whole run is profiled with cProfile and the stats dumped there
+    (inspect them with `python -m pstats <file>`).
+    """
+    recorder = configure_instrumentation(enabled, trace_memory)
+    profiler = cProfile.Profile() if profile_file else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield recorder
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            os.makedirs(os.path.dirname(os.path.abspath(profile_file)), exist_ok=True)
+            profiler.dump_stats(profile_file)
+            logging.info(f"Profile written to {profile_file}")
+        if recorder is not None:
+            recorder.log_summary()
+            if summary_file:
+                recorder.write_json(summary_file)
+                logging.info(f"Run summary written to {summary_file}")
+        configure_instrumentation(enabled=False)
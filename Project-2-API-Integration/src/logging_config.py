@@ -1,12 +1,15 @@
 import logging
+import os
 
-# Configure logging
-def setup_logging():
+# logs/app.log in the project directory, wherever the script is started from
+LOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'logs', 'app.log')
+
+
+# Configure logging. Call this once from a script's main(); importing modules never configures logging.
+def setup_logging(log_file=LOG_FILE, level=logging.INFO):
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
     logging.basicConfig(
-        filename='../logs/app.log',  # Log to a file in the logs directory
-        level=logging.INFO,          # Capture logs from INFO level and above
+        filename=log_file,           # Log to a file in the logs directory
+        level=level,                 # Capture logs from INFO level and above
         format='%(asctime)s - %(levelname)s - %(message)s'  # Log format
-    )
-
-# Call the setup function
-setup_logging()
\ No newline at end of file
+    )  # basicConfig does nothing if logging is already configured, so repeated calls are harmless
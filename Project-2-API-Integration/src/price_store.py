@@ -0,0 +1,180 @@
+import glob
+import logging
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+STORE_DIR = "../data/store"
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+SCHEMA = pa.schema([
+    ("date", pa.timestamp("ns")),
+    ("Open", pa.float32()),
+    ("High", pa.float32()),
+    ("Low", pa.float32()),
+    ("Close", pa.float32()),
+    ("Volume", pa.int64()),
+])
+PARTITIONING = ds.partitioning(pa.schema([("symbol", pa.string()), ("year", pa.int32())]), flavor="hive")
+
+
+class PriceStore:
+    """
+    Columnar store for processed daily prices.
+
+    Data is kept as Parquet files partitioned by symbol and year
+    (`<root>/symbol=AAPL/year=2025/part-0.parquet`) with float32 prices and int64 volume.
+    Reads only open the partitions and columns they need: date bounds are pushed down to
+    the year partitions and row groups, and `columns` limits which columns are decoded.
+    """
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+
+    def _symbol_dir(self, symbol):
+        return os.path.join(self.root, f"symbol={symbol}")
+
+    def _partition_path(self, symbol, year):
+        return os.path.join(self._symbol_dir(symbol), f"year={year}", "part-0.parquet")
+
+    @staticmethod
+    def _to_table(df):
+        frame = df[PRICE_COLUMNS].astype({"Open": "float32", "High": "float32", "Low": "float32",
+                                          "Close": "float32", "Volume": "int64"})
+        frame.insert(0, "date", pd.DatetimeIndex(df.index).astype("datetime64[ns]"))
+        return pa.Table.from_pandas(frame, schema=SCHEMA, preserve_index=False)
+
+    def _write_partition(self, symbol, year, df):
+        path = self._partition_path(symbol, year)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        pq.write_table(self._to_table(df), path)
+
+    def delete(self, symbol):
+        shutil.rmtree(self._symbol_dir(symbol), ignore_errors=True)
+
+    def write(self, symbol, df):
+        """Replace everything stored for `symbol` with `df` (a date-indexed OHLCV frame)."""
+        self.delete(symbol)
+        df = df.sort_index()
+        for year, rows in df.groupby(df.index.year):
+            self._write_partition(symbol, year, rows)
+        logging.info(f"{symbol}: wrote {len(df)} rows to {self._symbol_dir(symbol)}")
+
+    def write_chunks(self, symbol, chunks):
+        """
+        Replace everything stored for `symbol` with the rows of an iterable of frames, e.g. the chunks
+        of a streamed raw file. Each chunk is written as row groups of its year partitions through one
+        open ParquetWriter per year, so every partition is written once and only one chunk is held in
+        memory. Returns the number of rows written.
+        """
+        self.delete(symbol)
+        writers = {}
+        rows = 0
+        try:
+            for chunk in chunks:
+                for year, part in chunk.groupby(chunk.index.year):
+                    if year not in writers:
+                        path = self._partition_path(symbol, year)
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        writers[year] = pq.ParquetWriter(path, SCHEMA)
+                    writers[year].write_table(self._to_table(part))
+                rows += len(chunk)
+        finally:
+            for writer in writers.values():
+                writer.close()
+        logging.info(f"{symbol}: wrote {rows} rows to {self._symbol_dir(symbol)}")
+        return rows
+
+    def append(self, symbol, df):
+        """
+        Merge new rows into the store. Only the year partitions that receive rows are rewritten;
+        rows for dates already stored are replaced by the new values.
+        """
+        if df.empty:
+            return
+        for year, rows in df.groupby(df.index.year):
+            path = self._partition_path(symbol, year)
+            if os.path.exists(path):
+                existing = self._read_partition(path)
+                rows = pd.concat([existing[~existing.index.isin(rows.index)], rows])
+            self._write_partition(symbol, year, rows.sort_index())
+
+    @staticmethod
+    def _read_partition(path):
+        return pq.read_table(path).to_pandas().set_index("date")
+
+    def symbols(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name.split("=", 1)[1] for name in os.listdir(self.root) if name.startswith("symbol="))
+
+    def has_symbol(self, symbol):
+        return os.path.isdir(self._symbol_dir(symbol))
+
+    def files(self, symbol):
+        """Return the paths of the Parquet partitions holding `symbol`, oldest year first."""
+        return sorted(glob.glob(os.path.join(self._symbol_dir(symbol), "year=*", "*.parquet")))
+
+    def last_date(self, symbol):
+        """Return the newest stored date for `symbol`, reading only the date column of its latest year."""
+        symbol_dir = self._symbol_dir(symbol)
+        if not os.path.isdir(symbol_dir):
+            return None
+        years = sorted(int(name.split("=", 1)[1]) for name in os.listdir(symbol_dir) if name.startswith("year="))
+        if not years:
+            return None
+        dates = pq.read_table(self._partition_path(symbol, years[-1]), columns=["date"]).column("date")
+        return pd.Timestamp(pc.max(dates).as_py())
+
+    def _dataset(self):
+        return ds.dataset(self.root, format="parquet", partitioning=PARTITIONING)
+
+    def read_many(self, symbols=None, start=None, end=None, columns=None):
+        """
+        Read a long frame with `date`, `symbol` and the requested price columns.
+        `start`/`end` are inclusive date bounds.
+        """
+        columns = list(columns or PRICE_COLUMNS)
+        if not os.path.isdir(self.root):
+            return pd.DataFrame(columns=["date", "symbol"] + columns)
+
+        expression = None
+
+        def add(condition):
+            nonlocal expression
+            expression = condition if expression is None else expression & condition
+
+        if symbols is not None:
+            add(ds.field("symbol").isin(list(symbols)))
+        if start is not None:
+            start = pd.Timestamp(start)
+            add(ds.field("year") >= start.year)
+            add(ds.field("date") >= pa.scalar(start.to_datetime64(), type=pa.timestamp("ns")))
+        if end is not None:
+            end = pd.Timestamp(end)
+            add(ds.field("year") <= end.year)
+            add(ds.field("date") <= pa.scalar(end.to_datetime64(), type=pa.timestamp("ns")))
+
+        table = self._dataset().to_table(columns=["date", "symbol"] + columns, filter=expression)
+        df = table.to_pandas()
+        df["symbol"] = df["symbol"].astype(str)
+        return df.sort_values(["symbol", "date"], kind="stable").reset_index(drop=True)
+
+    def read(self, symbol, start=None, end=None, columns=None):
+        """Read one symbol as a date-indexed frame, the same shape as the processed CSV."""
+        df = self.read_many([symbol], start, end, columns)
+        df = df.drop(columns="symbol").set_index("date")
+        df.index.name = None
+        return df
+
+    def export_csv(self, symbol, path):
+        """Write one symbol in the processed CSV layout for tools that still expect text files."""
+        df = self.read(symbol)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        df.to_csv(path)
+        return path
+
@@ -1,31 +1,41 @@
-from config_loader import load_config  # Import the load_config function
+import os
+from config_loader import load_config, store_from_config  # Import the load_config function
 import logging
+from instrumentation import run_instrumentation
 from logging_config import setup_logging
 from stock_data import StockData
-
-# Setup logging configuration (only needs to be done once)
-setup_logging()
-
-# Now you can log messages in this script
-logging.info('Fetching stock data...')
-logging.error('Error occurred while fetching data.')
+from stream_parser import DEFAULT_CHUNK_ROWS
 
 def main():
+    # Setup logging configuration (only needs to be done once)
+    setup_logging()
+    logging.info('Processing stock data...')
+
     # Load the configuration values (API key and stock symbol) from config.yaml
     config = load_config()
     api_key = config['api']['key']  # Access the API key from the config
     stock_symbol = config['stock']['symbol']  # Access the stock symbol from the config
 
-    # Now use the loaded config values for the StockData object
-    stock_data = StockData(stock_symbol, api_key)
-    df = stock_data.process_data()
+    store = store_from_config(config)
+    # Intraday dumps can be large, so they are streamed in chunks of this many bars
+    chunk_rows = config.get('processing', {}).get('chunk_rows', DEFAULT_CHUNK_ROWS)
+
+    # Per-stage timings, row counts and peak memory of this run (see `instrumentation` in config.yaml)
+    with run_instrumentation(**config.get('instrumentation', {})):
+        for interval in config['stock'].get('intervals', ['daily']):
+            # Now use the loaded config values for the StockData object
+            stock_data = StockData(stock_symbol, api_key, store=store, interval=interval)
+            if not os.path.exists(stock_data.raw_file):
+                print(f"No raw data for {stock_data.series_name}, skipping.")
+                continue
+            result = stock_data.process_data(chunk_rows=None if interval == 'daily' else chunk_rows)
 
-    if df is not None:
-        logging.info(f"Data processed successfully for {stock_symbol}.")
-        print("Data processed successfully.")
-    else:
-        logging.error(f"Data processing failed for {stock_symbol}.")
-        print("Data processing failed.")
+            if result is not None:
+                logging.info(f"Data processed successfully for {stock_data.series_name}.")
+                print(f"{stock_data.series_name}: data processed successfully.")
+            else:
+                logging.error(f"Data processing failed for {stock_data.series_name}.")
+                print(f"{stock_data.series_name}: data processing failed.")
 
 if __name__ == "__main__":
     main()
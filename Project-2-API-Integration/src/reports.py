@@ -0,0 +1,136 @@
+import argparse
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from indicators import INDICATOR_DIR
+from stock_data import PROCESSED_DIR
+
+REPORT_DIR = "../reports"
+MANIFEST_FILE = "manifest.json"
+CHART_FILES = ("moving_averages.png", "volatility.png", "correlation.png", "prices.html")
+
+
+def data_fingerprint(symbol, store=None, processed_dir=PROCESSED_DIR):
+    """Identify the current version of a symbol's data by the size and mtime of its files."""
+    if store is not None and store.has_symbol(symbol):
+        paths = store.files(symbol)
+    else:
+        paths = [os.path.join(processed_dir, f"{symbol}.csv")]
+    fingerprint = []
+    for path in paths:
+        if not os.path.exists(path):
+            return None
+        stat = os.stat(path)
+        fingerprint.append([os.path.basename(os.path.dirname(path)), os.path.basename(path),
+                            stat.st_size, stat.st_mtime_ns])
+    return fingerprint
+
+
+def _load_manifest(output_dir):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as file:
+        return json.load(file)
+
+
+def _save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    with open(path + ".tmp", "w") as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def render_symbol(symbol, output_dir=REPORT_DIR, store=None, processed_dir=PROCESSED_DIR,
+                  indicator_dir=INDICATOR_DIR):
+    """Render every chart for one symbol to `<output_dir>/<symbol>/` and return the file paths."""
+    # Select the non-interactive backend before pyplot is imported by analysis
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import analysis
+
+    df = analysis.add_indicators(analysis.load_prices(symbol, store, processed_dir), symbol, indicator_dir)
+
+    symbol_dir = os.path.join(output_dir, symbol)
+    os.makedirs(symbol_dir, exist_ok=True)
+    paths = [os.path.join(symbol_dir, name) for name in CHART_FILES]
+    for figure, path in zip((analysis.plot_moving_averages(df, symbol), analysis.plot_volatility(df, symbol),
+                             analysis.plot_correlation(df)), paths):
+        figure.savefig(path, dpi=100, bbox_inches="tight")
+        plt.close(figure)
+    analysis.plot_interactive_prices(df, symbol).write_html(paths[3], include_plotlyjs="cdn")
+    return paths
+
+
+def generate_reports(symbols, output_dir=REPORT_DIR, store=None, processed_dir=PROCESSED_DIR,
+                     indicator_dir=INDICATOR_DIR, max_workers=None, force=False):
+    """
+    Render charts for many symbols across a process pool, without any interactive windows.
+
+    A symbol is skipped when its data fingerprint matches the one recorded at its last render
+    and all its chart files still exist. Returns a dict of symbol -> "rendered", "skipped" or
+    "failed" (missing data or a rendering error).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = _load_manifest(output_dir)
+    status = {}
+    pending = {}
+    for symbol in dict.fromkeys(symbols):
+        fingerprint = data_fingerprint(symbol, store, processed_dir)
+        if fingerprint is None:
+            logging.error(f"No processed data for {symbol}, skipping report")
+            status[symbol] = "failed"
+            continue
+        outputs_exist = all(os.path.exists(os.path.join(output_dir, symbol, name)) for name in CHART_FILES)
+        if not force and outputs_exist and manifest.get(symbol) == fingerprint:
+            status[symbol] = "skipped"
+        else:
+            pending[symbol] = fingerprint
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {symbol: executor.submit(render_symbol, symbol, output_dir, store, processed_dir,
+                                               indicator_dir)
+                       for symbol in pending}
+            for symbol, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    logging.error(f"Rendering report for {symbol} failed: {e}")
+                    status[symbol] = "failed"
+                    manifest.pop(symbol, None)
+                else:
+                    status[symbol] = "rendered"
+                    manifest[symbol] = pending[symbol]
+        _save_manifest(output_dir, manifest)
+
+    counts = {state: list(status.values()).count(state) for state in ("rendered", "skipped", "failed")}
+    logging.info(f"Reports: {counts['rendered']} rendered, {counts['skipped']} unchanged, {counts['failed']} failed")
+    return {symbol: status[symbol] for symbol in symbols if symbol in status}
+
+
+def main():
+    from config_loader import load_config, store_from_config
+    from logging_config import setup_logging
+
+    setup_logging()
+    config = load_config()
+    parser = argparse.ArgumentParser(description="Render stock charts for many symbols to files.")
+    parser.add_argument("symbols", nargs="*", help="symbols to render (default: stock.symbols from config.yaml)")
+    parser.add_argument("--output", default=REPORT_DIR, help="directory for the rendered charts")
+    parser.add_argument("--workers", type=int, default=None, help="rendering processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="re-render even if the data has not changed")
+    args = parser.parse_args()
+
+    symbols = args.symbols or config['stock'].get('symbols') or [config['stock']['symbol']]
+    results = generate_reports(symbols, args.output, store=store_from_config(config),
+                               max_workers=args.workers, force=args.force)
+    for symbol, state in results.items():
+        print(f"{symbol}: {state}")
+
+
+if __name__ == "__main__":
+    main()
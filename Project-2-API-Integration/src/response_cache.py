@@ -0,0 +1,175 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import requests
+
+DEFAULT_CACHE_DIR = "../data/cache"
+DEFAULT_TTL_SECONDS = 6 * 60 * 60
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class ResponseCache:
+    """
+    On-disk cache of API response bodies keyed by (function, symbol, interval, outputsize).
+
+    Entries younger than `ttl_seconds` are served without touching the network. Older entries
+    are kept so their ETag/Last-Modified validators can be sent with the next request; a 304
+    answer refreshes the entry instead of downloading it again. The cache is bounded by
+    `max_entries` and `max_bytes`, evicting the least recently used entries first.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, clock=time.time):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "evictions": 0}
+        self._index_path = os.path.join(cache_dir, "index.json")
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index = self._load_index()
+
+    @staticmethod
+    def make_key(function, symbol, interval=None, outputsize=None):
+        raw = "|".join(str(part or "") for part in (function, symbol, interval, outputsize))
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def _load_index(self):
+        if not os.path.exists(self._index_path):
+            return {}
+        try:
+            with open(self._index_path, "r") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            logging.warning(f"Ignoring unreadable cache index {self._index_path}")
+            return {}
+
+    def _save_index(self):
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self._index, file)
+        os.replace(tmp_path, self._index_path)
+
+    def _body_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def lookup(self, key, max_age=None):
+        """
+        Return (response, validators). `response` is a cached requests.Response when the entry is
+        fresh, otherwise None; `validators` holds conditional headers for a stale entry.
+        `max_age` shortens the TTL for this lookup (0 never serves the body without asking the API).
+        """
+        ttl_seconds = self.ttl_seconds if max_age is None else min(self.ttl_seconds, max_age)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None or not os.path.exists(self._body_path(key)):
+                self.stats["misses"] += 1
+                return None, {}
+
+            if self._clock() - entry["stored_at"] < ttl_seconds:
+                self.stats["hits"] += 1
+                entry["last_access"] = self._clock()
+                self._save_index()
+                return self._read_response(key, entry), {}
+
+            self.stats["misses"] += 1
+            validators = {}
+            if entry.get("etag"):
+                validators["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                validators["If-Modified-Since"] = entry["last_modified"]
+            return None, validators
+
+    def revalidated(self, key):
+        """
+        Mark a stale entry as fresh again after a 304 and return its cached response. Returns None
+        when the entry was evicted or cleared while the request was in flight.
+        """
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None or not os.path.exists(self._body_path(key)):
+                return None
+            entry["stored_at"] = entry["last_access"] = self._clock()
+            self.stats["revalidated"] += 1
+            self._save_index()
+            return self._read_response(key, entry)
+
+    def store(self, key, response):
+        body = response.content
+        with self._lock:
+            with open(self._body_path(key), "wb") as file:
+                file.write(body)
+            now = self._clock()
+            self._index[key] = {
+                "stored_at": now,
+                "last_access": now,
+                "size": len(body),
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+            self._evict()
+            self._save_index()
+
+    def _evict(self):
+        total_bytes = sum(entry["size"] for entry in self._index.values())
+        by_age = sorted(self._index, key=lambda k: self._index[k]["last_access"])
+        for key in by_age:
+            if len(self._index) <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            total_bytes -= self._index.pop(key)["size"]
+            self.stats["evictions"] += 1
+            try:
+                os.remove(self._body_path(key))
+            except FileNotFoundError:
+                pass
+
+    def _read_response(self, key, entry):
+        response = requests.Response()
+        response.status_code = 200
+        with open(self._body_path(key), "rb") as file:
+            response._content = file.read()
+        response.headers["Content-Type"] = "application/json"
+        if entry.get("etag"):
+            response.headers["ETag"] = entry["etag"]
+        response.from_cache = True
+        return response
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._index):
+                try:
+                    os.remove(self._body_path(key))
+                except FileNotFoundError:
+                    pass
+            self._index = {}
+            self._save_index()
+
+    def log_stats(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        hit_rate = self.stats["hits"] / lookups if lookups else 0.0
+        logging.info(f"Response cache: {self.stats['hits']} hits, {self.stats['misses']} misses "
+                     f"({hit_rate:.0%} hit rate), {self.stats['revalidated']} revalidated, "
+                     f"{self.stats['evictions']} evicted")
+        return dict(self.stats)
+
+
+_cache = None
+
+
+def configure_cache(enabled=True, **kwargs):
+    """Set the cache shared by all StockData instances from config.yaml's `cache` section."""
+    global _cache
+    _cache = ResponseCache(**kwargs) if enabled else None
+    return _cache
+
+
+def get_cache():
+    """Return the shared cache, or None when caching has not been enabled."""
+    return _cache
@@ -0,0 +1,201 @@
+import heapq
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from batch_fetch import BatchFetcher
+from rate_limiter import TokenBucket
+from stock_data import BASE_URL
+
+STATE_FILE = "../data/scheduler_state.json"
+# Seconds between refreshes of each interval's series
+DEFAULT_PERIODS = {"1min": 60, "5min": 300, "15min": 900, "30min": 1800, "60min": 3600, "daily": 86400}
+
+
+class JobStats:
+    """Running latency statistics for one (symbol, interval) job."""
+
+    def __init__(self, runs=0, failures=0, total_seconds=0.0, max_seconds=0.0, last_seconds=None):
+        self.runs = runs
+        self.failures = failures
+        self.total_seconds = total_seconds
+        self.max_seconds = max_seconds
+        self.last_seconds = last_seconds
+
+    def record(self, seconds, succeeded):
+        self.runs += 1
+        self.failures += 0 if succeeded else 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.last_seconds = seconds
+
+    @property
+    def mean_seconds(self):
+        return self.total_seconds / self.runs if self.runs else None
+
+    def to_dict(self):
+        return {"runs": self.runs, "failures": self.failures, "total_seconds": self.total_seconds,
+                "max_seconds": self.max_seconds, "last_seconds": self.last_seconds}
+
+
+class FetchScheduler:
+    """
+    Resident replacement for the cron job: keeps config, HTTP connections and the rate limiter
+    warm and refreshes every (symbol, interval) job when it falls due.
+
+    Jobs live in a priority queue ordered by (next due time, interval period), so when several are
+    due the shortest intervals go first. The queue and per-job latency stats are written to
+    `state_file` after every round, so a restarted scheduler resumes the same schedule.
+    """
+
+    def __init__(self, api_key, symbols, intervals, periods=None, state_file=STATE_FILE, rate_limiter=None,
+                 requests_per_minute=5, max_workers=4, max_retries=3, store=None, base_url=BASE_URL,
+                 clock=time.time):
+        self.periods = dict(DEFAULT_PERIODS, **(periods or {}))
+        self.state_file = state_file
+        self.max_workers = max_workers
+        self._clock = clock
+        self._stop = threading.Event()
+        rate_limiter = rate_limiter or TokenBucket.per_minute(requests_per_minute)
+        # One incremental fetcher per interval, all drawing on the same quota. Each run must see the bars
+        # added since the last one, so cached responses are only used to send conditional requests
+        self.fetchers = {
+            interval: BatchFetcher(api_key, max_retries=max_retries, rate_limiter=rate_limiter, incremental=True,
+                                   store=store, interval=interval, base_url=base_url, cache_max_age=0)
+            for interval in intervals
+        }
+        self.stats = {}
+        self._queue = []
+        self._load_state(symbols, intervals)
+
+    @staticmethod
+    def job_name(symbol, interval):
+        return f"{symbol}:{interval}"
+
+    def _load_state(self, symbols, intervals):
+        saved_due = {}
+        if os.path.exists(self.state_file):
+            with open(self.state_file, "r") as file:
+                state = json.load(file)
+            saved_due = {self.job_name(job["symbol"], job["interval"]): job["next_due"] for job in state["jobs"]}
+            self.stats = {name: JobStats(**values) for name, values in state.get("stats", {}).items()}
+            logging.info(f"Resuming {len(saved_due)} scheduled jobs from {self.state_file}")
+
+        now = self._clock()
+        for symbol in dict.fromkeys(symbols):
+            for interval in intervals:
+                # Jobs new to the configuration are due immediately
+                next_due = saved_due.get(self.job_name(symbol, interval), now)
+                heapq.heappush(self._queue, (next_due, self.periods[interval], symbol, interval))
+
+    def save_state(self):
+        state = {
+            "jobs": [{"symbol": symbol, "interval": interval, "next_due": next_due}
+                     for next_due, _, symbol, interval in sorted(self._queue)],
+            "stats": {name: stats.to_dict() for name, stats in self.stats.items()},
+        }
+        os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+        with open(self.state_file + ".tmp", "w") as file:
+            json.dump(state, file, indent=2)
+        os.replace(self.state_file + ".tmp", self.state_file)
+
+    def next_due(self):
+        return self._queue[0][0] if self._queue else None
+
+    def _run_job(self, symbol, interval):
+        started = time.perf_counter()
+        try:
+            result = self.fetchers[interval].fetch_one(symbol)
+        except Exception:
+            logging.exception(f"Scheduled fetch of {self.job_name(symbol, interval)} failed")
+            result = None
+        return result is not None, time.perf_counter() - started
+
+    def run_pending(self, executor=None):
+        """Run every job that is due now, reschedule it and persist the queue. Returns the jobs run."""
+        now = self._clock()
+        due = []
+        while self._queue and self._queue[0][0] <= now:
+            due.append(heapq.heappop(self._queue))
+        if not due:
+            return []
+
+        own_executor = executor is None
+        executor = executor or ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures = [(job, executor.submit(self._run_job, job[2], job[3])) for job in due]
+            for (scheduled, period, symbol, interval), future in futures:
+                succeeded, seconds = future.result()
+                name = self.job_name(symbol, interval)
+                self.stats.setdefault(name, JobStats()).record(seconds, succeeded)
+                logging.info(f"{name}: {'ok' if succeeded else 'failed'} in {seconds:.2f}s")
+                # Skip slots missed while the scheduler was down or busy instead of replaying them
+                next_due = scheduled + period
+                if next_due <= now:
+                    next_due = now + period - (now - scheduled) % period
+                heapq.heappush(self._queue, (next_due, period, symbol, interval))
+        finally:
+            if own_executor:
+                executor.shutdown()
+        self.save_state()
+        return [(symbol, interval) for _, _, symbol, interval in due]
+
+    def job_stats(self):
+        """Per-job run counts, failures and latency (last, mean, max) in seconds."""
+        return {name: dict(stats.to_dict(), mean_seconds=stats.mean_seconds) for name, stats in self.stats.items()}
+
+    def log_stats(self):
+        for name, stats in sorted(self.stats.items()):
+            logging.info(f"{name}: {stats.runs} runs, {stats.failures} failed, "
+                         f"mean {stats.mean_seconds:.2f}s, max {stats.max_seconds:.2f}s")
+
+    def stop(self, *args):
+        self._stop.set()
+
+    def run_forever(self, poll_seconds=1.0):
+        """Run jobs as they fall due until stop() is called (also wired to SIGINT/SIGTERM by main)."""
+        logging.info(f"Scheduler started with {len(self._queue)} jobs")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while not self._stop.is_set():
+                self.run_pending(executor)
+                wait = self.next_due() - self._clock() if self._queue else poll_seconds
+                self._stop.wait(min(max(wait, 0.0), poll_seconds))
+        self.save_state()
+        self.log_stats()
+        logging.info("Scheduler stopped")
+
+
+def main():
+    from config_loader import load_config, store_from_config
+    from http_session import configure_session
+    from logging_config import setup_logging
+    from response_cache import configure_cache
+
+    setup_logging()
+    config = load_config()
+    configure_session(**config.get('http', {}))
+    configure_cache(**config.get('cache', {}))
+    scheduler_config = config.get('scheduler', {})
+
+    scheduler = FetchScheduler(
+        config['api']['key'],
+        config['stock'].get('symbols') or [config['stock']['symbol']],
+        config['stock'].get('intervals', ['daily']),
+        periods=scheduler_config.get('periods'),
+        state_file=scheduler_config.get('state_file', STATE_FILE),
+        requests_per_minute=config['api'].get('requests_per_minute', 5),
+        max_workers=config['api'].get('max_workers', 4),
+        max_retries=config['api'].get('max_retries', 3),
+        store=store_from_config(config),
+    )
+    signal.signal(signal.SIGTERM, scheduler.stop)
+    signal.signal(signal.SIGINT, scheduler.stop)
+    scheduler.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import span
+
+PRICE_FIELDS = ["open", "high", "low", "close"]
+# Alpha Vantage prefixes field names with their position ("1. open", "4. close"); map on the name only
+COLUMN_NAMES = {"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}
+
+
+def find_series_key(data):
+    """Return the "Time Series (...)" key of an Alpha Vantage payload, or None."""
+    return next((key for key in data if key.startswith("Time Series")), None)
+
+
+def _field_keys(bar):
+    """Map field names (open, high, ...) to the numbered keys used in this payload."""
+    keys = {}
+    for key in bar:
+        name = key.split(". ", 1)[-1].strip().lower()
+        if name in COLUMN_NAMES:
+            keys[name] = key
+    missing = [name for name in COLUMN_NAMES if name not in keys]
+    if missing:
+        raise ValueError(f"Time series bars are missing fields: {', '.join(missing)}")
+    return keys
+
+
+def _column(bars, key, count):
+    return np.fromiter(map(float, map(itemgetter(key), bars)), dtype=np.float64, count=count)
+
+
+def parse_time_series(data, series_key=None):
+    """
+    Convert an Alpha Vantage time series payload into a DataFrame.
+
+    Each field is decoded straight into a preallocated NumPy array (float64 prices, int64 volume)
+    instead of building a per-row dict-of-dicts frame. Columns are matched by field name rather
+    than position and the result has an ascending DatetimeIndex. Returns None when the payload
+    holds no time series.
+    """
+    series_key = series_key or find_series_key(data)
+    time_series = data.get(series_key) if series_key else None
+    if not time_series:
+        return None
+
+    count = len(time_series)
+    bars = list(time_series.values())
+    keys = _field_keys(bars[0])
+
+    with span("cast", rows_in=count):
+        prices = np.empty((count, len(PRICE_FIELDS)), dtype=np.float64)
+        for position, name in enumerate(PRICE_FIELDS):
+            prices[:, position] = _column(bars, keys[name], count)
+        # Parsed through float so feeds that report volume as "123.0" still work; exact below 2**53
+        volume = _column(bars, keys["volume"], count).astype(np.int64)
+        dates = np.array(list(time_series), dtype="datetime64[ns]")
+
+    # The API returns newest-first; reversing is O(n) and avoids a sort in the common case
+    if count > 1 and dates[0] > dates[-1] and (dates[:-1] > dates[1:]).all():
+        order = slice(None, None, -1)
+    elif count > 1 and not (dates[:-1] <= dates[1:]).all():
+        order = np.argsort(dates, kind="stable")
+    else:
+        order = slice(None)
+
+    df = pd.DataFrame(prices[order], index=pd.DatetimeIndex(dates[order]),
+                      columns=[COLUMN_NAMES[name] for name in PRICE_FIELDS])
+    df["Volume"] = volume[order]
+    return df
@@ -1,62 +1,356 @@
-import requests
 import json
-import pandas as pd
 import os
 import logging
-from logging_config import setup_logging
-import sys
+from http_session import get_session
+from instrumentation import span
+from response_cache import get_cache
+import shutil
+import tempfile
 
-# Add the src directory to the system path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'src')))
+# pandas and the parsers are imported inside the methods that need them, so fetch-only
+# runs (request + save raw JSON) never pay for loading pandas/numpy.
 
-# Setup logging configuration (only needs to be done once)
-setup_logging()
+BASE_URL = "https://www.alphavantage.co/query"
+INTRADAY_INTERVALS = ("1min", "5min", "15min", "30min", "60min")
+RAW_DIR = "../data/raw"
+PROCESSED_DIR = "../data/processed"
+
+
+class FetchError(Exception):
+    """The API answered without a time series (e.g. a rate-limit note); BatchFetcher retries on it."""
+
+
+def has_time_series(data):
+    """Return True if an API payload holds a time series rather than an error or rate-limit note."""
+    return isinstance(data, dict) and any(key.startswith("Time Series") for key in data)
+
+
+def _json_or_none(response):
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+def _read_last_line(file):
+    """Return the last non-empty line of a binary file without reading the whole file."""
+    file.seek(0, os.SEEK_END)
+    position = file.tell()
+    buffer = b""
+    while position > 0:
+        step = min(4096, position)
+        position -= step
+        file.seek(position)
+        buffer = file.read(step) + buffer
+        lines = buffer.rstrip(b"\r\n").splitlines()
+        if len(lines) > 1 or (position == 0 and lines):
+            return lines[-1].decode()
+    return None
 
-# Now you can log messages in this script
-logging.info('Fetching stock data...')
-logging.error('Error occurred while fetching data.')
 
 class StockData:
-    def __init__(self, stock_symbol, api_key):
+    def __init__(self, stock_symbol, api_key, base_url=BASE_URL, session=None, cache=None, rate_limiter=None,
+                 store=None, interval="daily", cache_max_age=None):
+        if interval != "daily" and interval not in INTRADAY_INTERVALS:
+            raise ValueError(f"Unsupported interval {interval!r}; use 'daily' or one of {INTRADAY_INTERVALS}")
         self.stock_symbol = stock_symbol
         self.api_key = api_key
-        self.base_url = "https://www.alphavantage.co/query"
+        self.interval = interval
+        self.base_url = base_url
+        self._session = session
+        self._cache = cache
+        self.cache_max_age = cache_max_age  # Seconds a cached response may be served, at most the cache TTL
+        self.rate_limiter = rate_limiter  # Only consulted for requests that actually go to the network
+        # Daily data keeps the original <SYMBOL> file names, intraday series are stored as <SYMBOL>_<interval>
+        self.series_name = stock_symbol if interval == "daily" else f"{stock_symbol}_{interval}"
+        self.raw_file = f"{RAW_DIR}/{self.series_name}.json"
+        # Compact updates are kept as dated files next to the history instead of rewriting it
+        self.delta_dir = f"{RAW_DIR}/{self.series_name}_deltas"
+        self.processed_file = f"{PROCESSED_DIR}/{self.series_name}.csv"
+        self.store = store  # Optional PriceStore or ArrayStore used instead of the processed CSV
+
+    @property
+    def function(self):
+        return "TIME_SERIES_DAILY" if self.interval == "daily" else "TIME_SERIES_INTRADAY"
+
+    @property
+    def series_key(self):
+        return "Time Series (Daily)" if self.interval == "daily" else f"Time Series ({self.interval})"
+
+    @property
+    def session(self):
+        # Default to the pooled session shared by every StockData instance
+        return self._session or get_session()
+
+    @property
+    def cache(self):
+        # Default to the shared response cache, if one has been configured
+        return self._cache if self._cache is not None else get_cache()
 
-    def fetch_data(self):
-        url = f"{self.base_url}?function=TIME_SERIES_DAILY&symbol={self.stock_symbol}&apikey={self.api_key}"
-        response = requests.get(url)
+    def request_data(self, outputsize=None):
+        params = {"function": self.function, "symbol": self.stock_symbol, "apikey": self.api_key}
+        if self.interval != "daily":
+            params["interval"] = self.interval
+        if outputsize:
+            params["outputsize"] = outputsize
+
+        cache = self.cache
+        headers = {}
+        if cache is not None:
+            key = cache.make_key(params["function"], self.stock_symbol, self.interval, outputsize)
+            cached, headers = cache.lookup(key, self.cache_max_age)
+            if cached is not None:
+                return cached
+
+        response = self._get(params, headers)
+        if cache is not None:
+            if response.status_code == 304:
+                cached = cache.revalidated(key)
+                if cached is not None:
+                    return cached
+                # The entry was evicted before the 304 arrived, so there is no body to reuse
+                logging.info(f"{self.series_name}: cached response gone after 304, fetching it again")
+                response = self._get(params)
+            if response.status_code == 200 and has_time_series(_json_or_none(response)):
+                cache.store(key, response)
+        return response
+
+    def _get(self, params, headers=None):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        with span("fetch"):
+            return self.session.get(self.base_url, params=params, headers=headers or {})
+
+    def fetch_data(self, outputsize=None):
+        return self.handle_response(self.request_data(outputsize))
+
+    def handle_response(self, response, file_path=None):
         if response.status_code == 200:
             data = response.json()
-            self.save_raw_data(data)
+            if not has_time_series(data):
+                # Never replace a saved series with an error or rate-limit note
+                print(f"No time series in the API response; {file_path or self.raw_file} left unchanged")
+                return None
+            self.save_raw_data(data, file_path)
             return data
         else:
             print(f"Failed to fetch data: {response.status_code}")
             return None
 
-    def save_raw_data(self, data):
-        os.makedirs("../data/raw", exist_ok=True)
-        file_path = f"../data/raw/{self.stock_symbol}.json"
-        with open(file_path, "w") as file:
-            json.dump(data, file, indent=4)
+    def save_raw_data(self, data, file_path=None):
+        file_path = file_path or self.raw_file
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with span("save") as current:
+            current.rows_out = len(data.get(self.series_key) or {})
+            with open(file_path, "w") as file:
+                json.dump(data, file, indent=4)
         print(f"Raw data saved to {file_path}")
+        if file_path == self.raw_file:
+            # A full series already holds every bar of the deltas fetched before it
+            shutil.rmtree(self.delta_dir, ignore_errors=True)
 
-    def process_data(self):
-        file_path = f"../data/raw/{self.stock_symbol}.json"
-        with open(file_path, "r") as file:
-            data = json.load(file)
+    def delta_path(self, newest):
+        # Named by the newest bar, so the files sort in the order they were fetched
+        return os.path.join(self.delta_dir, f"{newest:%Y%m%dT%H%M%S}.json")
 
-        time_series = data.get("Time Series (Daily)", {})
-        if not time_series:
+    def load_deltas(self):
+        """Return the bars of every saved compact delta (later deltas win), or None when there are none."""
+        if not os.path.isdir(self.delta_dir):
+            return None
+        frames = []
+        for name in sorted(os.listdir(self.delta_dir)):
+            if name.endswith(".json"):
+                with span("load"):
+                    with open(os.path.join(self.delta_dir, name), "r") as file:
+                        data = json.load(file)
+                df = self.to_dataframe(data)
+                if df is not None:
+                    frames.append(df)
+        if not frames:
+            return None
+
+        import pandas as pd
+        deltas = pd.concat(frames)
+        return deltas[~deltas.index.duplicated(keep="last")].sort_index()
+
+    @staticmethod
+    def _fold_deltas(chunks, deltas):
+        # The deltas replace the history from their first bar on; the compact window is the latest bars
+        for chunk in chunks:
+            chunk = chunk[chunk.index < deltas.index[0]]
+            if not chunk.empty:
+                yield chunk
+        yield deltas
+
+    def to_dataframe(self, data):
+        # Kept in ascending date order so new days can be appended to the processed store
+        from series_parser import parse_time_series
+        with span("parse", rows_in=len(data.get(self.series_key) or {})) as current:
+            df = parse_time_series(data, self.series_key)
+            current.rows_out = 0 if df is None else len(df)
+        return df
+
+    def process_data(self, chunk_rows=None):
+        """
+        Convert the raw JSON file, with the compact deltas saved by update_data() since the last full
+        fetch, into the processed store and return the DataFrame.
+        With `chunk_rows` the raw file is streamed in chunks of that many bars so memory stays
+        bounded for large intraday dumps; the number of rows written is returned instead.
+        """
+        if chunk_rows:
+            return self._process_streaming(chunk_rows)
+
+        with span("load"):
+            with open(self.raw_file, "r") as file:
+                data = json.load(file)
+
+        df = self.to_dataframe(data)
+        deltas = self.load_deltas()
+        if deltas is not None:
+            import pandas as pd
+            df = pd.concat(list(self._fold_deltas([] if df is None else [df], deltas)))
+        if df is None:
             print("No data found in JSON file.")
             return None
 
-        df = pd.DataFrame.from_dict(time_series, orient="index")
-        df.columns = ["Open", "High", "Low", "Close", "Volume"]
-        df.index = pd.to_datetime(df.index)
-        df = df.astype(float)
+        if self.store is not None:
+            with span("write", rows_in=len(df)):
+                self.store.write(self.series_name, df)
+            print(f"Processed data saved to {self.store.root}")
+            return df
 
-        os.makedirs("../data/processed", exist_ok=True)
-        processed_file = f"../data/processed/{self.stock_symbol}.csv"
-        df.to_csv(processed_file)
-        print(f"Processed data saved to {processed_file}")
+        os.makedirs(PROCESSED_DIR, exist_ok=True)
+        with span("write", rows_in=len(df)):
+            df.to_csv(self.processed_file)
+        print(f"Processed data saved to {self.processed_file}")
         return df
+
+    def _process_streaming(self, chunk_rows):
+        from stream_parser import iter_bars
+        chunks = iter_bars(self.raw_file, chunk_rows)
+        deltas = self.load_deltas()
+        if deltas is not None:
+            chunks = self._fold_deltas(chunks, deltas)
+        if self.store is not None:
+            # Each partition is written once as the chunks stream past, rather than rewritten per chunk
+            rows = self.store.write_chunks(self.series_name, self._timed_chunks(chunks))
+            print(f"Processed {rows} rows saved to {self.store.root}")
+            return rows or None
+
+        # Each chunk is sorted on its own; spill them to disk and stitch them together oldest first
+        os.makedirs(PROCESSED_DIR, exist_ok=True)
+        spill_dir = tempfile.mkdtemp(dir=PROCESSED_DIR)
+        try:
+            parts = []
+            header = None
+            for number, chunk in enumerate(chunks):
+                part_path = os.path.join(spill_dir, f"{number}.csv")
+                with span("write", rows_in=len(chunk)):
+                    chunk.to_csv(part_path, header=False)
+                parts.append((chunk.index[0], chunk.index[-1], len(chunk), part_path))
+                header = header or chunk.iloc[:0].to_csv()
+            if not parts:
+                print("No data found in JSON file.")
+                return None
+
+            parts.sort()
+            for previous, following in zip(parts, parts[1:]):
+                if previous[1] >= following[0]:
+                    raise ValueError(f"{self.raw_file} is not in time order; process it without chunk_rows")
+
+            partial_file = os.path.join(spill_dir, "processed.csv")
+            with open(partial_file, "w") as output:
+                output.write(header)
+                for _, _, _, part_path in parts:
+                    with open(part_path, "r") as part:
+                        shutil.copyfileobj(part, output)
+            os.replace(partial_file, self.processed_file)
+        finally:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+
+        rows = sum(part[2] for part in parts)
+        print(f"Processed {rows} rows saved to {self.processed_file}")
+        return rows
+
+    @staticmethod
+    def _timed_chunks(chunks):
+        # Record a write span per chunk; it stays open while the store writes the chunk it was given
+        for chunk in chunks:
+            with span("write", rows_in=len(chunk)):
+                yield chunk
+
+    def last_stored_date(self):
+        """Return the newest processed date; for the CSV store only its first and last rows are read."""
+        if self.store is not None:
+            return self.store.last_date(self.series_name)
+        if not os.path.exists(self.processed_file):
+            return None
+        with open(self.processed_file, "rb") as file:
+            file.readline()  # Header
+            first_row = file.readline().decode().strip()
+            last_row = _read_last_line(file)
+        if not first_row or last_row is None:
+            return None
+
+        import pandas as pd
+        first_date = pd.Timestamp(first_row.split(",", 1)[0])
+        last_date = pd.Timestamp(last_row.split(",", 1)[0])
+        if first_date > last_date:
+            # Stores written before rows were kept in ascending order need a one-off rewrite
+            df = pd.read_csv(self.processed_file, index_col=0, parse_dates=True).sort_index()
+            df.to_csv(self.processed_file)
+            return first_date
+        return last_date
+
+    def request_update(self):
+        """Request only the compact window once history exists, otherwise the full series."""
+        return self.request_data("compact" if self.last_stored_date() is not None else "full")
+
+    def handle_update_response(self, response):
+        last_date = self.last_stored_date()
+        if last_date is None:
+            data = self.handle_response(response)
+            return None if data is None else self.process_data()
+
+        if response.status_code != 200:
+            print(f"Failed to fetch data: {response.status_code}")
+            return None
+        data = response.json()
+        df = self.to_dataframe(data)
+        if df is None:
+            print("No data found in API response.")
+            return None
+
+        if df.index.min() > last_date:
+            # The compact window starts after the last stored bar, so bars in between may be missing
+            logging.warning(f"{self.series_name}: compact data starts at {df.index.min()}, after the last "
+                            f"stored bar {last_date}; fetching the full series instead")
+            response = self.request_data("full")
+            data = _json_or_none(response) if response.status_code == 200 else None
+            if not has_time_series(data):
+                # Raised rather than returned as None, so BatchFetcher backs off and retries the update
+                raise FetchError(f"full fetch of {self.series_name} returned no time series "
+                                 f"(status {response.status_code})")
+            self.save_raw_data(data)
+            return self.process_data()
+
+        # The history file is left as it is; process_data folds the saved deltas into it
+        self.save_raw_data(data, self.delta_path(df.index.max()))
+        new_rows = df[df.index > last_date]
+        if self.store is not None:
+            self.store.append(self.series_name, new_rows)
+        elif not new_rows.empty:
+            new_rows.to_csv(self.processed_file, mode="a", header=False)
+        logging.info(f"{self.series_name}: appended {len(new_rows)} new rows after {last_date}")
+        print(f"Appended {len(new_rows)} new rows for {self.series_name}")
+        return new_rows
+
+    def update_data(self):
+        """
+        Incrementally update the processed store: fetch the compact (latest 100 bars)
+        series and append only bars newer than the last stored timestamp.
+        Falls back to a full fetch and process when no processed data exists yet, or when the
+        compact window no longer reaches back to the last stored timestamp; raises FetchError
+        when that full fetch returns no time series.
+        """
+        return self.handle_update_response(self.request_update())
@@ -0,0 +1,101 @@
+import json
+import re
+
+from series_parser import parse_time_series
+
+SERIES_KEY_PATTERN = re.compile(r'"(Time Series \([^"]*\))"\s*:\s*\{')
+WHITESPACE = " \t\r\n"
+DEFAULT_CHUNK_ROWS = 50_000
+DEFAULT_READ_SIZE = 1 << 20  # 1 MiB
+
+
+class _Buffer:
+    """Sliding text window over a file; consumed text is dropped so memory stays bounded."""
+
+    def __init__(self, file, read_size):
+        self.file = file
+        self.read_size = read_size
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        if self.eof:
+            return False
+        if self.pos > len(self.text) // 2:
+            self.text = self.text[self.pos:]
+            self.pos = 0
+        block = self.file.read(self.read_size)
+        if not block:
+            self.eof = True
+            return False
+        self.text += block
+        return True
+
+    def skip(self, characters):
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in characters:
+                self.pos += 1
+            if self.pos < len(self.text) or not self.fill():
+                return
+
+    def peek(self):
+        self.skip(WHITESPACE)
+        if self.pos >= len(self.text):
+            raise ValueError("Unexpected end of file inside the time series")
+        return self.text[self.pos]
+
+    def decode(self, decoder):
+        """Decode one JSON value at the current position, reading more text if it is incomplete."""
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A number or literal at the very end of the window may still be cut short
+            if end == len(self.text) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_bars(path, chunk_rows=DEFAULT_CHUNK_ROWS, read_size=DEFAULT_READ_SIZE):
+    """
+    Stream an Alpha Vantage time series file and yield DataFrames of at most `chunk_rows` bars.
+
+    Only the current read window and one chunk of bars are held in memory, so peak memory does
+    not grow with the file size. Each chunk is sorted ascending, but chunks are yielded in file
+    order (newest first for API dumps).
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r") as file:
+        buffer = _Buffer(file, read_size)
+        match = None
+        while match is None:
+            match = SERIES_KEY_PATTERN.search(buffer.text, buffer.pos)
+            if match is None:
+                # Keep a tail in case the key straddles two reads
+                buffer.pos = max(buffer.pos, len(buffer.text) - 64)
+                if not buffer.fill():
+                    return
+        series_key = match.group(1)
+        buffer.pos = match.end()
+
+        chunk = {}
+        while buffer.peek() != "}":
+            if buffer.peek() == ",":
+                buffer.pos += 1
+                continue
+            timestamp = buffer.decode(decoder)
+            if buffer.peek() != ":":
+                raise ValueError(f"Expected ':' after {timestamp!r} in {path}")
+            buffer.pos += 1
+            buffer.peek()
+            chunk[timestamp] = buffer.decode(decoder)
+            if len(chunk) >= chunk_rows:
+                yield parse_time_series({series_key: chunk}, series_key)
+                chunk = {}
+        if chunk:
+            yield parse_time_series({series_key: chunk}, series_key)
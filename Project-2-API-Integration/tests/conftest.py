@@ -0,0 +1,9 @@
+import os
+import sys
+
+# The src modules import each other by bare name (e.g. ``from logging_config import setup_logging``),
+# so both the project root (for ``src.<module>``) and src itself need to be importable
+# before any test module is collected.
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
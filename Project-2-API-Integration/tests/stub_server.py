@@ -0,0 +1,97 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def daily_payload(symbol, days=2):
+    """Build a small Alpha Vantage style TIME_SERIES_DAILY payload."""
+    series = {}
+    for i in range(days):
+        price = 150 + i
+        series[f"2025-01-{i + 1:02d}"] = {
+            "1. open": str(price), "2. high": str(price + 5), "3. low": str(price - 1),
+            "4. close": str(price + 2), "5. volume": str(1000000 + i),
+        }
+    return {"Meta Data": {"2. Symbol": symbol}, "Time Series (Daily)": series}
+
+
+class StubAlphaVantageServer:
+    """
+    Local HTTP server that mimics the Alpha Vantage query endpoint.
+
+    `throttle` maps a symbol to how many requests for it should be rejected with the
+    rate-limit "Note" payload before real data is served. Every request is recorded in `requests`,
+    and `gzipped` counts responses that were sent gzip-compressed. When `etag` is set it is sent
+    with every response and a matching If-None-Match request is answered with 304 Not Modified.
+    """
+
+    def __init__(self, payload_factory=daily_payload, throttle=None, etag=None):
+        self.payload_factory = payload_factory
+        self.etag = etag
+        self.throttle = dict(throttle or {})
+        self.requests = []
+        self.gzipped = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/query"
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep connections alive like the real API
+
+            def do_GET(self):
+                params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                symbol = params.get("symbol", "")
+                with stub._lock:
+                    stub.requests.append(params)
+                    throttled = stub.throttle.get(symbol, 0) > 0
+                    if throttled:
+                        stub.throttle[symbol] -= 1
+                if stub.etag and self.headers.get("If-None-Match") == stub.etag:
+                    self.send_response(304)
+                    self.send_header("ETag", stub.etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if throttled:
+                    body = {"Note": "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute."}
+                else:
+                    body = stub.payload_factory(symbol)
+                encoded = json.dumps(body).encode()
+                use_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+                if use_gzip:
+                    encoded = gzip.compress(encoded)
+                    with stub._lock:
+                        stub.gzipped += 1
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                if use_gzip:
+                    self.send_header("Content-Encoding", "gzip")
+                if stub.etag:
+                    self.send_header("ETag", stub.etag)
+                self.send_header("Content-Length", str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def log_message(self, format, *args):
+                pass  # Keep test output quiet
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
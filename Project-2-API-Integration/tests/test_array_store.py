@@ -0,0 +1,123 @@
+import unittest
+import mmap
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from src.analysis import load_prices
+from src.array_store import ArrayStore, PRICES_FILE
+from src.stock_data import StockData
+from tests.stub_server import StubAlphaVantageServer, daily_payload
+from tests.test_price_store import make_prices
+
+
+def is_mapped(values):
+    """True if the array's memory belongs to a mapped file."""
+    while values is not None:
+        if isinstance(values, (np.memmap, mmap.mmap)):
+            return True
+        values = getattr(values, "base", None)
+    return False
+
+
+class TestArrayStore(unittest.TestCase):
+
+    def setUp(self):
+        """Set up before each test"""
+        self.root = tempfile.mkdtemp()
+        self.store = ArrayStore(self.root)
+        self.df = make_prices("2023-12-01", 60)
+        self.store.write("AAPL", self.df)
+
+    def test_round_trip_backed_by_mapped_files(self):
+        """Rows come back date-indexed with float32 prices and int64 volume, as views of the files"""
+        df = self.store.read("AAPL")
+        self.assertEqual(df.columns.tolist(), ["Open", "High", "Low", "Close", "Volume"])
+        self.assertEqual(df["Close"].dtype, np.float32)
+        self.assertEqual(df["Volume"].dtype, np.int64)
+        np.testing.assert_allclose(df["Close"], self.df["Close"], rtol=1e-6)
+        self.assertTrue(df.index.equals(self.df.index))
+        for values in (df.index.asi8, df["Close"].to_numpy(), df["Volume"].to_numpy()):
+            self.assertTrue(is_mapped(values))
+
+        # Frames are copy-on-write: changing one leaves the store as it was
+        df.iloc[0, 0] = -1
+        self.assertEqual(self.store.read("AAPL").iloc[0, 0], np.float32(self.df.iloc[0, 0]))
+
+    def test_date_range_and_column_projection(self):
+        """Date bounds are inclusive binary-search slices and columns keep the requested order"""
+        self.assertEqual(self.store.locate("AAPL", "2024-01-02", "2024-01-05"), slice(22, 26))
+        df = self.store.read("AAPL", start="2024-01-02", end="2024-01-05", columns=["Close"])
+        self.assertEqual(df.columns.tolist(), ["Close"])
+        self.assertEqual((df.index.min(), df.index.max()), (pd.Timestamp("2024-01-02"), pd.Timestamp("2024-01-05")))
+        self.assertTrue(is_mapped(df["Close"].to_numpy()))
+
+        df = self.store.read("AAPL", end="2023-12-05", columns=["Volume", "Open"])
+        self.assertEqual(df.columns.tolist(), ["Volume", "Open"])
+        self.assertEqual(len(df), 3)
+        self.assertTrue(self.store.read("AAPL", start="2030-01-01").empty)
+
+    def test_append_in_place_and_out_of_order(self):
+        """Newer rows are appended to the files; older or repeated dates rewrite the symbol in order"""
+        new_rows = make_prices(self.df.index[-1] + pd.offsets.BDay(), 5)
+        self.store.append("AAPL", new_rows)
+        self.assertEqual(len(self.store.read("AAPL")), 65)
+        self.assertEqual(self.store.last_date("AAPL"), new_rows.index[-1])
+
+        # A leftover from an interrupted append is cut off by the next one
+        with open(os.path.join(self.root, "AAPL", PRICES_FILE), "ab") as file:
+            file.write(b"\0" * 10)
+        self.store.append("AAPL", make_prices(new_rows.index[-1] + pd.offsets.BDay(), 1))
+        self.assertEqual(len(self.store.read("AAPL")), 66)
+
+        older = make_prices("2023-11-27", 6)  # Overlaps the first stored days
+        older["Close"] = 1.0
+        self.store.append("AAPL", older)
+        df = self.store.read("AAPL")
+        self.assertEqual(len(df), 70)
+        self.assertTrue(df.index.is_monotonic_increasing)
+        self.assertEqual(df.loc["2023-12-01", "Close"], 1.0)
+        self.assertEqual(self.store.symbols(), ["AAPL"])
+
+    def test_write_chunks(self):
+        """Chunks arriving newest first are concatenated in time order; overlapping chunks are refused"""
+        chunks = [self.df.iloc[40:], self.df.iloc[:15], self.df.iloc[15:40]]
+        self.assertEqual(self.store.write_chunks("MSFT", iter(chunks)), 60)
+        pd.testing.assert_frame_equal(self.store.read("MSFT"), self.store.read("AAPL"))
+        with self.assertRaises(ValueError):
+            self.store.write_chunks("MSFT", [self.df.iloc[:30], self.df.iloc[20:]])
+        self.assertEqual(len(self.store.read("MSFT")), 60)  # Left as it was
+        self.assertEqual(self.store.symbols(), ["AAPL", "MSFT"])
+
+    def test_stock_data_writes_and_analysis_reads_arrays(self):
+        """StockData processes into the array store and load_prices reads a date range from it"""
+        with StubAlphaVantageServer(payload_factory=lambda symbol: daily_payload(symbol, 4)) as server:
+            stock_data = StockData("TESTARRAYS", "your_api_key", base_url=server.url, store=self.store)
+            stock_data.update_data()
+
+        self.assertFalse(os.path.exists(stock_data.processed_file))
+        stored = self.store.read("TESTARRAYS")
+        self.assertEqual(len(stored), 4)
+        recent = load_prices("TESTARRAYS", self.store, start=stored.index[2])
+        self.assertTrue(recent.index.equals(stored.index[2:]))
+        if os.path.exists(stock_data.raw_file):
+            os.remove(stock_data.raw_file)
+
+    def test_load_prices_defaults_to_configured_store(self):
+        """Without a store, load_prices reads from the backend and folder set under `storage` in config.yaml"""
+        config = {"storage": {"backend": "arrays", "array_dir": self.root}}
+        with mock.patch("config_loader.load_config", return_value=config):
+            df = load_prices("AAPL", end="2023-12-05")
+        pd.testing.assert_frame_equal(df, self.store.read("AAPL", end="2023-12-05"))
+
+    def tearDown(self):
+        """Clean up after each test"""
+        shutil.rmtree(self.root)
+
+
+if __name__ == '__main__':
+    unittest.main()
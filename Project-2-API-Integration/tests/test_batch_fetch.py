@@ -0,0 +1,85 @@
+import unittest
+import os
+
+from src.rate_limiter import TokenBucket
+from src.batch_fetch import BatchFetcher
+from tests.stub_server import StubAlphaVantageServer
+
+
+class FakeClock:
+    """Manually advanced clock so rate limiting can be tested without sleeping"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_burst_then_refill(self):
+        """A full bucket allows a burst of `capacity` requests, then refills at `rate`"""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1.0, capacity=3, clock=clock, sleep=clock.sleep)
+        self.assertTrue(all(bucket.try_acquire() for _ in range(3)))
+        self.assertFalse(bucket.try_acquire())
+        clock.now += 1.0
+        self.assertTrue(bucket.try_acquire())
+
+    def test_acquire_waits_for_quota(self):
+        """Acquiring past the quota blocks until enough time has passed"""
+        clock = FakeClock()
+        bucket = TokenBucket.per_minute(5, clock=clock, sleep=clock.sleep)
+        for _ in range(5):
+            bucket.acquire()
+        self.assertEqual(clock.now, 0.0)
+        bucket.acquire()
+        self.assertAlmostEqual(clock.now, 12.0)  # 60s / 5 requests
+
+
+class TestBatchFetcher(unittest.TestCase):
+
+    def setUp(self):
+        """Set up before each test"""
+        self.api_key = "your_api_key"
+        self.symbols = ["TESTA", "TESTB", "TESTC"]
+
+    def test_fetch_many_against_stub_server(self):
+        """All symbols are fetched concurrently and throttled responses are retried"""
+        with StubAlphaVantageServer(throttle={"TESTB": 2}) as server:
+            fetcher = BatchFetcher(self.api_key, requests_per_minute=600, max_workers=3,
+                                   backoff_seconds=0.01, base_url=server.url)
+            results = fetcher.fetch_many(self.symbols)
+
+        self.assertEqual(list(results), self.symbols)
+        for data in results.values():
+            self.assertIn("Time Series (Daily)", data)
+        # One request for each symbol plus two throttled attempts for TESTB
+        self.assertEqual(len(server.requests), 5)
+        self.assertEqual(sum(r["symbol"] == "TESTB" for r in server.requests), 3)
+
+    def test_gives_up_after_max_retries(self):
+        """A symbol that stays throttled is reported as failed without blocking the others"""
+        with StubAlphaVantageServer(throttle={"TESTA": 10}) as server:
+            fetcher = BatchFetcher(self.api_key, requests_per_minute=600, max_workers=2,
+                                   max_retries=2, backoff_seconds=0.01, base_url=server.url)
+            results = fetcher.fetch_many(self.symbols)
+
+        self.assertIsNone(results["TESTA"])
+        self.assertIsNotNone(results["TESTB"])
+        self.assertEqual(sum(r["symbol"] == "TESTA" for r in server.requests), 3)
+
+    def tearDown(self):
+        """Clean up after each test"""
+        for symbol in self.symbols:
+            raw_file_path = f"../data/raw/{symbol}.json"
+            if os.path.exists(raw_file_path):
+                os.remove(raw_file_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import json
+import os
+import unittest
+
+from benchmarks.run_benchmarks import run_suite, compare
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+
+    def setUp(self):
+        """Set up before each test"""
+        self.cwd = os.getcwd()
+        self.report = run_suite(days=60, symbols=2, repeat=1, workers=2)
+
+    def test_report_is_machine_readable(self):
+        """Every stage is timed, the report round-trips through JSON and the data dir is left alone"""
+        report = json.loads(json.dumps(self.report))
+        self.assertEqual(report["meta"]["days"], 60)
+        self.assertEqual(set(report["results"]), {
+            "fetch", "parse", "process_csv", "process_store", "process_arrays", "load_csv", "load_store", "load_arrays",
+            "indicators_full", "indicators_incremental", "cross_section"})
+        for result in report["results"].values():
+            self.assertGreater(result["best_s"], 0)
+        self.assertEqual(os.getcwd(), self.cwd)
+
+    def test_compare_flags_slow_stages(self):
+        """Stages slower than the baseline by more than the threshold are reported"""
+        baseline = json.loads(json.dumps(self.report))
+        baseline["results"]["parse"]["best_s"] = self.report["results"]["parse"]["best_s"] / 2
+        self.assertEqual([stage for stage, _, _ in compare(self.report, baseline, threshold=0.2)], ["parse"])
+        self.assertEqual(compare(self.report, self.report), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from src.cross_section import load_matrix, moving_average, rolling_std, returns, correlation_matrix, summarize
+from src.price_store import PriceStore
+
+
+def make_prices(symbols=("AAA", "BBB", "CCC", "DDD"), periods=400, seed=2):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2022-01-03", periods=periods)
+    data = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (periods, len(symbols))), axis=0))
+    prices = pd.DataFrame(data, index=index, columns=list(symbols))
+    prices.iloc[:25, 1] = np.nan   # BBB starts trading later
+    prices.iloc[200, 2] = np.nan   # CCC has a gap
+    return prices
+
+
+class TestCrossSection(unittest.TestCase):
+
+    def setUp(self):
+        """Set up before each test"""
+        self.prices = make_prices()
+
+    def test_matches_per_symbol_pandas(self):
+        """The matrix computations agree with running pandas on each column"""
+        pd.testing.assert_frame_equal(moving_average(self.prices, 50), self.prices.rolling(50).mean())
+        pd.testing.assert_frame_equal(rolling_std(self.prices, 30), self.prices.rolling(30).std())
+        pd.testing.assert_frame_equal(returns(self.prices), self.prices / self.prices.shift(1) - 1)
+
+    def test_correlation_matches_pairwise_pandas(self):
+        """Pairwise-complete correlation matches DataFrame.corr() including missing data"""
+        daily = returns(self.prices)
+        pd.testing.assert_frame_equal(correlation_matrix(daily), daily.corr())
+
+    def test_load_matrix_from_store_and_csv(self):
+        """Symbols are aligned on a shared date index from either storage backend"""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            store = PriceStore(os.path.join(tmp_dir, "store"))
+            for symbol in self.prices:
+                series = self.prices[symbol].dropna()
+                frame = pd.DataFrame({"Open": series, "High": series, "Low": series, "Close": series,
+                                      "Volume": 1})
+                store.write(symbol, frame)
+                frame.to_csv(os.path.join(tmp_dir, f"{symbol}.csv"))
+
+            from_store = load_matrix(self.prices.columns, store=store)
+            from_csv = load_matrix(self.prices.columns, processed_dir=tmp_dir)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+        self.assertEqual(from_store.columns.tolist(), self.prices.columns.tolist())
+        np.testing.assert_allclose(from_store, self.prices, rtol=1e-6)
+        pd.testing.assert_frame_equal(from_csv, self.prices, check_freq=False)
+
+    def test_summarize(self):
+        results = summarize(self.prices)
+        self.assertEqual(results["Correlation"].shape, (4, 4))
+        self.assertEqual(results["Summary"].index.tolist(), self.prices.columns.tolist())
+        self.assertIn("200_MA", results["Summary"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+import os
+
+from src.http_session import PooledSession
+from src.stock_data import StockData
+from tests.stub_server import StubAlphaVantageServer
+
+
+class TestPooledSession(unittest.TestCase):
+
+    def setUp(self):
+        """Set up before each test"""
+        self.api_key = "your_api_key"
+        self.symbols = ["TESTA", "TESTB", "TESTC", "TESTD"]
+        self.session = PooledSession(pool_size=2, connect_timeout=1, read_timeout=2)
+
+    def test_connections_are_reused(self):
+        """Sequential fetches share one keep-alive connection and negotiate gzip"""
+        with StubAlphaVantageServer() as server:
+            for symbol in self.symbols:
+                data = StockData(symbol, self.api_key, base_url=server.url, session=self.session).fetch_data()
+                self.assertIn("Time Series (Daily)", data)
+
+        stats = self.session.connection_stats()
+        self.assertEqual(stats["requests"], 4)
+        self.assertEqual(stats["connections"], 1)
+        self.assertEqual(stats["reused"], 3)
+        self.assertEqual(server.gzipped, 4)
+
+    def test_default_timeout(self):
+        """The configured (connect, read) timeout is applied when the caller passes none"""
+        self.assertEqual(self.session.timeout, (1, 2))
+
+    def tearDown(self):
+        """Clean up after each test"""
+        self.session.close()
+        for symbol in self.symbols:
+            raw_file_path = f"../data/raw/{symbol}.json"
+            if os.path.exists(raw_file_path):
+                os.remove(raw_file_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from src.indicators import IndicatorEngine, SMA, EMA, RollingStd, Returns, update_indicators
+
+
+def make_close(periods=600, seed=1):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2020-01-01", periods=periods)
+    return pd.DataFrame({"Close": 100 * np.exp(np.cumsum(rng.normal(0, 0.02, periods)))}, index=index)
+
+
+class TestIndicators(unittest.TestCase):
+
+    def setUp(self):
+        """Set up before each test"""
+        self.df = make_close()
+        self.close = self.df["Close"]
+
+    def run_indicator(self, indicator):
+        return pd.Series([indicator.update(value) for value in self.close], index=self.close.index)
+
+    def test_against_pandas(self):
+        """Each streaming indicator matches the equivalent pandas computation"""
+        pd.testing.assert_series_equal(self.run_indicator(SMA(50)), self.close.rolling(50).mean(),
+                                       check_names=False)
+        pd.testing.assert_series_equal(self.run_indicator(RollingStd(30)), self.close.rolling(30).std(),
+                                       check_names=False)
+        pd.testing.assert_series_equal(self.run_indicator(EMA(20)), self.close.ewm(span=20, adjust=False).mean(),
+                                       check_names=False)
+        pd.testing.assert_series_equal(self.run_indicator(Returns()), self.close.pct_change(), check_names=False)
+
+    def test_resumed_state_matches_single_run(self):
+        """Saving and restoring the engine mid-series gives the same values as one pass"""
+        full = IndicatorEngine.default().run(self.df)
+
+        engine = IndicatorEngine.default()
+        first = engine.run(self.df.iloc[:400])
+        restored = IndicatorEngine.from_dict(engine.to_dict())
+        second = restored.run(self.df.iloc[400:])
+
+        pd.testing.assert_frame_equal(pd.concat([first, second]), full)
+
+    def test_rejects_out_of_order_bars(self):
+        """Bars older than the last processed one are refused"""
+        engine = IndicatorEngine.default()
+        with self.assertRaises(ValueError):
+            engine.run(self.df.iloc[::-1])
+        engine.run(self.df.iloc[:10])
+        with self.assertRaises(ValueError):
+            engine.update(self.df.index[5], 1.0)
+
+    def test_update_indicators_appends_new_bars(self):
+        """The persisted indicator store only processes bars added since the last run"""
+        indicator_dir = tempfile.mkdtemp()
+        try:
+            update_indicators("TEST", self.df.iloc[:500], indicator_dir)
+            stored = update_indicators("TEST", self.df, indicator_dir)
+        finally:
+            shutil.rmtree(indicator_dir)
+
+        self.assertEqual(len(stored), len(self.df))
+        np.testing.assert_allclose(stored["200_MA"], self.close.rolling(200).mean(), equal_nan=True)
+        np.testing.assert_allclose(stored["Volatility"], self.close.rolling(30).std(), equal_nan=True)
+
+    def test_update_indicators_recomputes_changed_history(self):
+        """A corrected history or state from an empty run is recomputed instead of extended"""
+        indicator_dir = tempfile.mkdtemp()
+        try:
+            update_indicators("TEST", self.df.iloc[:0], indicator_dir)
+            update_indicators("TEST", self.df.iloc[:500], indicator_dir)
+            corrected = self.df * 1.5
+            stored = update_indicators("TEST", corrected, indicator_dir)
+        finally:
+            shutil.rmtree(indicator_dir)
+
+        np.testing.assert_allclose(stored["50_MA"], corrected["Close"].rolling(50).mean(), equal_nan=True)
+        np.testing.assert_allclose(stored["Volatility"], corrected["Close"].rolling(30).std(), equal_nan=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.stock_data import StockData
+from tests.stub_server import StubAlphaVantageServer
+
+# The src modules import each other by bare name, so use the module StockData records its spans with
+import instrumentation
+from instrumentation import Recorder, run_instrumentation, span, timed
+
+
+class TestRecorder(unittest.TestCase):
+
+    def test_nested_spans_record_rows_and_memory(self):
+        """Spans nest by path and record wall time, rows and peak memory"""
+        recorder = Recorder(trace_memory=True)
+        with recorder.span("process", rows_in=3) as outer:
+            with recorder.span("parse") as inner:
+                buffer = bytearray(4 * 1024 * 1024)
+                inner.rows_out = 3
+            del buffer
+            outer.rows_out = 2
+        recorder.close()
+
+        stages = recorder.summary()
+        self.assertEqual(list(stages), ["process/parse", "process"])
+        self.assertEqual(stages["process"]["rows_in"], 3)
+        self.assertEqual(stages["process"]["rows_out"], 2)
+        self.assertGreaterEqual(stages["process/parse"]["traced_peak_mb"], 4)
+        # The outer span's peak includes what its children allocated
+        self.assertGreaterEqual(stages["process"]["traced_peak_mb"], stages["process/parse"]["traced_peak_mb"])
+        self.assertGreater(stages["process"]["total_s"], 0)
+
+    def test_disabled_spans_are_not_recorded(self):
+        """Without a configured recorder, span and timed only run the wrapped code"""
+        instrumentation.configure_instrumentation(enabled=False)
+
+        @timed("double")
+        def double(values):
+            return values * 2
+
+        with span("noop") as current:
+            current.rows_out = 1
+        self.assertEqual(double([1]), [1, 1])
+        self.assertIsNone(instrumentation.get_recorder())
+
+
+class TestRunInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        """Set up before each test"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.summary_file = os.path.join(self.tmp_dir, "summary.json")
+        self.profile_file = os.path.join(self.tmp_dir, "run.prof")
+        self.stock_data = StockData("TESTA", "your_api_key")
+        self.stock_data.raw_file = os.path.join(self.tmp_dir, "TESTA.json")
+        self.stock_data.processed_file = os.path.join(self.tmp_dir, "TESTA.csv")
+
+    def tearDown(self):
+        """Clean up after each test"""
+        shutil.rmtree(self.tmp_dir)
+
+    def test_pipeline_stages_are_summarized(self):
+        """A fetch and process run writes a JSON summary of each stage and a cProfile dump"""
+        with StubAlphaVantageServer() as server:
+            self.stock_data.base_url = server.url
+            with run_instrumentation(enabled=True, summary_file=self.summary_file, profile_file=self.profile_file):
+                self.stock_data.fetch_data()
+                self.stock_data.process_data()
+
+        with open(self.summary_file) as file:
+            stages = json.load(file)["stages"]
+        for stage in ("fetch", "save", "load", "parse", "parse/cast", "write"):
+            self.assertIn(stage, stages)
+        self.assertEqual(stages["save"]["rows_out"], 2)
+        self.assertEqual(stages["parse"]["rows_out"], 2)
+        self.assertEqual(stages["write"]["rows_in"], 2)
+        self.assertTrue(os.path.getsize(self.profile_file) > 0)
+        self.assertIsNone(instrumentation.get_recorder())
+
+
+if __name__ == "__main__":
+    unittest.main()
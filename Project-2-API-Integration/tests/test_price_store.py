@@ -0,0 +1,99 @@
+import unittest
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from src.price_store import PriceStore
+from src.stock_data import StockData
+from tests.stub_server import StubAlphaVantageServer, daily_payload
+
+
+def make_prices(start, periods):
+    index = pd.bdate_range(start, periods=periods)
+    close = np.linspace(100, 200, periods)
+    return pd.DataFrame({"Open": close - 1, "High": close + 2, "Low": close - 2, "Close": close,
+                         "Volume": np.arange(periods, dtype=float) + 1e6}, index=index)
+
+
+class TestPriceStore(unittest.TestCase):
+
+    def setUp(self):
+        """Set up before each test"""
+        self.root = tempfile.mkdtemp()
+        self.store = PriceStore(self.root)
+        self.df = make_prices("2023-12-01", 60)  # Spans two year partitions
+        self.store.write("AAPL", self.df)
+
+    def test_round_trip_with_typed_columns(self):
+        """Rows come back date-indexed with float32 prices and int64 volume"""
+        df = self.store.read("AAPL")
+        self.assertEqual(len(df), 60)
+        self.assertEqual(df["Close"].dtype, np.float32)
+        self.assertEqual(df["Volume"].dtype, np.int64)
+        np.testing.assert_allclose(df["Close"], self.df["Close"], rtol=1e-6)
+        self.assertTrue(os.path.isdir(os.path.join(self.root, "symbol=AAPL", "year=2024")))
+
+    def test_date_range_and_column_projection(self):
+        """Only the requested dates and columns are returned"""
+        df = self.store.read("AAPL", start="2024-01-02", end="2024-01-05", columns=["Close"])
+        self.assertEqual(df.columns.tolist(), ["Close"])
+        self.assertEqual(df.index.min(), pd.Timestamp("2024-01-02"))
+        self.assertEqual(df.index.max(), pd.Timestamp("2024-01-05"))
+
+    def test_append_rewrites_only_touched_year(self):
+        """Appending new 2024 rows leaves the 2023 partition untouched"""
+        partition_2023 = os.path.join(self.root, "symbol=AAPL", "year=2023", "part-0.parquet")
+        mtime = os.path.getmtime(partition_2023)
+        new_rows = make_prices(self.df.index[-1] + pd.offsets.BDay(), 5)
+        self.store.append("AAPL", new_rows)
+
+        self.assertEqual(os.path.getmtime(partition_2023), mtime)
+        self.assertEqual(len(self.store.read("AAPL")), 65)
+        self.assertEqual(self.store.last_date("AAPL"), new_rows.index[-1])
+
+    def test_write_chunks_matches_write(self):
+        """Chunks in any time order are written once per year partition and read back like write()"""
+        df = make_prices("2022-06-01", 400)
+        chunks = [df.iloc[300:], df.iloc[100:300], df.iloc[:100]]  # Newest first, as streamed from the API
+        self.assertEqual(self.store.write_chunks("MSFT", iter(chunks)), 400)
+        self.store.write("GOOG", df)
+        pd.testing.assert_frame_equal(self.store.read("MSFT"), self.store.read("GOOG"))
+        self.assertEqual(self.store.last_date("MSFT"), df.index[-1])
+
+    def test_read_many_and_csv_export(self):
+        """Multiple symbols can be read together and exported back to the CSV layout"""
+        self.store.write("MSFT", make_prices("2024-01-01", 10))
+        df = self.store.read_many(["AAPL", "MSFT"], start="2024-01-01")
+        self.assertEqual(sorted(df["symbol"].unique()), ["AAPL", "MSFT"])
+        self.assertEqual(self.store.symbols(), ["AAPL", "MSFT"])
+
+        path = self.store.export_csv("MSFT", os.path.join(self.root, "MSFT.csv"))
+        exported = pd.read_csv(path, index_col=0, parse_dates=True)
+        self.assertEqual(exported.columns.tolist(), ["Open", "High", "Low", "Close", "Volume"])
+        self.assertEqual(len(exported), 10)
+
+    def test_stock_data_incremental_update_into_store(self):
+        """StockData writes and incrementally appends to the store instead of the CSV"""
+        days = {"n": 3}
+        with StubAlphaVantageServer(payload_factory=lambda symbol: daily_payload(symbol, days["n"])) as server:
+            stock_data = StockData("TESTSTORE", "your_api_key", base_url=server.url, store=self.store)
+            stock_data.update_data()
+            days["n"] = 4
+            new_rows = stock_data.update_data()
+
+        self.assertEqual(len(new_rows), 1)
+        self.assertEqual(len(self.store.read("TESTSTORE")), 4)
+        self.assertFalse(os.path.exists(stock_data.processed_file))
+        os.remove(stock_data.raw_file)
+        shutil.rmtree(stock_data.delta_dir)
+
+    def tearDown(self):
+        """Clean up after each test"""
+        shutil.rmtree(self.root)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from src.array_store import ArrayStore
+from src.reports import generate_reports, CHART_FILES
+
+
+def make_prices(periods=260, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, periods)))
+    index = pd.bdate_range("2024-01-01", periods=periods)
+    return pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                         "Volume": rng.integers(1000, 2000, periods)}, index=index)
+
+
+def write_prices(path, periods=260, seed=3):
+    make_prices(periods, seed).to_csv(path)
+
+
+class TestReports(unittest.TestCase):
+
+    def setUp(self):
+        """Set up before each test"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.processed_dir = os.path.join(self.tmp_dir, "processed")
+        self.output_dir = os.path.join(self.tmp_dir, "reports")
+        os.makedirs(self.processed_dir)
+        for seed, symbol in enumerate(["AAA", "BBB"]):
+            write_prices(os.path.join(self.processed_dir, f"{symbol}.csv"), seed=seed)
+
+    def generate(self, symbols, store=None):
+        return generate_reports(symbols, self.output_dir, store=store, processed_dir=self.processed_dir,
+                                indicator_dir=os.path.join(self.tmp_dir, "indicators"), max_workers=2)
+
+    def test_render_and_skip_unchanged(self):
+        """Charts are written to files and only symbols with changed data are re-rendered"""
+        self.assertEqual(self.generate(["AAA", "BBB", "MISSING"]),
+                         {"AAA": "rendered", "BBB": "rendered", "MISSING": "failed"})
+        for symbol in ("AAA", "BBB"):
+            for name in CHART_FILES:
+                self.assertTrue(os.path.getsize(os.path.join(self.output_dir, symbol, name)) > 0)
+
+        self.assertEqual(self.generate(["AAA", "BBB"]), {"AAA": "skipped", "BBB": "skipped"})
+
+        # A re-fetched history with different prices, not just one more day
+        write_prices(os.path.join(self.processed_dir, "BBB.csv"), periods=261, seed=5)
+        self.assertEqual(self.generate(["AAA", "BBB"]), {"AAA": "skipped", "BBB": "rendered"})
+        close = pd.read_csv(os.path.join(self.processed_dir, "BBB.csv"), index_col=0, parse_dates=True)["Close"]
+        indicators = pd.read_csv(os.path.join(self.tmp_dir, "indicators", "BBB.csv"), index_col=0, parse_dates=True)
+        np.testing.assert_allclose(indicators["50_MA"], close.rolling(50).mean(), equal_nan=True)
+
+    def test_array_store_appends_are_rendered(self):
+        """With the array store, appending bars changes the fingerprint and the symbol is rendered again"""
+        store = ArrayStore(os.path.join(self.tmp_dir, "arrays"))
+        prices = make_prices(261, seed=7)
+        store.write("CCC", prices.iloc[:-1])
+        self.assertEqual(self.generate(["CCC"], store), {"CCC": "rendered"})
+        self.assertEqual(self.generate(["CCC"], store), {"CCC": "skipped"})
+
+        store.append("CCC", prices.iloc[-1:])
+        self.assertEqual(self.generate(["CCC"], store), {"CCC": "rendered"})
+        self.assertEqual(self.generate(["CCC"], store), {"CCC": "skipped"})
+
+    def tearDown(self):
+        """Clean up after each test"""
+        shutil.rmtree(self.tmp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from src.response_cache import ResponseCache
+from src.stock_data import StockData
+from tests.stub_server import StubAlphaVantageServer
+
+
+class FakeClock:
+    """Manually advanced wall clock for TTL tests"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        """Set up before each test"""
+        self.api_key = "your_api_key"
+        self.stock_symbol = "TESTCACHE"
+        self.cache_dir = tempfile.mkdtemp()
+        self.clock = FakeClock()
+        self.cache = ResponseCache(self.cache_dir, ttl_seconds=60, clock=self.clock)
+
+    def fetch(self, server):
+        return StockData(self.stock_symbol, self.api_key, base_url=server.url, cache=self.cache).fetch_data()
+
+    def test_fresh_entries_skip_the_network(self):
+        """A second fetch within the TTL is served from disk"""
+        with StubAlphaVantageServer() as server:
+            first = self.fetch(server)
+            second = self.fetch(server)
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(self.cache.stats["hits"], 1)
+        self.assertEqual(self.cache.stats["misses"], 1)
+
+    def test_stale_entry_is_revalidated_with_etag(self):
+        """After the TTL a conditional request is sent and a 304 reuses the cached body"""
+        with StubAlphaVantageServer(etag='"v1"') as server:
+            first = self.fetch(server)
+            self.clock.now += 120
+            second = self.fetch(server)
+            third = self.fetch(server)
+
+        self.assertEqual(first, second)
+        self.assertEqual(second, third)
+        self.assertEqual(len(server.requests), 2)
+        self.assertEqual(self.cache.stats["revalidated"], 1)
+        self.assertEqual(self.cache.stats["hits"], 1)
+
+    def test_entry_evicted_before_304_is_fetched_again(self):
+        """If the stale entry disappears while the conditional request is in flight, the body is re-fetched"""
+        lookup = self.cache.lookup
+
+        def lookup_then_clear(key, max_age=None):
+            result = lookup(key, max_age)
+            self.cache.clear()  # e.g. evicted by another worker storing a response
+            return result
+
+        with StubAlphaVantageServer(etag='"v1"') as server:
+            first = self.fetch(server)
+            self.clock.now += 120
+            with mock.patch.object(self.cache, "lookup", side_effect=lookup_then_clear):
+                second = self.fetch(server)
+            third = self.fetch(server)
+
+        self.assertEqual(first, second)
+        self.assertEqual(second, third)
+        self.assertEqual(len(server.requests), 3)  # The 304 and the unconditional request that followed it
+        self.assertEqual(self.cache.stats["revalidated"], 0)
+        self.assertEqual(self.cache.stats["hits"], 1)
+
+    def test_throttled_responses_are_not_cached(self):
+        """Rate-limit notes never end up in the cache"""
+        with StubAlphaVantageServer(throttle={self.stock_symbol: 1}) as server:
+            self.fetch(server)
+            data = self.fetch(server)
+
+        self.assertIn("Time Series (Daily)", data)
+        self.assertEqual(len(server.requests), 2)
+
+    def test_lru_eviction(self):
+        """Beyond max_entries the least recently used entry is evicted"""
+        cache = ResponseCache(self.cache_dir, ttl_seconds=60, max_entries=2, clock=self.clock)
+        with StubAlphaVantageServer() as server:
+            for outputsize in ("compact", "full"):
+                self.clock.now += 1
+                StockData(self.stock_symbol, self.api_key, base_url=server.url, cache=cache).request_data(outputsize)
+            self.clock.now += 1
+            StockData(self.stock_symbol, self.api_key, base_url=server.url, cache=cache).request_data("compact")
+            self.clock.now += 1
+            StockData("OTHER", self.api_key, base_url=server.url, cache=cache).request_data("compact")
+
+        self.assertEqual(cache.stats["evictions"], 1)
+        self.assertIsNotNone(cache.lookup(cache.make_key("TIME_SERIES_DAILY", self.stock_symbol, "daily", "compact"))[0])
+        self.assertIsNone(cache.lookup(cache.make_key("TIME_SERIES_DAILY", self.stock_symbol, "daily", "full"))[0])
+
+    def tearDown(self):
+        """Clean up after each test"""
+        shutil.rmtree(self.cache_dir)
+        raw_file_path = f"../data/raw/{self.stock_symbol}.json"
+        if os.path.exists(raw_file_path):
+            os.remove(raw_file_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
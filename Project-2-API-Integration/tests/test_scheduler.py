@@ -0,0 +1,111 @@
+import unittest
+import os
+import shutil
+import tempfile
+
+from src.scheduler import FetchScheduler
+from tests.stub_server import StubAlphaVantageServer, daily_payload
+
+# The src modules import each other by bare name, so configure the cache module StockData reads
+from response_cache import configure_cache
+
+
+class FakeClock:
+    """Manually advanced wall clock"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def daily_and_intraday_payload(symbol):
+    """Serve the same bars under both series keys so daily and 5min jobs both succeed"""
+    payload = daily_payload(symbol, days=3)
+    payload["Time Series (5min)"] = payload["Time Series (Daily)"]
+    return payload
+
+
+class TestFetchScheduler(unittest.TestCase):
+
+    def setUp(self):
+        """Set up before each test"""
+        self.api_key = "your_api_key"
+        self.symbols = ["TESTSCHED"]
+        self.tmp_dir = tempfile.mkdtemp()
+        self.state_file = os.path.join(self.tmp_dir, "state.json")
+        self.clock = FakeClock()
+
+    def make_scheduler(self, server):
+        return FetchScheduler(self.api_key, self.symbols, ["daily", "5min"], periods={"daily": 3600},
+                              state_file=self.state_file, requests_per_minute=600, base_url=server.url,
+                              clock=self.clock)
+
+    def test_runs_due_jobs_and_resumes_after_restart(self):
+        """Jobs run when due, are rescheduled by their period and the queue survives a restart"""
+        with StubAlphaVantageServer(payload_factory=daily_and_intraday_payload) as server:
+            scheduler = self.make_scheduler(server)
+            # The shorter interval has priority when both are due
+            self.assertEqual(scheduler.run_pending(), [("TESTSCHED", "5min"), ("TESTSCHED", "daily")])
+            self.assertEqual(scheduler.run_pending(), [])
+
+            self.clock.now += 300
+            self.assertEqual(scheduler.run_pending(), [("TESTSCHED", "5min")])
+
+            restarted = self.make_scheduler(server)
+            self.assertEqual(restarted.next_due(), self.clock.now + 300)
+            self.clock.now += 3300
+            self.assertEqual(restarted.run_pending(), [("TESTSCHED", "5min"), ("TESTSCHED", "daily")])
+
+        stats = restarted.job_stats()
+        self.assertEqual(stats["TESTSCHED:5min"]["runs"], 3)
+        self.assertEqual(stats["TESTSCHED:daily"]["runs"], 2)
+        self.assertEqual(stats["TESTSCHED:daily"]["failures"], 0)
+        self.assertEqual(stats["TESTSCHED:5min"]["failures"], 0)
+        self.assertIsNotNone(stats["TESTSCHED:daily"]["mean_seconds"])
+
+    def test_missed_slots_are_skipped(self):
+        """After a long pause a job runs once and is rescheduled on its original grid"""
+        with StubAlphaVantageServer() as server:
+            scheduler = self.make_scheduler(server)
+            scheduler.run_pending()
+            self.clock.now += 3 * 300 + 10
+            self.assertEqual(scheduler.run_pending(), [("TESTSCHED", "5min")])
+        self.assertEqual(scheduler.next_due(), self.clock.now + 290)
+
+    def test_scheduled_runs_bypass_the_response_cache(self):
+        """With the shared cache enabled, every run still asks the API and appends the new bars"""
+        configure_cache(cache_dir=os.path.join(self.tmp_dir, "cache"), ttl_seconds=6 * 60 * 60)
+        served = []
+
+        def one_more_day(symbol):
+            served.append(symbol)
+            return daily_payload(symbol, days=2 + len(served))
+
+        with StubAlphaVantageServer(payload_factory=one_more_day) as server:
+            scheduler = FetchScheduler(self.api_key, self.symbols, ["daily"], periods={"daily": 60},
+                                       state_file=self.state_file, requests_per_minute=600, base_url=server.url,
+                                       clock=self.clock)
+            for _ in range(3):
+                scheduler.run_pending()
+                self.clock.now += 60
+
+        self.assertEqual(len(server.requests), 3)
+        with open("../data/processed/TESTSCHED.csv") as file:
+            self.assertEqual(len(file.readlines()), 1 + 5)  # Header, 3 days from the first run, then 1 per run
+        self.assertEqual(scheduler.job_stats()["TESTSCHED:daily"]["failures"], 0)
+
+    def tearDown(self):
+        """Clean up after each test"""
+        configure_cache(enabled=False)
+        shutil.rmtree(self.tmp_dir)
+        for name in ("TESTSCHED", "TESTSCHED_5min"):
+            for path in (f"../data/raw/{name}.json", f"../data/processed/{name}.csv"):
+                if os.path.exists(path):
+                    os.remove(path)
+            shutil.rmtree(f"../data/raw/{name}_deltas", ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
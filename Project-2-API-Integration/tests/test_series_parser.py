@@ -0,0 +1,49 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.series_parser import parse_time_series
+from benchmarks.synthetic import make_daily_payload
+
+
+class TestParseTimeSeries(unittest.TestCase):
+
+    def test_matches_from_dict_path(self):
+        """The vectorized parser produces the same values as the original from_dict path"""
+        payload = make_daily_payload(days=300)
+        expected = pd.DataFrame.from_dict(payload["Time Series (Daily)"], orient="index")
+        expected.columns = ["Open", "High", "Low", "Close", "Volume"]
+        expected.index = pd.to_datetime(expected.index)
+        expected = expected.astype(float).sort_index()
+
+        df = parse_time_series(payload)
+        pd.testing.assert_frame_equal(df, expected, check_dtype=False, check_freq=False)
+        self.assertTrue(df.index.is_monotonic_increasing)
+        self.assertEqual(df["Close"].dtype, np.float64)
+        self.assertEqual(df["Volume"].dtype, np.int64)
+
+    def test_columns_mapped_by_name_not_position(self):
+        """Fields are matched on their names even when the bar keys come in another order"""
+        payload = {"Time Series (Daily)": {
+            "2025-01-02": {"5. volume": "200", "4. close": "12", "1. open": "10", "3. low": "9", "2. high": "13"},
+            "2025-01-01": {"5. volume": "100", "4. close": "11", "1. open": "10", "3. low": "8", "2. high": "12"},
+        }}
+        df = parse_time_series(payload)
+        self.assertEqual(df.columns.tolist(), ["Open", "High", "Low", "Close", "Volume"])
+        self.assertEqual(df.loc["2025-01-02", "Close"], 12.0)
+        self.assertEqual(df.loc["2025-01-01", "Volume"], 100)
+
+    def test_unsorted_and_missing_series(self):
+        """Out-of-order dates are sorted and payloads without a series return None"""
+        payload = {"Time Series (Daily)": {
+            day: {"1. open": "1", "2. high": "1", "3. low": "1", "4. close": str(i), "5. volume": "1"}
+            for i, day in enumerate(["2025-01-02", "2025-01-03", "2025-01-01"])
+        }}
+        df = parse_time_series(payload)
+        self.assertEqual(df["Close"].tolist(), [2.0, 0.0, 1.0])
+        self.assertIsNone(parse_time_series({"Note": "API call frequency exceeded"}))
+
+
+if __name__ == '__main__':
+    unittest.main()
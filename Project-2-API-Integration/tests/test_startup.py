@@ -0,0 +1,74 @@
+import os
+import subprocess
+import sys
+import unittest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+HEAVY_MODULES = ("pandas", "numpy", "matplotlib", "pyarrow", "plotly", "seaborn")
+# Cumulative import time allowed for a fetch-path module; requests and its dependencies take about half of it
+IMPORT_BUDGET_S = 0.2
+
+# Print which heavy modules got pulled in and whether importing configured logging
+PROBE = """
+import logging, sys
+import {module}
+print(",".join(name for name in {heavy!r} if name in sys.modules))
+print(len(logging.getLogger().handlers))
+"""
+
+
+def probe(module, watched=HEAVY_MODULES):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE.format(module=module, heavy=watched)],
+                            cwd=SRC_DIR, capture_output=True, text=True, timeout=60)
+    if result.returncode != 0:
+        raise AssertionError(result.stderr)
+    loaded, handlers = result.stdout.splitlines()
+    # -X importtime writes "import time: self | cumulative | name" to stderr; the top-level entry is the module
+    cumulative = [int(line.split("|")[1]) for line in result.stderr.splitlines()
+                  if line.startswith("import time:") and line.split("|")[2].strip() == module]
+    return loaded, int(handlers), cumulative[0] / 1e6
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_fetch_path_is_lightweight(self):
+        """Importing the fetch path loads no dataframe, plotting or parquet libraries and stays within budget"""
+        for module in ("stock_data", "batch_fetch", "scheduler", "fetch_data"):
+            loaded, _, seconds = probe(module)
+            self.assertEqual(loaded, "", module)
+            # Best of three fresh interpreters, so one slow start on a busy machine does not fail the test
+            seconds = min([seconds] + [probe(module)[2] for _ in range(2)])
+            self.assertLessEqual(seconds, IMPORT_BUDGET_S, module)
+
+    def test_cli_paths_are_kept_relative_to_the_caller(self):
+        """python -m src resolves path options before it changes into src/"""
+        from src.__main__ import _absolute_paths
+        self.assertEqual(_absolute_paths(["AAPL", "--output", "out", "--force"]),
+                         ["AAPL", "--output", os.path.abspath("out"), "--force"])
+        self.assertEqual(_absolute_paths(["--output=out", "--workers", "2"]),
+                         [f"--output={os.path.abspath('out')}", "--workers", "2"])
+        self.assertEqual(_absolute_paths(["--output"]), ["--output"])
+
+    def test_import_has_no_side_effects(self):
+        """Importing a module neither configures logging nor touches the log file"""
+        for module in ("stock_data", "fetch_data", "process_data", "analysis"):
+            _, handlers, _ = probe(module)
+            self.assertEqual(handlers, 0, module)
+
+    def test_readers_do_not_load_the_parquet_store(self):
+        """price_store, and with it pyarrow's dataset and parquet modules, is only imported when it is used"""
+        # pandas itself may import the core of pyarrow when it is installed, so watch price_store instead
+        for module in ("analysis", "cross_section", "array_store", "reports"):
+            loaded, _, _ = probe(module, ("price_store", "pyarrow.parquet", "pyarrow.dataset"))
+            self.assertEqual(loaded, "", module)
+
+    def test_analysis_defers_plotting(self):
+        """Plotting libraries are imported only when a chart is drawn"""
+        loaded, _, _ = probe("analysis")
+        self.assertNotIn("matplotlib", loaded)
+        self.assertNotIn("plotly", loaded)
+        self.assertNotIn("seaborn", loaded)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,12 @@
 import unittest
 from unittest.mock import patch, MagicMock
 import os
+import shutil
 import sys
+import pandas as pd
+from src.batch_fetch import BatchFetcher
 from src.stock_data import StockData
+from tests.stub_server import StubAlphaVantageServer, daily_payload
 
 # Add the src directory to the system path so we can import src modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
@@ -16,8 +20,8 @@ class TestStockData(unittest.TestCase):
         self.stock_symbol = "your_stock_symbol"
         self.stock_data = StockData(self.stock_symbol, self.api_key)
 
-    @patch('src.stock_data.requests.get')  # Mocking requests.get method
-    def test_fetch_data(self, mock_get):
+    @patch('src.stock_data.get_session')  # Mocking the shared HTTP session
+    def test_fetch_data(self, mock_get_session):
         """Test fetching stock data"""
         # Mock the API response
         mock_response = MagicMock()
@@ -27,7 +31,7 @@ class TestStockData(unittest.TestCase):
                 "2025-01-01": {"1. open": "150", "2. high": "155", "3. low": "149", "4. close": "152", "5. volume": "1000000"}
             }
         }
-        mock_get.return_value = mock_response
+        mock_get_session.return_value.get.return_value = mock_response
 
         data = self.stock_data.fetch_data()
 
@@ -35,8 +39,8 @@ class TestStockData(unittest.TestCase):
         self.assertIsNotNone(data)
         self.assertIn("Time Series (Daily)", data)
 
-    @patch('src.stock_data.requests.get')  # Mocking requests.get method
-    def test_process_data(self, mock_get):
+    @patch('src.stock_data.get_session')  # Mocking the shared HTTP session
+    def test_process_data(self, mock_get_session):
         """Test processing the fetched data"""
         # Mock the API response
         mock_response = MagicMock()
@@ -47,7 +51,7 @@ class TestStockData(unittest.TestCase):
                 "2025-01-02": {"1. open": "152", "2. high": "157", "3. low": "151", "4. close": "154", "5. volume": "1200000"}
             }
         }
-        mock_get.return_value = mock_response
+        mock_get_session.return_value.get.return_value = mock_response
 
         # Fetch the data (mocked) and process it
         self.stock_data.fetch_data()  # Ensure we have raw data
@@ -67,5 +71,131 @@ class TestStockData(unittest.TestCase):
         if os.path.exists(processed_file_path):
             os.remove(processed_file_path)
 
+class TestIncrementalUpdate(unittest.TestCase):
+
+    def setUp(self):
+        """Set up before each test"""
+        self.api_key = "your_api_key"
+        self.stock_symbol = "TESTINC"
+        self.days = 3
+
+    def payload(self, symbol):
+        return daily_payload(symbol, days=self.days)
+
+    def test_update_appends_only_new_days(self):
+        """The first update fetches the full series, later ones append the compact delta"""
+        with StubAlphaVantageServer(payload_factory=self.payload) as server:
+            stock_data = StockData(self.stock_symbol, self.api_key, base_url=server.url)
+            df = stock_data.update_data()
+            self.assertEqual(len(df), 3)
+
+            self.days = 5
+            new_rows = stock_data.update_data()
+
+        self.assertEqual([r["outputsize"] for r in server.requests], ["full", "compact"])
+        self.assertEqual(new_rows.index.strftime("%Y-%m-%d").tolist(), ["2025-01-04", "2025-01-05"])
+        stored = pd.read_csv(stock_data.processed_file, index_col=0, parse_dates=True)
+        self.assertEqual(len(stored), 5)
+        self.assertTrue(stored.index.is_monotonic_increasing)
+        self.assertEqual(stock_data.last_stored_date(), pd.Timestamp("2025-01-05"))
+
+    def test_update_then_process_keeps_appended_days(self):
+        """Compact deltas are saved beside the raw history, and reprocessing folds them in without losing rows"""
+        with StubAlphaVantageServer(payload_factory=self.payload) as server:
+            stock_data = StockData(self.stock_symbol, self.api_key, base_url=server.url)
+            stock_data.update_data()
+            with open(stock_data.raw_file, "rb") as file:
+                history = file.read()
+            for self.days in (4, 5):
+                stock_data.update_data()
+
+        # The history file is never rewritten by an update
+        with open(stock_data.raw_file, "rb") as file:
+            self.assertEqual(file.read(), history)
+        self.assertEqual(sorted(os.listdir(stock_data.delta_dir)), ["20250104T000000.json", "20250105T000000.json"])
+
+        expected = pd.read_csv(stock_data.processed_file, index_col=0, parse_dates=True)
+        df = stock_data.process_data()
+        self.assertEqual(df.index.strftime("%Y-%m-%d").tolist(),
+                         ["2025-01-01", "2025-01-02", "2025-01-03", "2025-01-04", "2025-01-05"])
+        pd.testing.assert_frame_equal(pd.read_csv(stock_data.processed_file, index_col=0, parse_dates=True), expected)
+        self.assertEqual(stock_data.process_data(chunk_rows=2), 5)
+        pd.testing.assert_frame_equal(pd.read_csv(stock_data.processed_file, index_col=0, parse_dates=True), expected)
+
+        # A full fetch replaces the history and the deltas it covers
+        stock_data.fetch_data("full")
+        self.assertFalse(os.path.exists(stock_data.delta_dir))
+
+    def test_stale_store_falls_back_to_full_fetch(self):
+        """A compact window that starts after the last stored day triggers a full fetch instead of a gap"""
+        def payload(symbol):
+            if server.requests[-1].get("outputsize") == "compact":
+                # Only the latest days 7 to 9; days 4 to 6 would be skipped
+                full = daily_payload(symbol, days=9)
+                series = full["Time Series (Daily)"]
+                full["Time Series (Daily)"] = {day: series[day] for day in list(series)[6:]}
+                return full
+            return daily_payload(symbol, days=self.days)
+
+        with StubAlphaVantageServer(payload_factory=payload) as server:
+            stock_data = StockData(self.stock_symbol, self.api_key, base_url=server.url)
+            stock_data.update_data()
+            self.days = 9
+            stock_data.update_data()
+
+        self.assertEqual([r["outputsize"] for r in server.requests], ["full", "compact", "full"])
+        stored = pd.read_csv(stock_data.processed_file, index_col=0, parse_dates=True)
+        self.assertEqual(len(stored), 9)
+        self.assertEqual(stock_data.last_stored_date(), pd.Timestamp("2025-01-09"))
+
+    def test_throttled_fallback_keeps_history_and_is_retried(self):
+        """A rate-limit note answering the fallback full fetch never replaces the raw history"""
+        def payload(symbol):
+            if server.requests[-1].get("outputsize") == "compact":
+                full = daily_payload(symbol, days=9)
+                series = full["Time Series (Daily)"]
+                full["Time Series (Daily)"] = {day: series[day] for day in list(series)[6:]}
+                return full
+            if len(server.requests) == 3:  # The first fallback is throttled
+                return {"Note": "Thank you for using Alpha Vantage! Please retry later."}
+            return daily_payload(symbol, days=self.days)
+
+        with StubAlphaVantageServer(payload_factory=payload) as server:
+            StockData(self.stock_symbol, self.api_key, base_url=server.url).update_data()
+            with open(f"../data/raw/{self.stock_symbol}.json", "rb") as file:
+                history = file.read()
+            self.days = 9
+
+            fetcher = BatchFetcher(self.api_key, requests_per_minute=600, max_retries=0, base_url=server.url,
+                                   incremental=True)
+            self.assertIsNone(fetcher.fetch_one(self.stock_symbol))
+            with open(f"../data/raw/{self.stock_symbol}.json", "rb") as file:
+                self.assertEqual(file.read(), history)
+
+            fetcher = BatchFetcher(self.api_key, requests_per_minute=600, max_retries=1, backoff_seconds=0,
+                                   base_url=server.url, incremental=True)
+            self.assertEqual(len(fetcher.fetch_one(self.stock_symbol)), 9)
+
+        self.assertEqual([r["outputsize"] for r in server.requests], ["full", "compact", "full", "compact", "full"])
+
+    def test_legacy_descending_store_is_reordered(self):
+        """A processed file written newest-first is rewritten once in ascending order"""
+        stock_data = StockData(self.stock_symbol, self.api_key)
+        os.makedirs("../data/processed", exist_ok=True)
+        stock_data.to_dataframe(daily_payload(self.stock_symbol, days=3)).sort_index(ascending=False) \
+            .to_csv(stock_data.processed_file)
+
+        self.assertEqual(stock_data.last_stored_date(), pd.Timestamp("2025-01-03"))
+        stored = pd.read_csv(stock_data.processed_file, index_col=0, parse_dates=True)
+        self.assertTrue(stored.index.is_monotonic_increasing)
+
+    def tearDown(self):
+        """Clean up after each test"""
+        for path in (f"../data/raw/{self.stock_symbol}.json", f"../data/processed/{self.stock_symbol}.csv"):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(f"../data/raw/{self.stock_symbol}_deltas", ignore_errors=True)
+
+
 if __name__ == '__main__':
     unittest.main()
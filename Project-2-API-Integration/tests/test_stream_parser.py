@@ -0,0 +1,100 @@
+import unittest
+from unittest.mock import patch
+import json
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+from src.series_parser import parse_time_series
+from src.stock_data import StockData
+from src.stream_parser import iter_bars
+from src.price_store import PriceStore
+from src.array_store import ArrayStore
+from benchmarks.synthetic import make_daily_payload, make_intraday_payload
+from tests.stub_server import StubAlphaVantageServer
+
+
+class TestIterBars(unittest.TestCase):
+
+    def setUp(self):
+        """Set up before each test"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "raw.json")
+
+    def test_chunks_match_full_parse(self):
+        """Streaming with a tiny read window yields the same bars as loading the whole file"""
+        payload = make_intraday_payload(bars=2500, interval="5min")
+        for indent in (4, None):
+            with open(self.path, "w") as file:
+                json.dump(payload, file, indent=indent)
+            chunks = list(iter_bars(self.path, chunk_rows=600, read_size=97))
+
+            self.assertEqual([len(chunk) for chunk in chunks], [600, 600, 600, 600, 100])
+            pd.testing.assert_frame_equal(pd.concat(chunks).sort_index(), parse_time_series(payload),
+                                          check_freq=False)
+
+    def test_file_without_series(self):
+        """A rate-limit note produces no chunks"""
+        with open(self.path, "w") as file:
+            json.dump({"Note": "API call frequency exceeded"}, file)
+        self.assertEqual(list(iter_bars(self.path)), [])
+
+    def tearDown(self):
+        """Clean up after each test"""
+        shutil.rmtree(self.tmp_dir)
+
+
+class TestIntradayStockData(unittest.TestCase):
+
+    def setUp(self):
+        """Set up before each test"""
+        self.api_key = "your_api_key"
+        self.stock_symbol = "TESTINTRA"
+        self.payload = make_intraday_payload(self.stock_symbol, bars=1500, interval="5min")
+
+    def test_fetch_and_stream_intraday(self):
+        """Intraday requests use TIME_SERIES_INTRADAY and chunked processing matches the full path"""
+        with StubAlphaVantageServer(payload_factory=lambda symbol: self.payload) as server:
+            stock_data = StockData(self.stock_symbol, self.api_key, base_url=server.url, interval="5min")
+            stock_data.fetch_data(outputsize="full")
+
+        self.assertEqual(server.requests[0]["function"], "TIME_SERIES_INTRADAY")
+        self.assertEqual(server.requests[0]["interval"], "5min")
+        self.assertTrue(stock_data.raw_file.endswith("TESTINTRA_5min.json"))
+
+        rows = stock_data.process_data(chunk_rows=400)
+        self.assertEqual(rows, 1500)
+        streamed = pd.read_csv(stock_data.processed_file, index_col=0, parse_dates=True)
+        expected = stock_data.process_data()
+        pd.testing.assert_frame_equal(streamed, expected, check_freq=False, check_dtype=False)
+        self.assertTrue(streamed.index.is_monotonic_increasing)
+
+    def test_stream_into_price_store(self):
+        """Chunked processing streams into the columnar and array stores without rewriting per chunk"""
+        frames = []
+        for store in (PriceStore(tempfile.mkdtemp()), ArrayStore(tempfile.mkdtemp())):
+            stock_data = StockData(self.stock_symbol, self.api_key, store=store)
+            stock_data.save_raw_data(make_daily_payload(self.stock_symbol, days=900))
+            with patch.object(type(store), "append", side_effect=AssertionError("append rewrites partitions")):
+                self.assertEqual(stock_data.process_data(chunk_rows=250), 900)
+            frames.append(store.read(self.stock_symbol))
+            shutil.rmtree(store.root)
+        self.assertEqual(len(frames[0]), 900)
+        pd.testing.assert_frame_equal(frames[1], frames[0], check_freq=False)
+
+    def test_unsupported_interval(self):
+        with self.assertRaises(ValueError):
+            StockData(self.stock_symbol, self.api_key, interval="2min")
+
+    def tearDown(self):
+        """Clean up after each test"""
+        for name in (self.stock_symbol, f"{self.stock_symbol}_5min"):
+            for path in (f"../data/raw/{name}.json", f"../data/processed/{name}.csv"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+if __name__ == '__main__':
+    unittest.main()